@@ -0,0 +1,75 @@
+"""Loading a directory of tenant configs: a serial TOMLConfig.create loop vs load_many over a process pool.
+
+    python benchmarks/bench_bulk_load.py [--files 10000] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger as log
+
+from toomanyconfigs import TOMLConfig, TOMLSubConfig, load_many, set_log_mode
+
+
+class Limits(TOMLSubConfig):
+    requests: int = 100
+    burst: int = 10
+
+
+class Contact(TOMLSubConfig):
+    name: str = "ops"
+    email: str = "ops@example.com"
+
+
+class Tenant(TOMLConfig):
+    name: str = "tenant"
+    region: str = "eu-west-1"
+    plan: str = "free"
+    seats: int = 1
+    limits: Limits
+    contact: Contact
+
+
+def write_tenants(directory: Path, n: int):
+    for i in range(n):
+        (directory / f"tenant-{i:06}.toml").write_text(
+            f'name = "tenant-{i}"\nregion = "eu-west-1"\nplan = "pro"\nseats = {i % 50 + 1}\n\n'
+            f'[limits]\nrequests = {100 + i % 900}\nburst = 10\n\n'
+            f'[contact]\nname = "owner-{i}"\nemail = "owner-{i}@example.com"\n'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--workers", nargs="+", type=int, default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    log.remove()
+    set_log_mode("quiet")
+    directory = Path(tempfile.mkdtemp(prefix="tenants-"))
+    try:
+        write_tenants(directory, args.files)
+
+        start = time.perf_counter()
+        for path in sorted(directory.glob("*.toml")):
+            Tenant.create(_source=path, prompt_empty_fields=False, memoize=False)
+        serial = time.perf_counter() - start
+
+        print(f"{args.files} files, {os.cpu_count()} CPUs")
+        print(f"{'loader':>16} {'seconds':>9} {'files/s':>9} {'speedup':>8}")
+        print(f"{'create() loop':>16} {serial:>9.2f} {args.files / serial:>9.0f} {1.0:>7.1f}x")
+        for workers in args.workers:
+            result = load_many(Tenant, directory, workers=workers)
+            assert len(result) == args.files and not result.errors
+            print(f"{f'load_many({workers})':>16} {result.elapsed:>9.2f} {args.files / result.elapsed:>9.0f} "
+                  f"{serial / result.elapsed:>7.1f}x")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Cost of building configs in bulk: plain construction and create() from already parsed sections.
+
+    python benchmarks/bench_config_init.py [--configs 100000] [--rounds 3]
+"""
+import argparse
+import time
+
+from loguru import logger as log
+
+from toomanyconfigs import TOMLConfig, TOMLSubConfig
+
+
+class Limits(TOMLSubConfig):
+    requests: int = 100
+    burst: int = 10
+    window: float = 1.0
+
+
+class Contact(TOMLSubConfig):
+    name: str = "ops"
+    email: str = "ops@example.com"
+
+
+class Tenant(TOMLConfig):
+    name: str = "tenant"
+    region: str = "eu-west-1"
+    plan: str = "free"
+    seats: int = 1
+    active: bool = True
+    limits: Limits
+    contact: Contact
+
+
+SECTION = {"requests": 250, "burst": 25, "window": 0.5}
+
+
+def build_sections(n: int):
+    for i in range(n):
+        Limits(requests=i, burst=10)
+
+
+def create_sections(n: int):
+    for i in range(n):
+        Limits.create(_data=SECTION, prompt_empty_fields=False)
+
+
+def build_configs(n: int):
+    for i in range(n):
+        Tenant(name=f"tenant-{i}", seats=i, limits=SECTION, contact={"name": "ops"})
+
+
+def best_us(fn, n: int, rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - start)
+    return best / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    log.remove()
+    print(f"{'case':>26} {'µs each':>9} {'total s':>9}")
+    for label, fn in (
+            ("TOMLSubConfig(**kwargs)", build_sections),
+            ("TOMLSubConfig.create", create_sections),
+            ("TOMLConfig + 2 sections", build_configs),
+    ):
+        us = best_us(fn, args.configs, args.rounds)
+        print(f"{label:>26} {us:>9.2f} {us * args.configs / 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
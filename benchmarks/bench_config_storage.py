@@ -0,0 +1,121 @@
+"""Per-instance memory and get/set cost of config sections: values mirrored into the instance __dict__ (the old
+storage) vs stored once in the dict with Field descriptors and slots.
+
+    python benchmarks/bench_config_storage.py [--instances 20000] [--ops 200000]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from loguru import logger as log
+
+from toomanyconfigs import TOMLSubConfig
+
+
+class MirroredSection(dict):
+    """What TOMLSubConfig used to do: every value is both a dict item and an instance attribute"""
+    name: str = "tenant"
+    region: str = "eu-west-1"
+    plan: str = "free"
+    seats: int = 1
+    active: bool = True
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self._dirty = True
+        self._revision = 0
+        for field_name in self.__class__.__annotations__:
+            default_value = getattr(self.__class__, field_name)
+            self[field_name] = default_value
+            setattr(self, field_name, default_value)
+        for k, v in kwargs.items():
+            self[k] = v
+            setattr(self, k, v)
+
+    def __setattr__(self, name, value):
+        if not name.startswith('_'):
+            self[name] = value
+        super().__setattr__(name, value)
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        if not name.startswith('_'):
+            super().__setattr__(name, value)
+            super().__setattr__('_dirty', True)
+            super().__setattr__('_revision', self.__dict__.get('_revision', 0) + 1)
+
+
+class TenantSection(TOMLSubConfig):
+    name: str = "tenant"
+    region: str = "eu-west-1"
+    plan: str = "free"
+    seats: int = 1
+    active: bool = True
+
+
+def bytes_per_instance(cls, n: int) -> float:
+    names = [f"tenant-{i}" for i in range(n)]
+    cls(name="warmup")
+    gc.collect()
+    tracemalloc.start()
+    instances = [cls(name=names[i], seats=i, owner="ops", tier="gold") for i in range(n)]
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del instances
+    return used / n
+
+
+def ns_per_op(fn, ops: int) -> float:
+    start = time.perf_counter()
+    fn(ops)
+    return (time.perf_counter() - start) / ops * 1e9
+
+
+def operations(section) -> dict:
+    def set_attr(ops):
+        for i in range(ops):
+            section.seats = i
+
+    def set_item(ops):
+        for i in range(ops):
+            section["seats"] = i
+
+    def get_field(ops):
+        for _ in range(ops):
+            section.seats
+
+    def get_extra(ops):
+        for _ in range(ops):
+            section.owner
+
+    def get_item(ops):
+        for _ in range(ops):
+            section["seats"]
+
+    return {"set attr": set_attr, "set item": set_item, "get field": get_field, "get extra": get_extra,
+            "get item": get_item}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--instances", type=int, default=20_000)
+    parser.add_argument("--ops", type=int, default=200_000)
+    args = parser.parse_args()
+
+    log.remove()
+    rows = {}
+    for label, cls in (("mirrored", MirroredSection), ("single", TenantSection)):
+        row = {"bytes": bytes_per_instance(cls, args.instances)}
+        for op, fn in operations(cls(name="t", owner="ops")).items():
+            row[op] = ns_per_op(fn, args.ops)
+        rows[label] = row
+
+    columns = list(rows["single"])
+    print(f"{'storage':>9} " + " ".join(f"{c + (' ns' if c != 'bytes' else ''):>13}" for c in columns))
+    for label, row in rows.items():
+        print(f"{label:>9} " + " ".join(f"{row[c]:>13.0f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
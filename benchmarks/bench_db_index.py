@@ -0,0 +1,56 @@
+"""Lookup latency for stored responses: the old DataFrame mask scan vs ResponseIndex, from 1k to 1M rows.
+
+    python benchmarks/bench_db_index.py [--rows 1000 10000 100000 1000000] [--lookups 1000]
+"""
+import argparse
+import json
+import random
+import time
+
+import pandas as pd
+
+from toomanyconfigs.api import ResponseIndex
+
+
+def build_table(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        "path": [f"https://api.example.com/items/{i}" for i in range(rows)],
+        "status": ["200"] * rows,
+        "method": ["get"] * rows,
+        "headers": [json.dumps({"content-type": "application/json"})] * rows,
+        "body": [json.dumps({"id": i}) for i in range(rows)],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", nargs="+", type=int, default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'scan us/lookup':>16} {'index us/lookup':>16} {'index build s':>14}")
+    for rows in args.rows:
+        df = build_table(rows)
+        keys = [f"https://api.example.com/items/{random.randrange(rows)}" for _ in range(args.lookups)]
+
+        scan_lookups = keys[:max(1, args.lookups // 100)]  # the scan is far too slow for the full set at 1M
+        start = time.perf_counter()
+        for path in scan_lookups:
+            df[(df['path'] == path) & (df['method'] == "get")].iloc[0]
+        scan = (time.perf_counter() - start) / len(scan_lookups)
+
+        index = ResponseIndex(lambda: df)
+        start = time.perf_counter()
+        len(index)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in keys:
+            index.get("get", path)
+        lookup = (time.perf_counter() - start) / len(keys)
+
+        print(f"{rows:>10} {scan * 1e6:>16.1f} {lookup * 1e6:>16.2f} {build:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
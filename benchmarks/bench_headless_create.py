@@ -0,0 +1,60 @@
+"""Startup cost of a config whose fields are all missing from its file, resolved from the environment and secrets.
+
+Before the provider pipeline each missing field cost at least two seconds of sleeps around its prompt.
+
+    python benchmarks/bench_headless_create.py [--fields 1 5 20] [--rounds 200]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from loguru import logger as log
+
+from toomanyconfigs import TOMLConfig, EnvProvider, SecretsDirProvider, set_log_mode
+
+
+def make_config(k: int) -> type:
+    annotations = {f"field_{i}": str for i in range(k)}
+    return type(f"Headless{k}", (TOMLConfig,), {"__annotations__": annotations, "__module__": __name__})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fields", nargs="+", type=int, default=[1, 5, 20])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    log.remove()
+    set_log_mode("quiet")
+    directory = Path(tempfile.mkdtemp(prefix="headless-"))
+    secrets = directory / "secrets"
+    secrets.mkdir()
+    try:
+        print(f"{'fields':>6} {'ms each':>9} {'old minimum s':>14}")
+        for k in args.fields:
+            cls = make_config(k)
+            owner = cls.__name__.lower()
+            for i in range(k):
+                # Half from the environment, half from secret files
+                if i % 2:
+                    (secrets / f"{owner}_field_{i}").write_text(f"secret-{i}\n")
+                else:
+                    os.environ[f"{owner}_field_{i}".upper()] = f"env-{i}"
+            providers = [EnvProvider(), SecretsDirProvider(secrets)]
+            start = time.perf_counter()
+            for r in range(args.rounds):
+                path = directory / f"{owner}-{r}.toml"
+                cfg = cls.create(_source=path, providers=providers, memoize=False)
+                path.unlink()
+            ms = (time.perf_counter() - start) / args.rounds * 1e3
+            assert all(cfg[f"field_{i}"] for i in range(k))
+            print(f"{k:>6} {ms:>9.3f} {2 * k:>14}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
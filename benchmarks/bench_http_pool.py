@@ -0,0 +1,96 @@
+"""Requests/sec against a local keep-alive stub server: a fresh httpx client per call vs SimpleAPI's pooled clients.
+
+    python benchmarks/bench_http_pool.py [--requests 500] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from loguru import logger as log
+
+from toomanyconfigs import SimpleAPI
+
+BODY = b'{"ok": true}'
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def report(label: str, n: int, seconds: float):
+    print(f"{label:<28} {n / seconds:>10.0f} req/s")
+
+
+def bench_sync(url: str, n: int):
+    start = time.perf_counter()
+    for _ in range(n):
+        with httpx.Client() as client:
+            client.get(url)
+    report("sync, client per call", n, time.perf_counter() - start)
+
+    with SimpleAPI(url, cache=False) as api:
+        api.request("get")  # open the connection outside the timed loop
+        start = time.perf_counter()
+        for _ in range(n):
+            api.request("get")
+        report("sync, pooled", n, time.perf_counter() - start)
+
+
+async def bench_async(url: str, n: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def per_call():
+        async with sem:
+            async with httpx.AsyncClient() as client:
+                await client.get(url)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(per_call() for _ in range(n)))
+    report("async, client per call", n, time.perf_counter() - start)
+
+    async with SimpleAPI(url, cache=False) as api:
+        async def pooled():
+            async with sem:
+                await api.async_request("get")
+
+        await pooled()
+        start = time.perf_counter()
+        await asyncio.gather(*(pooled() for _ in range(n)))
+        report("async, pooled", n, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    log.remove()
+    url = serve()
+    bench_sync(url, args.requests)
+    asyncio.run(bench_async(url, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Import time of each entry point, from `python -X importtime` in a fresh interpreter, and a guard that the heavy
+dependencies stay out of the entry points that don't need them.
+
+    python benchmarks/bench_import_time.py [--runs 5] [--budget-ms 150]
+
+Exits 1 if an entry point imports a module it shouldn't, or its median exceeds --budget-ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY = ("httpx", "pyperclip", "pickleclass", "p2d2", "pandas", "concurrent.futures.process")
+
+# statement -> heavy modules it is allowed to import
+ENTRY_POINTS = {
+    "import toomanyconfigs": (),
+    "from toomanyconfigs import TOMLConfig, TOMLSubConfig": (),
+    "from toomanyconfigs import EnvProvider": (),
+    "from toomanyconfigs import load_many": ("concurrent.futures.process",),
+    "from toomanyconfigs import API": ("httpx",),
+    "from toomanyconfigs import SimpleAPI": ("httpx", "pickleclass"),
+    "from toomanyconfigs import API; API().close()": ("httpx",),  # database=False: no p2d2
+}
+
+REPORT = "import sys; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+
+
+def measure(statement: str, cwd: str) -> tuple[float, set[str]]:
+    """Milliseconds spent importing during `statement` (top-level imports only), and the heavy modules loaded"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{statement}\n{REPORT.format(heavy=HEAVY)}"],
+        capture_output=True, text=True, stdin=subprocess.DEVNULL, cwd=cwd, check=True
+    )
+    us = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented under their parent and already counted in its cumulative time;
+        # the interpreter's own startup (site, encodings) happens before the statement
+        if not name.startswith("  ") and name.strip() not in ("site", "encodings") and "encodings." not in name:
+            us += int(cumulative)
+    loaded = proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else ""
+    return us / 1e3, set(filter(None, loaded.split(",")))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    failed = False
+    # The API entry points write an apiconfig.toml into the working directory
+    with tempfile.TemporaryDirectory(prefix="importtime-") as cwd:
+        print(f"{'entry point':>48} {'median ms':>10}  heavy modules")
+        for statement, allowed in ENTRY_POINTS.items():
+            times, loaded = [], set()
+            for _ in range(args.runs):
+                ms, loaded = measure(statement, cwd)
+                times.append(ms)
+            median = statistics.median(times)
+            unexpected = loaded - set(allowed)
+            over = args.budget_ms is not None and median > args.budget_ms
+            failed |= bool(unexpected) or over
+            note = ", ".join(sorted(loaded)) or "-"
+            if unexpected:
+                note += f"  UNEXPECTED: {', '.join(sorted(unexpected))}"
+            if over:
+                note += f"  OVER BUDGET ({args.budget_ms} ms)"
+            print(f"{statement:>48} {median:>10.1f}  {note}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Per-request cost of the library's own logging in each log mode, against an in-process mock transport.
+
+Each mode is timed with a loguru sink that accepts everything (messages are formatted and emitted) and with one
+that only takes warnings (messages are filtered, but without the LogPolicy gates their f-strings were still built).
+
+    python benchmarks/bench_logging.py [--requests 2000] [--rounds 7]
+"""
+import argparse
+import time
+
+import httpx
+from loguru import logger as log
+
+from toomanyconfigs import SimpleAPI, log_mode
+from toomanyconfigs.logs import MODES
+
+BODY = b'{"ok": true}'
+
+
+def mock_api() -> SimpleAPI:
+    api = SimpleAPI("http://bench.local", cache=False)
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=BODY,
+                                                                   headers={"Content-Type": "application/json"}))
+    api.clients._client = httpx.Client(transport=transport)
+    return api
+
+
+def time_per_request(api: SimpleAPI, requests: int) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        api.request("get", "/items")
+    return (time.perf_counter() - start) / requests
+
+
+def best_per_mode(api: SimpleAPI, requests: int, rounds: int) -> dict[str, float]:
+    """Modes take turns for several rounds and keep their best, so drift on a busy machine hits them all alike"""
+    best = {mode: float("inf") for mode in MODES}
+    for _ in range(rounds):
+        for mode in MODES:
+            with log_mode(mode):
+                best[mode] = min(best[mode], time_per_request(api, requests))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2_000, help="requests per mode per round")
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+
+    api = mock_api()
+    log.remove()
+    print(f"{'mode':<8} {'sink':<10} {'µs/request':>11} {'vs quiet':>9}")
+    for sink_level in ("DEBUG", "WARNING"):
+        sink = log.add(lambda message: None, level=sink_level)
+        best = best_per_mode(api, args.requests, args.rounds)
+        for mode in MODES:
+            extra = (best[mode] - best["quiet"]) * 1e6
+            print(f"{mode:<8} {sink_level:<10} {best[mode] * 1e6:>11.1f} {extra:>+8.1f}µs")
+        log.remove(sink)
+
+
+if __name__ == "__main__":
+    main()
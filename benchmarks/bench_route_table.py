@@ -0,0 +1,67 @@
+"""Per-request path building: the old RoutesConfig.get / KeyError / str.format path vs the compiled RouteTable.
+
+    python benchmarks/bench_route_table.py [--shortcuts 50] [--calls 200000]
+"""
+import argparse
+import time
+
+from loguru import logger as log
+
+from toomanyconfigs import APIConfig, HeadersConfig, RoutesConfig, Shortcuts, VarsConfig
+
+
+def legacy_build_path(config: APIConfig, route: str = None, append: str = "", format: dict = None):
+    """What Receptionist._build_path used to do"""
+    if not route:
+        path = config.routes.base
+    else:
+        try:
+            path = config.routes.get(route)
+        except KeyError:
+            path = config.routes.base + str(route)
+
+    if format:
+        path = path.format(**format)
+    if append:
+        path += append
+    return path
+
+
+def time_per_call(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shortcuts", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    log.remove()
+    shortcuts = {f"route_{i}": f"/items/{i}/{{item_id}}/detail" for i in range(args.shortcuts)}
+    shortcuts["plain"] = "/status"
+    config = APIConfig(
+        headers=HeadersConfig(),
+        routes=RoutesConfig(base="https://${HOST}/v1", shortcuts=Shortcuts(**shortcuts)),
+        vars=VarsConfig(host="api.example.com", api_key="secret")
+    )
+    cases = {
+        "plain shortcut": dict(route="plain"),
+        "shortcut + params": dict(route="route_7", format={"item_id": 42}),
+        "unknown route": dict(route="/posts/1"),
+        "base + append": dict(append="?page=2"),
+    }
+
+    print(f"{'case':<20} {'legacy ns/call':>15} {'table ns/call':>14}")
+    for label, kwargs in cases.items():
+        assert legacy_build_path(config, **kwargs) == config.routes.table.build(**kwargs)
+        legacy = time_per_call(lambda: legacy_build_path(config, **kwargs), args.calls)
+        table = time_per_call(lambda: config.routes.table.build(**kwargs), args.calls)
+        print(f"{label:<20} {legacy * 1e9:>15.0f} {table * 1e9:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
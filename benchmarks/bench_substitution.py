@@ -0,0 +1,74 @@
+"""Variable substitution cost: the old per-var str.replace loop vs lazy resolution through the compiled resolver.
+
+    python benchmarks/bench_substitution.py [--vars 10 100 1000 5000] [--values 5000] [--templated 0.1]
+"""
+import argparse
+import random
+import time
+
+from loguru import logger as log
+
+from toomanyconfigs import APIConfig, HeadersConfig, RoutesConfig, Shortcuts, VarsConfig
+
+
+def replace_loop(value: str, vars_dict: dict) -> str:
+    """What apply_variable_substitution used to do for every string"""
+    for var_key, var_val in vars_dict.items():
+        if var_val:
+            value = value.replace(f"${{{var_key.upper()}}}", str(var_val))
+            value = value.replace(f"${var_key.upper()}", str(var_val))
+    return value
+
+
+def build(n_vars: int, n_values: int, templated: float) -> APIConfig:
+    names = [f"var_{i}" for i in range(n_vars)]
+    headers = {}
+    for i in range(n_values):
+        if random.random() < templated:
+            headers[f"x-header-{i}"] = f"token ${{{random.choice(names).upper()}}}; id=${random.choice(names).upper()}"
+        else:
+            headers[f"x-header-{i}"] = f"static-value-{i}"
+    return APIConfig(
+        headers=HeadersConfig(**headers),
+        routes=RoutesConfig(base="https://api.example.com", shortcuts=Shortcuts()),
+        vars=VarsConfig(**{name: f"value-{name}" for name in names})
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vars", nargs="+", type=int, default=[10, 100, 1_000, 5_000])
+    parser.add_argument("--values", type=int, default=5_000)
+    parser.add_argument("--templated", type=float, default=0.1, help="fraction of values containing placeholders")
+    args = parser.parse_args()
+
+    log.remove()
+    print(f"{'vars':>6} {'values':>7} {'replace loop ms':>16} {'first read ms':>14} {'memoized ms':>12} {'1 var changed ms':>17}")
+    for n_vars in args.vars:
+        cfg = build(n_vars, args.values, args.templated)
+        vars_dict = dict(cfg.vars)
+
+        start = time.perf_counter()
+        for value in cfg.headers.values():
+            replace_loop(value, vars_dict)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cfg.headers.to_headers()
+        first = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cfg.headers.to_headers()
+        memoized = time.perf_counter() - start
+
+        cfg.vars["var_0"] = "changed"
+        start = time.perf_counter()
+        cfg.headers.to_headers()
+        changed = time.perf_counter() - start
+
+        print(f"{n_vars:>6} {args.values:>7} {loop * 1e3:>16.1f} {first * 1e3:>14.1f} {memoized * 1e3:>12.2f} "
+              f"{changed * 1e3:>17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare TOML backends on generated configs from 1 KB to 50 MB.
+
+    python benchmarks/bench_toml_backends.py [--sizes 1KB 1MB] [--repeat 3]
+"""
+import argparse
+import time
+
+from toomanyconfigs import backends
+
+SIZES = ["1KB", "100KB", "1MB", "10MB", "50MB"]
+UNITS = {"KB": 1024, "MB": 1024 ** 2}
+
+
+def parse_size(size: str) -> int:
+    return int(size[:-2]) * UNITS[size[-2:].upper()]
+
+
+def generate(target_bytes: int) -> str:
+    """Build a config of roughly `target_bytes` out of service-style sections"""
+    chunks, total, i = [], 0, 0
+    while total < target_bytes:
+        section = (
+            f"[service_{i}]\n"
+            f'name = "service-{i}"\n'
+            f"port = {8000 + i % 1000}\n"
+            f"enabled = {'true' if i % 2 else 'false'}\n"
+            f"ratio = {i / 7:.4f}\n"
+            f'tags = ["a{i}", "b{i}", "c{i}"]\n'
+            f"[service_{i}.headers]\n"
+            f'authorization = "Bearer ${{TOKEN_{i}}}"\n'
+            f'accept = "application/json"\n\n'
+        )
+        chunks.append(section)
+        total += len(section)
+        i += 1
+    return "".join(chunks)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    installed = [b for b in backends.BACKENDS.values() if b.available]
+    print(f"installed backends: {[b.name for b in installed]}")
+    print(f"{'size':>8} {'backend':>10} {'op':>6} {'seconds':>10} {'MB/s':>10}")
+
+    for size in args.sizes:
+        text = generate(parse_size(size))
+        mb = len(text) / UNITS["MB"]
+        data = None
+        for backend in installed:
+            if backend.can_read:
+                seconds = best_of(lambda: backend.loads(text), args.repeat)
+                data = data or backend.loads(text)
+                print(f"{size:>8} {backend.name:>10} {'read':>6} {seconds:>10.4f} {mb / seconds:>10.1f}")
+        for backend in installed:
+            if backend.can_write:
+                seconds = best_of(lambda: backend.dumps(data), args.repeat)
+                print(f"{size:>8} {backend.name:>10} {'write':>6} {seconds:>10.4f} {mb / seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
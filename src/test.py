@@ -80,7 +80,7 @@ class Test3(TOMLConfig):
 
 if __name__ == "__main__":
     t = Test3.create()
-    log.debug(t.__dict__)
+    log.debug(t.as_dict())
 
 #STDOUT
 # 2025-07-29 01:09:12.537 | WARNING  | toomanyconfigs.core:create:164 - [TooManyConfigs]: Config file not found at C:\Users\foobar\PycharmProjects\TooManyConfigs\src\test3.toml, creating new one
@@ -157,7 +157,7 @@ if __name__ == "__main__":
     cfg = APIConfig.create(_source=src, routes=routes, vars=json_vars)
     json_placeholder = API(cfg, database=True)
     json_placeholder.config.apply_variable_substitution()
-    log.debug(json_placeholder.config.__dict__)
+    log.debug(json_placeholder.config.as_dict())
     response = asyncio.run(json_placeholder.api_get("c"))
     log.debug(response)
     sync_response = json_placeholder.sync_api_get("c")
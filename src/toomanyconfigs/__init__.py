@@ -1,7 +1,40 @@
 REPR = "[TooManyConfigs]"
-ACTIVE_CFGS = {}
-DEBUG = False
+from .logs import LOGS, log_mode, set_log_mode
+from .registry import ConfigRegistry
+ACTIVE_CFGS = ConfigRegistry()
 from .core import TOMLConfig, TOMLSubConfig
-from .api import API, APIConfig, HeadersConfig, RoutesConfig, VarsConfig, Shortcuts, Response
-from .cwd import CWD
-from .simple_api import SimpleAPI
\ No newline at end of file
+
+# Everything else is imported on first access (PEP 562), so configs alone don't pay for httpx, pickleclass or
+# the process pool. See benchmarks/bench_import_time.py.
+_LAZY = {
+    "LoadResult": "bulk", "iter_load_many": "bulk", "load_many": "bulk",
+    "EnvProvider": "providers", "SecretsDirProvider": "providers", "MappingProvider": "providers",
+    "PromptProvider": "providers",
+    "API": "api", "APIConfig": "api", "HeadersConfig": "api", "RoutesConfig": "api", "VarsConfig": "api",
+    "Shortcuts": "api", "LimitsConfig": "api", "RetryConfig": "api", "Response": "api",
+    "Limits": "limits",
+    "CWD": "cwd",
+    "SimpleAPI": "simple_api",
+}
+
+__all__ = ["REPR", "ACTIVE_CFGS", "LOGS", "log_mode", "set_log_mode", "TOMLConfig", "TOMLSubConfig", *_LAZY]
+
+
+def __getattr__(name: str):
+    if name == "DEBUG":
+        import warnings
+        warnings.warn("toomanyconfigs.DEBUG is deprecated; use toomanyconfigs.LOGS (LOGS.detail) or set_log_mode()",
+                      DeprecationWarning, stacklevel=2)
+        return LOGS.detail
+    try:
+        module = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    from importlib import import_module
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
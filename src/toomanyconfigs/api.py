@@ -1,30 +1,54 @@
+import asyncio
 import json
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
 from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Iterator, Mapping, Optional
+from urllib.parse import urlsplit
 
 import httpx
 from loguru import logger as log
 
-from . import TOMLSubConfig, DEBUG
-from .core import TOMLConfig
-
-
-class HeadersConfig(TOMLSubConfig):
+from .cache import ResponseCache, request_key
+from .clients import ClientPool
+from .concurrency import (
+    COALESCE_METHODS, AsyncCoalescer, ManagedExecutor, SyncCoalescer, gather_limited, threaded_limited
+)
+from .core import TOMLConfig, TOMLSubConfig
+from .headers import HeaderSet, encoded, headers_key
+from .instrumentation import OTHER_ROUTE, Instrumentation, prometheus_counters
+from .limits import UNLIMITED, Limits
+from .logs import LOGS
+from .persistence import WriteBehind
+from .resilience import RETRY_STATUSES, RetryPolicy
+from .routes import RouteTable
+from .streaming import StreamResponse, aopen_stream, open_stream
+from .substitution import TemplatedSection, VarResolver, VarsSection
+
+
+class HeadersConfig(TemplatedSection, TOMLSubConfig):
     """Configuration for HTTP headers"""
     authorization: str = "Bearer ${API_KEY}"
     accept: str = "application/json"
 
     def to_headers(self):
-        return self.as_dict()
+        return self.resolved()
+
+    @property
+    def snapshot(self) -> HeaderSet:
+        """The resolved headers frozen for sending, rebuilt when the headers or vars change"""
+        snapshot = self.__dict__.get('_snapshot')
+        if snapshot is None or not snapshot.is_current():
+            snapshot = self._snapshot = HeaderSet(self)
+        return snapshot
 
 
-class Shortcuts(TOMLSubConfig):
+class Shortcuts(TemplatedSection, TOMLSubConfig):
     pass
 
 
-class RoutesConfig(TOMLSubConfig):
+class RoutesConfig(TemplatedSection, TOMLSubConfig):
     """Configuration for URLs and shortcuts"""
     base: str = None
     shortcuts: Shortcuts
@@ -32,86 +56,109 @@ class RoutesConfig(TOMLSubConfig):
     def get(self, item):
         return str(self.base + self.shortcuts[item])
 
+    @property
+    def table(self) -> RouteTable:
+        """The shortcuts compiled into URL templates, rebuilt when the routes, shortcuts or vars change"""
+        table = self.__dict__.get('_table')
+        if table is None or not table.is_current():
+            table = self._table = RouteTable(self)
+        return table
+
 
-class VarsConfig(TOMLSubConfig):
+class VarsConfig(VarsSection, TOMLSubConfig):
     """Configuration for variable substitution"""
 
 
+class RateTable(TOMLSubConfig):
+    """Per-host or per-route rates: `name = <requests per second>` or `name = {rate = ..., burst = ...}`"""
+
+
+class LimitsConfig(TOMLSubConfig):
+    """Client-side rate limiting; a rate of 0 means unlimited. `adaptive` adds an AIMD concurrency limit per host."""
+    rate: float = 0.0
+    burst: int = 0
+    adaptive: bool = False
+    max_concurrency: int = 64
+    hosts: RateTable | None = None
+    routes: RateTable | None = None
+    _optional = ("hosts", "routes")
+
+    @property
+    def limiter(self) -> Limits:
+        """The throttling state for these settings, rebuilt when they change"""
+        limiter = self.__dict__.get('_limiter')
+        if limiter is None or not limiter.is_current():
+            limiter = self._limiter = Limits.from_config(self)
+        return limiter
+
+
+class RetryConfig(TOMLSubConfig):
+    """Retries with exponential backoff and jitter for idempotent requests, and opt-in hedging: a duplicate is sent
+    once a request outlives the host's `hedge_percentile` latency and the first response wins"""
+    attempts: int = 3
+    backoff: float = 0.2
+    max_backoff: float = 10.0
+    statuses: tuple = RETRY_STATUSES
+    hedge: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_delay: float = 0.01
+
+    @property
+    def policy(self) -> RetryPolicy:
+        """The policy for these settings, rebuilt (keeping its stats) when they change"""
+        policy = self.__dict__.get('_policy')
+        if policy is None or not policy.is_current():
+            stats = policy.stats if policy is not None else None
+            policy = self._policy = RetryPolicy.from_config(self)
+            if stats is not None:
+                policy.stats = stats
+        return policy
+
+
 class APIConfig(TOMLConfig):
-    """Main API configuration with sub-configs"""
+    """Main API configuration with sub-configs.
+
+    `${VAR}`/`$VAR` placeholders in headers and routes resolve from `vars` when read; the templates are what's saved.
+    `[limits]` and `[retries]` are optional: they're only built, and only written back, when the file has them.
+    """
     headers: HeadersConfig
     routes: RoutesConfig
     vars: VarsConfig
-
-    def apply_variable_substitution(self):
-        """Apply variable substitution recursively to all dict values"""
-        vars_dict = self.vars
-        if DEBUG:
-            log.debug(f"[{self.__class__.__name__}]: Starting variable substitution with vars: {vars_dict}")
-
-        self._substitute_dict_values(self, vars_dict)
-        if DEBUG:
-            log.debug(f"[{self.__class__.__name__}]: Variable substitution complete")
-
-    def _substitute_dict_values(self, obj, vars_dict: dict):
-        """Recursively substitute variables in all string values within dict-like objects"""
-        if DEBUG:
-            log.debug(f"[{self.__class__.__name__}]: Processing dict-like object: {type(obj).__name__}")
-
-        # Handle both regular dicts and dict-like config objects
-        if hasattr(obj, 'items'):
-            items = obj.items()
-        elif hasattr(obj, '__dict__'):
-            items = obj.__dict__.items()
-        else:
-            if DEBUG:
-                log.debug(f"[{self.__class__.__name__}]: Object {type(obj).__name__} is not dict-like, skipping")
-            return
-
-        for key, value in items:
-            if key.startswith('_'):
-                continue  # Skip private attributes
-
-            if DEBUG:
-                log.debug(
-                    f"[{self.__class__.__name__}]: Processing key '{key}' with value: {value} (type: {type(value).__name__})")
-
-            if isinstance(value, str):
-                # Apply variable substitution to string
-                original_value = value
-                new_value = value
-
-                for var_key, var_val in vars_dict.items():
-                    if var_val:
-                        old_value = new_value
-                        new_value = new_value.replace(f"${{{var_key.upper()}}}", str(var_val))
-                        new_value = new_value.replace(f"${var_key.upper()}", str(var_val))
-                        if old_value != new_value and DEBUG:
-                            log.debug(
-                                f"[{self.__class__.__name__}]: Replaced '{var_key}' in '{key}': {old_value} → {new_value}")
-
-                if original_value != new_value:
-                    log.success(
-                        f"[{self.__class__.__name__}]: Final substitution for '{key}': {original_value} → {new_value}")
-                    try:
-                        if hasattr(obj, 'items'):
-                            obj[key] = new_value  # Regular dict
-                        else:
-                            setattr(obj, key, new_value)  # Config object
-                    except (AttributeError, TypeError) as e:
-                        if DEBUG:
-                            log.debug(f"[{self.__class__.__name__}]: Cannot set '{key}': {e}")
-                elif DEBUG:
-                    log.debug(f"[{self.__class__.__name__}]: No changes for '{key}'")
-
-            elif isinstance(value, (dict, object)) and not isinstance(value, (int, float, bool, list, tuple, str)):
-                # Recurse into dict-like objects
-                if DEBUG:
-                    log.debug(f"[{self.__class__.__name__}]: Recursing into '{key}'")
-                self._substitute_dict_values(value, vars_dict)
-
-            elif DEBUG:
-                log.debug(f"[{self.__class__.__name__}]: Skipping '{key}' (type: {type(value).__name__})")
+    limits: LimitsConfig | None = None
+    retries: RetryConfig | None = None
+    _optional = ("limits", "retries")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._resolver = VarResolver()
+        self._bind_resolver()
+
+    def _bind_resolver(self):
+        self._resolver.bind(dict.get(self, 'vars'), dict.get(self, 'headers'), dict.get(self, 'routes'))
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        if name in ('headers', 'routes', 'vars') and '_resolver' in self.__dict__:
+            self._bind_resolver()
+
+    def apply_variable_substitution(self) -> int:
+        """Resolve every placeholder now rather than on first read, returning how many values hold one.
+
+        Reference cycles raise ValueError here instead of on some later read; the stored templates are untouched.
+        """
+        self._bind_resolver()
+        templated = 0
+        detail = LOGS.detail
+        for section in list(self._resolver._sections.values()):
+            for key, value in dict.items(section):
+                if isinstance(value, str) and '$' in value:
+                    rendered = section[key]
+                    templated += 1
+                    if detail:
+                        log.debug(f"{self.__log_repr__}: Resolved '{key}': {value} → {rendered}")
+        if templated and LOGS.routine:
+            log.success(f"{self.__log_repr__}: Resolved variables in {templated} value(s)")
+        return templated
 
 
 class Headers:
@@ -158,9 +205,11 @@ class _API:
 class Request:
     method: str
     path: str
-    headers: dict
+    headers: Mapping
+    route: str | None = None
     force_refresh: bool = False
     kwargs: dict = field(default_factory=dict)
+    cache_key: tuple | None = None
 
     @property
     def as_dict(self) -> dict:
@@ -185,32 +234,159 @@ class Response:
             index[key] = str(value)
         return index
 
+    @classmethod
+    def from_row(cls, row) -> "Response":
+        """Rebuild a Response from a stored 'responses' table row"""
+        # Handle headers
+        headers = json.loads(row['headers']) if isinstance(row['headers'], str) else row['headers']
+
+        # Handle body - check for empty content
+        body_value = row['body']
+        if isinstance(body_value, str):
+            if body_value.strip() == "":
+                body = ""  # Keep as empty string
+            else:
+                try:
+                    body = json.loads(body_value)
+                except json.JSONDecodeError:
+                    body = body_value  # Keep as string if not valid JSON
+        else:
+            body = body_value
+
+        return cls(
+            status=int(row['status']),
+            method=row['method'],
+            headers=headers,
+            body=body
+        )
+
+
+class ResponseIndex:
+    """Hash index over the database's 'responses' table on (method, path).
+
+    Built from the table on first lookup, then kept current by `add()` so hits never scan the table.
+    The newest row wins for a given key.
+    """
+
+    def __init__(self, load_table):
+        self._load_table = load_table
+        self._index: dict[tuple[str, str], Response | dict] | None = None
+        self._pending: dict[tuple[str, str], Response] = {}
+
+    def __len__(self):
+        return len(self._built)
+
+    @property
+    def _built(self) -> dict:
+        if self._index is None:
+            df = self._load_table()
+            columns = list(df.columns)
+            # Column-wise tolist() is far cheaper than materializing a dict per row up front
+            rows = zip(*(df[c].tolist() for c in columns))
+            keys = zip(df['method'].tolist(), df['path'].tolist())
+            self._index = dict(zip(keys, ((columns, row) for row in rows)))
+            # Responses added before the first lookup may not have reached the table yet
+            self._index.update(self._pending)
+            self._pending.clear()
+        return self._index
+
+    def get(self, method: str, path: str) -> Response | None:
+        entry = self._built.get((method, path))
+        if entry is None or isinstance(entry, Response):
+            return entry
+        # Deserialize a loaded row once, then keep the Response
+        columns, row = entry
+        response = self._index[(method, path)] = Response.from_row(dict(zip(columns, row)))
+        return response
+
+    def add(self, method: str, path: str, response: Response):
+        (self._pending if self._index is None else self._index)[(method, path)] = response
+
 
 class Receptionist(_API):
-    cache: dict[str | Response] = {}
+    cache: ResponseCache
     database: Any
 
-    def __init__(self, config: APIConfig | Path | None = None, database: bool = False):
+    def __init__(
+            self,
+            config: APIConfig | Path | None = None,
+            database: bool = False,
+            limits: httpx.Limits = None,
+            http2: bool = False,
+            timeout: float | httpx.Timeout = None,
+            cache_bytes: int = 64 * 1024 * 1024,
+            cache_policy: str = "lru",
+            cache_ttl: float | None = None,
+            write_batch_size: int = 100,
+            write_interval: float = 1.0,
+            write_queue: int = 10_000,
+            max_workers: int = 16,
+            rate_limits: Limits = None,
+            retries: RetryPolicy = None,
+            instrumentation: Instrumentation = None
+    ):
         _API.__init__(self, config)
+        self.clients = ClientPool(limits=limits, http2=http2, timeout=timeout)
+        self.cache = ResponseCache(max_bytes=cache_bytes, policy=cache_policy, default_ttl=cache_ttl)
+        self.executor = ManagedExecutor(max_workers, name="receptionist")
+        self._rate_limits = rate_limits
+        self._retries = retries
+        self._hedge_executor = ManagedExecutor(max_workers, name="receptionist-hedge")
+        self.instrumentation = instrumentation or Instrumentation()
+        self._inflight = AsyncCoalescer()
+        self._sync_inflight = SyncCoalescer()
 
-        from p2d2 import Database, Table, Schema
+        if database:
+            # p2d2 brings pandas with it, so it's only imported for database mode
+            from p2d2 import Database, Table, Schema
 
-        class ResponseFields(Table):
-            path: str
-            status: str
-            method: str
-            headers: str
-            body: str
+            class ResponseFields(Table):
+                path: str
+                status: str
+                method: str
+                headers: str
+                body: str
 
-        class APISchema(Schema):
-            responses: ResponseFields
+            class APISchema(Schema):
+                responses: ResponseFields
 
-        if database:
             self.database: Database = Database(APISchema)
+            self.responses = ResponseIndex(lambda: self.database.get_table("responses"))
+            self.writer = WriteBehind(
+                self._persist, batch_size=write_batch_size, interval=write_interval,
+                max_queue=write_queue, name=f"{self} writer"
+            )
 
     def __repr__(self):
         return f"[{self.__class__.__name__}]"
 
+    def close(self):
+        """Flush pending database writes, stop batch workers and close the pooled connections"""
+        self.executor.shutdown()
+        self._hedge_executor.shutdown(wait=False)
+        if self.database_enabled:
+            self.writer.close()
+        self.clients.close()
+
+    async def aclose(self):
+        await asyncio.to_thread(self.executor.shutdown)
+        self._hedge_executor.shutdown(wait=False)
+        if self.database_enabled:
+            await asyncio.to_thread(self.writer.close)
+        await self.clients.aclose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
     @property
     def database_enabled(self):
         return bool(getattr(self, "database", None))
@@ -219,89 +395,81 @@ class Receptionist(_API):
     def cache_enabled(self):
         return not self.database_enabled
 
+    @property
+    def rate_limits(self) -> Limits | None:
+        """Limits passed in, else those of the config's `[limits]` section, if it has one"""
+        if self._rate_limits is not None:
+            return self._rate_limits
+        section = dict.get(self.config, 'limits')
+        return section.limiter if section is not None else None
+
+    @property
+    def retry_policy(self) -> RetryPolicy | None:
+        """Policy passed in, else that of the config's `[retries]` section, if it has one; otherwise no retries"""
+        if self._retries is not None:
+            return self._retries
+        section = dict.get(self.config, 'retries')
+        return section.policy if section is not None else None
+
+    def prometheus(self) -> str:
+        """Request metrics, plus retry and hedging counters, in the Prometheus text format"""
+        text = self.instrumentation.prometheus()
+        if (policy := self.retry_policy) is not None:
+            text += prometheus_counters(f"{self.instrumentation.prefix}_retry", policy.stats.as_dict())
+        return text
+
+    def _label(self, request: Request) -> str:
+        """Metrics label for a request: the shortcut it was made with, "/" for the base URL, and "other" for any
+        other route, whose paths (ids, queries) would each make a series of their own"""
+        if not request.route:
+            return "/"
+        return request.route if request.route in self.config.routes.table else OTHER_ROUTE
+
+    def _slot(self, request: Request):
+        limits = self.rate_limits
+        return limits.slot(request.path, request.route) if limits is not None else UNLIMITED
+
     def _build_path(self, route: str = None, append: str = "", format: dict = None):
         """Build the full request path"""
-        if not route:
-            path = self.config.routes.base
-        else:
-            try:
-                path = self.config.routes.get(route)
-            except KeyError:
-                path = self.config.routes.base + str(route)
-
-        if format:
-            path = path.format(**format)
-        if append:
-            path += append
-        return path
-
-    def _build_headers(self, append_headers: dict = None, override_headers: dict = None):
-        """Build request headers"""
+        return self.config.routes.table.build(route, append, format)
+
+    def _build_headers(self, append_headers: dict = None, override_headers: dict = None) -> Mapping:
+        """Build request headers: the frozen config headers, with any per-request ones layered on top"""
         if override_headers:
             return override_headers
+        return self.config.headers.snapshot.overlay(append_headers)
 
-        headers = self.config.headers.to_headers()
-        if append_headers:
-            headers.update(append_headers)
-        return headers
-
-    def _check_cache(self, path: str, method: str, force_refresh: bool):
+    def _check_cache(self, request: Request):
         """Check cache for existing response"""
-        if force_refresh:
+        if request.force_refresh:
             return None
+        path, method = request.path, request.method
 
         if self.database_enabled:
-            from p2d2 import Database
-            df = self.database.get_table("responses")
-            match = df[(df['path'] == path) & (df['method'] == method)]
-            if not match.empty:
-                first_match = match.iloc[0]
-                log.debug(f"{self}: Database hit for {method.upper()} {path}")
-                try:
-                    # Handle headers
-                    headers = json.loads(first_match['headers']) if isinstance(first_match['headers'], str) else \
-                    first_match['headers']
-
-                    # Handle body - check for empty content
-                    body_value = first_match['body']
-                    if isinstance(body_value, str):
-                        if body_value.strip() == "":
-                            body = ""  # Keep as empty string
-                        else:
-                            try:
-                                body = json.loads(body_value)
-                            except json.JSONDecodeError:
-                                body = body_value  # Keep as string if not valid JSON
-                    else:
-                        body = body_value
-
-                    return Response(
-                        status=int(first_match['status']),
-                        method=first_match['method'],
-                        headers=headers,
-                        body=body
-                    )
-                except (json.JSONDecodeError, ValueError) as e:
-                    log.warning(f"{self}: Error deserializing cached response: {e}")
-                    return None
-            return None
-
-        elif self.cache_enabled:
-            if path not in self.cache:
+            try:
+                cached = self.responses.get(method, path)
+            except (json.JSONDecodeError, ValueError) as e:
+                log.warning(f"{self}: Error deserializing cached response: {e}")
                 return None
+            if cached:
+                if LOGS.routine:
+                    log.debug(f"{self}: Database hit for {method.upper()} {path}")
+                self.instrumentation.cache_hit(method, self._label(request), path)
+            return cached
 
-            cached = self.cache[path]
-            if cached.method == method:
-                log.debug(f"{self}: Cache hit for {method.upper()} {path}")
-                return cached
-            else:
-                log.warning(f"{self}: Cache method mismatch: {cached.method} != {method}")
+        elif self.cache_enabled:
+            if request.cache_key is None:
                 return None
+            if cached := self.cache.get(request.cache_key, request.headers):
+                if LOGS.routine:
+                    log.debug(f"{self}: Cache hit for {method.upper()} {path}")
+                self.instrumentation.cache_hit(method, self._label(request), path)
+            return cached
 
         log.warning(f"{self}: Neither cache nor database enabled")
         return None
 
-    def _make_response(self, request: Request, httpx_response, method: str, signature: str = None) -> Response:
+    def _make_response(self, request: Request, httpx_response, method: str) -> Response:
         """Convert httpx response to our Response object"""
         try:
             content_type = httpx_response.headers.get("Content-Type", "")
@@ -322,19 +490,25 @@ class Receptionist(_API):
             log.warning(f"{self}: Response decode error: {e}")
             raise
 
-        resp = Response(
+        return Response(
             status=httpx_response.status_code,
             method=method,
             headers=dict(httpx_response.headers),
             body=content,
         )
 
-        if self.database_enabled:
-            data = resp.as_dict
-            data["path"] = request.path
+    @staticmethod
+    def _row(request: Request, resp: Response, signature: str = None) -> tuple[str, dict]:
+        data = resp.as_dict
+        data["path"] = request.path
+        return signature, data
+
+    def _persist(self, batch: list[tuple[str, dict]]):
+        """Write-behind target: store a batch of (signature, row) pairs in the database"""
+        from p2d2 import Database
+        self.database: Database
+        for signature, data in batch:
             try:
-                from p2d2 import Database
-                self.database: Database
                 self.database.create("responses", signature, **data)
             except ValueError as e:
                 if "Must have equal len keys and value" in str(e):
@@ -343,29 +517,108 @@ class Receptionist(_API):
                     log.error(f"Data values: {list(data.values())}")
                     log.error(f"Data: {data}")
 
-        return resp
-
-    def _prep_request(self, method: str, **kwargs):
-        """Prepare request parameters"""
-        request = Request(
+    def _new_request(self, method: str, kwargs: dict) -> Request:
+        route = kwargs.pop('route', None)
+        return Request(
             method=method,
-            path=self._build_path(kwargs.pop('route', None),
+            path=self._build_path(route,
                                   kwargs.pop('append', ''),
                                   kwargs.pop('format', None)),
             headers=self._build_headers(kwargs.pop('append_headers', None),
                                         kwargs.pop('override_headers', None)),
+            route=route,
             force_refresh=kwargs.pop('force_refresh', False),
             kwargs=kwargs
         )
 
-        log.info(f"{self}: {request.method.upper()} request to {request.path}")
+    def _prep_request(self, method: str, **kwargs):
+        """Prepare request parameters"""
+        request = self._new_request(method, kwargs)
+        if 'files' not in kwargs:
+            request.cache_key = request_key(
+                request.method, request.path, kwargs.get('params'),
+                kwargs.get('json'), kwargs.get('data'), kwargs.get('content')
+            )
+
+        if LOGS.routine:
+            log.info(f"{self}: {request.method.upper()} request to {request.path}")
 
         # Check cache first
-        if cached := self._check_cache(request.path, request.method, request.force_refresh):
+        if cached := self._check_cache(request):
             return cached
 
         return request
 
+    def _complete(self, request: Request, httpx_response) -> Response:
+        """Turn the httpx response into a Response and remember it; database rows are queued by the caller"""
+        out = self._make_response(request, httpx_response, request.method)
+        if self.database_enabled:
+            self.responses.add(request.method, request.path, out)
+        elif self.cache_enabled and request.cache_key is not None and out.status < 500:
+            size = len(httpx_response.content) + sum(len(k) + len(v) for k, v in httpx_response.headers.raw)
+            self.cache.put(request.cache_key, out, out.headers, request.headers, size=size)
+        return out
+
+    @staticmethod
+    def _coalesce_key(request: Request):
+        """Identical safe requests in flight at the same time share one network call"""
+        if request.cache_key is None or request.method.upper() not in COALESCE_METHODS:
+            return None
+        return request.cache_key, headers_key(request.headers)
+
+    def _sync_attempt(self, request: Request) -> httpx.Response:
+        instrumentation = self.instrumentation
+        with self._slot(request) as slot:
+            timing = instrumentation.start(request.method, self._label(request), request.path)
+            try:
+                response = self.clients.client.request(
+                    request.method.upper(), request.path, headers=encoded(request.headers),
+                    **instrumentation.extensions(timing, request.kwargs)
+                )
+            except Exception as e:
+                instrumentation.fail(timing, e)
+                raise
+            slot.record(response)
+        instrumentation.finish(timing, response)
+        return response
+
+    async def _attempt(self, request: Request) -> httpx.Response:
+        instrumentation = self.instrumentation
+        async with self._slot(request) as slot:
+            timing = instrumentation.start(request.method, self._label(request), request.path)
+            try:
+                response = await self.clients.async_client.request(
+                    request.method.upper(), request.path, headers=encoded(request.headers),
+                    **instrumentation.extensions(timing, request.kwargs, is_async=True)
+                )
+            except Exception as e:
+                instrumentation.fail(timing, e)
+                raise
+            slot.record(response)
+        instrumentation.finish(timing, response)
+        return response
+
+    def _sync_send(self, request: Request, signature: str = None) -> Response:
+        if (policy := self.retry_policy) is not None:
+            response = policy.run(request.method, request.path, lambda: self._sync_attempt(request),
+                                  self._hedge_executor.pool if policy.hedge else None)
+        else:
+            response = self._sync_attempt(request)
+        out = self._complete(request, response)
+        if self.database_enabled:
+            self.writer.put(self._row(request, out, signature))
+        return out
+
+    async def _send(self, request: Request, signature: str = None) -> Response:
+        if (policy := self.retry_policy) is not None:
+            response = await policy.arun(request.method, request.path, lambda: self._attempt(request))
+        else:
+            response = await self._attempt(request)
+        out = self._complete(request, response)
+        if self.database_enabled:
+            await self.writer.aput(self._row(request, out, signature))
+        return out
+
     def sync_api_request(self, method: str, signature: str = None, **kwargs) -> Response | None:
         result = self._prep_request(method, **kwargs)
 
@@ -373,13 +626,9 @@ class Receptionist(_API):
             return result
         elif isinstance(result, Request):
             request: Request = result
-            with httpx.Client(headers=request.headers) as client:
-                response = client.request(request.method.upper(), request.path, **request.kwargs)
-
-            out = self._make_response(request, response, request.method, signature=signature)
-            if self.cache_enabled:
-                self.cache[request.path] = out
-            return out
+            if key := self._coalesce_key(request):
+                return self._sync_inflight.run(key, lambda: self._sync_send(request, signature))
+            return self._sync_send(request, signature)
 
     async def api_request(self, method: str, signature: str = None, **kwargs) -> Response:
         result = self._prep_request(method, **kwargs)
@@ -390,13 +639,83 @@ class Receptionist(_API):
 
         # Otherwise it's a Request object, make the request
         request: Request = result
-        async with httpx.AsyncClient(headers=request.headers) as client:
-            response = await client.request(request.method.upper(), request.path, **request.kwargs)
-
-        out = self._make_response(request, response, request.method, signature=signature)
-        if self.cache_enabled:
-            self.cache[request.path] = out
-        return out
+        if key := self._coalesce_key(request):
+            return await self._inflight.run(key, lambda: self._send(request, signature))
+        return await self._send(request, signature)
+
+    def _batch_calls(self, requests: list[dict], call, per_host: int = None) -> list:
+        """Pair each request spec ({'method': 'get', 'route': ..., **kwargs}) with its host and a call"""
+        calls = []
+        for spec in requests:
+            spec = dict(spec)
+            method = spec.pop('method', 'get')
+            host = None
+            if per_host:
+                host = urlsplit(self._build_path(spec.get('route'), spec.get('append', ''), spec.get('format'))).netloc
+            calls.append((host, lambda method=method, spec=spec: call(method, **spec)))
+        return calls
+
+    async def api_batch_iter(
+            self, requests: list[dict], concurrency: int = 10, per_host: int = None
+    ) -> AsyncIterator[tuple[int, Response | Exception]]:
+        """Run many requests concurrently, yielding (index, response or exception) as each completes"""
+        calls = self._batch_calls(requests, self.api_request, per_host)
+        async for index, result in gather_limited(calls, concurrency, per_host):
+            yield index, result
+
+    async def api_batch(self, requests: list[dict], concurrency: int = 10, per_host: int = None) -> list:
+        """Run many requests concurrently; results (responses or exceptions) come back in request order"""
+        results = [None] * len(requests)
+        async for index, result in self.api_batch_iter(requests, concurrency, per_host):
+            results[index] = result
+        return results
+
+    def sync_api_batch_iter(
+            self, requests: list[dict], concurrency: int = 10, per_host: int = None
+    ) -> Iterator[tuple[int, Response | Exception]]:
+        """`api_batch_iter` for sync code, run on the instance's thread pool"""
+        calls = self._batch_calls(requests, self.sync_api_request, per_host)
+        yield from threaded_limited(self.executor.pool, calls, concurrency, per_host)
+
+    def sync_api_batch(self, requests: list[dict], concurrency: int = 10, per_host: int = None) -> list:
+        results = [None] * len(requests)
+        for index, result in self.sync_api_batch_iter(requests, concurrency, per_host):
+            results[index] = result
+        return results
+
+    @contextmanager
+    def sync_api_stream(
+            self, method: str, mode: str = "bytes", chunk_size: int = None, **kwargs
+    ) -> Iterator[StreamResponse]:
+        """Open a request and iterate its body (as bytes, text, lines, NDJSON records or JSON array items)
+        without holding it in memory. Streamed responses skip the cache and the database, but not the rate limits
+        (the slot is held until the block exits) or instrumentation.
+
+            with api.sync_api_stream("get", route="export", mode="ndjson") as stream:
+                for record in stream: ...
+        """
+        kwargs.pop('signature', None)
+        request = self._new_request(method, kwargs)
+        if LOGS.routine:
+            log.info(f"{self}: Streaming {request.method.upper()} request to {request.path}")
+        with open_stream(self.clients.client, self._slot(request), self.instrumentation, request.method,
+                         request.path, self._label(request), encoded(request.headers), request.kwargs,
+                         mode, chunk_size) as stream:
+            yield stream
+
+    @asynccontextmanager
+    async def api_stream(
+            self, method: str, mode: str = "bytes", chunk_size: int = None, **kwargs
+    ) -> AsyncIterator[StreamResponse]:
+        """`sync_api_stream` for async code; iterate the stream with `async for`"""
+        kwargs.pop('signature', None)
+        request = self._new_request(method, kwargs)
+        if LOGS.routine:
+            log.info(f"{self}: Streaming {request.method.upper()} request to {request.path}")
+        async with aopen_stream(self.clients.async_client, self._slot(request), self.instrumentation, request.method,
+                                request.path, self._label(request), encoded(request.headers), request.kwargs,
+                                mode, chunk_size) as stream:
+            yield stream
 
     # Async methods
     async def api_get(self, route=None, signature: str = None, **kwargs):
@@ -0,0 +1,124 @@
+from collections.abc import Mapping
+from functools import cached_property
+from importlib import import_module
+from importlib.util import find_spec
+from pathlib import Path
+
+from loguru import logger as log
+
+from . import REPR
+from .logs import LOGS
+
+
+class TOMLBackend:
+    """A TOML parser and/or serializer provided by an importable module"""
+
+    def __init__(self, name: str, module: str, loads: str = None, dumps: str = None):
+        self.name = name
+        self.module = module
+        self._loads = loads
+        self._dumps = dumps
+
+    def __repr__(self):
+        return f"[TOMLBackend: {self.name}]"
+
+    @cached_property
+    def available(self) -> bool:
+        return find_spec(self.module) is not None
+
+    @property
+    def can_read(self) -> bool:
+        return self._loads is not None
+
+    @property
+    def can_write(self) -> bool:
+        return self._dumps is not None
+
+    @cached_property
+    def lib(self):
+        return import_module(self.module)
+
+    def loads(self, text: str) -> dict:
+        if not self.can_read:
+            raise TypeError(f"{self} cannot parse TOML")
+        return getattr(self.lib, self._loads)(text)
+
+    def dumps(self, data: dict) -> str:
+        if not self.can_write:
+            raise TypeError(f"{self} cannot serialize TOML")
+        return getattr(self.lib, self._dumps)(data)
+
+
+# Listed fastest first; the first available one for each direction is used unless overridden
+BACKENDS: dict[str, TOMLBackend] = {
+    "rtoml": TOMLBackend("rtoml", "rtoml", loads="loads", dumps="dumps"),
+    "tomllib": TOMLBackend("tomllib", "tomllib", loads="loads"),
+    "tomli_w": TOMLBackend("tomli_w", "tomli_w", dumps="dumps"),
+    "toml": TOMLBackend("toml", "toml", loads="loads", dumps="dumps"),
+}
+
+_reader: TOMLBackend | None = None
+_writer: TOMLBackend | None = None
+
+
+def register_backend(backend: TOMLBackend, first: bool = False):
+    """Add a backend; with `first=True` it is preferred over the built-in ones"""
+    global BACKENDS
+    others = {k: v for k, v in BACKENDS.items() if k != backend.name}
+    BACKENDS = {backend.name: backend, **others} if first else {**others, backend.name: backend}
+    set_backend()
+
+
+def _pick(name: str | None, capable: str) -> TOMLBackend:
+    if name:
+        try:
+            backend = BACKENDS[name]
+        except KeyError:
+            raise ValueError(f"Unknown TOML backend '{name}', expected one of {list(BACKENDS)}") from None
+        if not backend.available or not getattr(backend, capable):
+            raise ValueError(f"TOML backend '{name}' is not installed or does not support this")
+        return backend
+    for backend in BACKENDS.values():
+        if backend.available and getattr(backend, capable):
+            return backend
+    raise RuntimeError(f"No TOML backend available ({capable})")
+
+
+def set_backend(reader: str = None, writer: str = None):
+    """Select backends by name; `None` falls back to the fastest installed one"""
+    global _reader, _writer
+    _reader = _pick(reader, "can_read")
+    _writer = _pick(writer, "can_write")
+    if LOGS.routine:
+        log.debug(f"{REPR}: Using {_reader} for reads and {_writer} for writes")
+
+
+def get_reader() -> TOMLBackend:
+    if _reader is None: set_backend()
+    return _reader
+
+
+def get_writer() -> TOMLBackend:
+    if _writer is None: set_backend()
+    return _writer
+
+
+def to_plain(data):
+    """Convert config objects into plain dicts, dropping None values TOML cannot represent"""
+    if isinstance(data, Mapping):
+        return {str(k): to_plain(v) for k, v in data.items() if v is not None}
+    if isinstance(data, (list, tuple)):
+        return [to_plain(v) for v in data if v is not None]
+    return data
+
+
+def loads(text: str) -> dict:
+    return get_reader().loads(text)
+
+
+def dumps(data: dict) -> str:
+    return get_writer().dumps(to_plain(data))
+
+
+def load(path: Path) -> dict:
+    return loads(path.read_bytes().decode('utf-8'))
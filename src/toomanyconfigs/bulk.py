@@ -0,0 +1,153 @@
+import glob
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from loguru import logger as log
+
+from . import REPR
+from . import backends
+from .logs import LOGS
+
+
+def _collect(source) -> tuple[Path, list[Path]]:
+    """A directory (its *.toml files), a glob pattern, or an iterable of paths, with the root their names are
+    relative to: the directory, the glob's fixed leading directories, or the paths' common parent"""
+    if isinstance(source, (str, os.PathLike)):
+        path = Path(source)
+        if path.is_dir():
+            return path, sorted(path.glob("*.toml"))
+        if glob.has_magic(str(source)):
+            fixed = []
+            for part in path.parts:
+                if glob.has_magic(part):
+                    break
+                fixed.append(part)
+            return Path(*fixed), sorted(Path(p) for p in glob.glob(str(source), recursive=True))
+        return path.parent, [path]
+    paths = [Path(p) for p in source]
+    try:
+        root = Path(os.path.commonpath([p.parent for p in paths])) if paths else Path()
+    except ValueError:
+        # Mixed drives, or absolute and relative paths
+        root = Path()
+    return root, paths
+
+
+def _name(path: Path, root: Path) -> str:
+    """`path` relative to `root`, without the suffix, so files sharing a stem in different directories stay apart"""
+    try:
+        path = path.relative_to(root)
+    except ValueError:
+        pass
+    return path.with_suffix("").as_posix()
+
+
+def _init_worker(reader: str, writer: str, mode: str):
+    """Give a worker process the parent's TOML backends and log mode"""
+    LOGS.set(mode)
+    backends.set_backend(reader, writer)
+
+
+def _load_chunk(cls, paths: list[Path]) -> list[tuple[Path, object]]:
+    """Parse and build each file, returning the error in its place if it fails"""
+    backend = backends.get_reader()
+    loaded = []
+    for path in paths:
+        try:
+            data = backend.loads(path.read_bytes().decode('utf-8'))
+            loaded.append((path, cls.create(
+                _source=path, _data=data, prompt_empty_fields=False, memoize=False, write=False
+            )))
+        except Exception as e:
+            loaded.append((path, e))
+    return loaded
+
+
+def _picklable(cls) -> bool:
+    try:
+        pickle.dumps(cls)
+    except Exception:
+        return False
+    return True
+
+
+def iter_load_many(cls, source, workers: int = None, chunksize: int = None) -> Iterator[tuple[str, object]]:
+    """Build a `cls` config from each file in `source`, yielding `(name, config)` as each one is ready.
+
+    Chunks of files are parsed and built in a process pool and the configs come back pickled, so `cls` has to be
+    importable by the workers (defined at module level); otherwise everything runs here. Files are only read:
+    prompting is off, nothing is written back and nothing is memoized. A file that fails is yielded with its
+    exception instead of stopping the batch. The name is the file's path relative to `source` without `.toml`:
+    its stem for a flat directory, `a/app` and `b/app` for `a/app.toml` and `b/app.toml` under a recursive glob.
+    """
+    root, paths = _collect(source)
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, min(256, len(paths) // (workers * 4)))
+    chunks = [paths[i:i + chunksize] for i in range(0, len(paths), chunksize)]
+
+    if workers > 1 and len(chunks) > 1 and not _picklable(cls):
+        log.warning(f"{REPR}: {cls.__name__} can't be pickled for worker processes, loading in this one")
+        workers = 1
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            for path, outcome in _load_chunk(cls, chunk):
+                yield _name(path, root), outcome
+        return
+
+    settings = (backends.get_reader().name, backends.get_writer().name, LOGS.mode)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=settings)
+    try:
+        futures = {pool.submit(_load_chunk, cls, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                loaded = future.result()
+            except Exception as e:
+                # The whole chunk was lost (a worker died, or a result didn't pickle)
+                loaded = [(path, e) for path in futures[future]]
+            for path, outcome in loaded:
+                yield _name(path, root), outcome
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+@dataclass
+class LoadResult:
+    """Configs built by `load_many`, keyed by name (see `iter_load_many`), and the error for each file that failed"""
+    configs: dict = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def __repr__(self):
+        return f"[LoadResult: {len(self.configs)} loaded, {len(self.errors)} failed in {self.elapsed:.2f}s]"
+
+    def __getitem__(self, name: str):
+        return self.configs[name]
+
+    def __len__(self):
+        return len(self.configs)
+
+
+def load_many(cls, source, workers: int = None, chunksize: int = None) -> LoadResult:
+    """Build every config in `source` (a directory, glob or iterable of paths) in parallel; see `iter_load_many`"""
+    started = time.perf_counter()
+    result = LoadResult()
+    for name, outcome in iter_load_many(cls, source, workers, chunksize):
+        if isinstance(outcome, Exception):
+            result.errors[name] = outcome
+        else:
+            result.configs[name] = outcome
+    result.elapsed = time.perf_counter() - started
+
+    if LOGS.routine:
+        log.info(f"{REPR}: Loaded {len(result.configs)} {cls.__name__} config(s) from {source} "
+                 f"in {result.elapsed:.2f}s")
+    if result.errors:
+        log.warning(f"{REPR}: {len(result.errors)} file(s) failed to load: "
+                    + ", ".join(f"{name} ({type(e).__name__})" for name, e in list(result.errors.items())[:10])
+                    + (", ..." if len(result.errors) > 10 else ""))
+    return result
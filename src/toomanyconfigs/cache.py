@@ -0,0 +1,247 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping
+
+import httpx
+
+CacheKey = tuple
+
+
+@dataclass
+class CacheEntry:
+    key: CacheKey
+    value: Any
+    size: int
+    expires: float | None = None
+    hits: int = 0
+
+
+def request_key(method: str, url: str, params=None, json_body=None, data=None, content=None) -> CacheKey | None:
+    """Identity of a request for caching: method, URL, sorted query and a digest of the body.
+
+    Returns None for requests that can't be keyed reliably (streamed or file bodies).
+    """
+    parsed = httpx.URL(url)
+    if params:
+        parsed = parsed.copy_merge_params(params)
+    query = tuple(sorted(parsed.params.multi_items()))
+    base = str(parsed.copy_with(query=None, fragment=None))
+
+    if json_body is not None:
+        body = json.dumps(json_body, sort_keys=True, default=str).encode()
+    elif data is not None:
+        body = json.dumps(data, sort_keys=True, default=str).encode() if isinstance(data, Mapping) else None
+    elif content is not None:
+        body = content.encode() if isinstance(content, str) else content
+    else:
+        body = b""
+    if not isinstance(body, bytes):
+        return None
+
+    digest = hashlib.blake2b(body, digest_size=16).digest() if body else b""
+    return method.upper(), base, query, digest
+
+
+def _header(headers: Mapping, name: str):
+    for k, v in headers.items():
+        if k.lower() == name:
+            return v
+    return None
+
+
+def freshness(headers: Mapping, default_ttl: float | None) -> float | None | bool:
+    """Seconds a response may be reused per Cache-Control/Expires; False when it must not be stored"""
+    cache_control = _header(headers, "cache-control")
+    if cache_control:
+        directives = {}
+        for part in cache_control.lower().split(","):
+            name, _, value = part.strip().partition("=")
+            directives[name] = value.strip('"')
+        if "no-store" in directives or "no-cache" in directives:
+            return False
+        if "max-age" in directives:
+            try:
+                return max(0, int(directives["max-age"])) or False
+            except ValueError:
+                return False
+
+    expires = _header(headers, "expires")
+    if expires is not None:
+        try:
+            expires_at = parsedate_to_datetime(expires).timestamp()
+            date = _header(headers, "date")
+            now = parsedate_to_datetime(date).timestamp() if date else time.time()
+        except (TypeError, ValueError):
+            # Invalid dates such as "0" or "-1" mean already expired
+            return False
+        return (expires_at - now) if expires_at > now else False
+
+    return default_ttl
+
+
+class ResponseCache:
+    """Bounded response cache: LRU or LFU eviction under a byte budget, TTLs from Cache-Control/Expires, Vary-aware keys"""
+
+    def __init__(
+            self,
+            max_bytes: int = 64 * 1024 * 1024,
+            max_entries: int = 10_000,
+            policy: str = "lru",
+            default_ttl: float | None = None,
+            respect_headers: bool = True
+    ):
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Unknown cache policy '{policy}', expected 'lru' or 'lfu'")
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.policy = policy
+        self.default_ttl = default_ttl
+        self.respect_headers = respect_headers
+
+        self._entries: dict[CacheKey, CacheEntry] = {}
+        self._vary: dict[CacheKey, tuple[str, ...]] = {}
+        self._variants: dict[CacheKey, set[CacheKey]] = {}
+        self._order: OrderedDict[CacheKey, None] = OrderedDict()  # recency, lru
+        self._freqs: dict[int, OrderedDict[CacheKey, None]] = {}  # hit count buckets, lfu
+        self._min_freq = 0
+        self._lock = threading.RLock()
+
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __repr__(self):
+        return f"[ResponseCache: {len(self)} entries, {self.bytes}/{self.max_bytes} bytes, {self.policy}]"
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _vary_values(names: tuple[str, ...], request_headers: Mapping) -> tuple:
+        if not names:
+            return ()
+        lowered = {k.lower(): v for k, v in request_headers.items()}
+        return tuple(lowered.get(name) for name in names)
+
+    def get(self, key: CacheKey, request_headers: Mapping = None):
+        with self._lock:
+            names = self._vary.get(key)
+            entry = None
+            if names is not None:
+                entry = self._entries.get((key, self._vary_values(names, request_headers or {})))
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires is not None and entry.expires <= time.monotonic():
+                self._remove(entry.key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._touch(entry)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: CacheKey, value, response_headers: Mapping, request_headers: Mapping = None, size: int = 0):
+        ttl = freshness(response_headers, self.default_ttl) if self.respect_headers else self.default_ttl
+        vary = _header(response_headers, "vary") if self.respect_headers else None
+        names = tuple(sorted(n.strip().lower() for n in vary.split(",") if n.strip())) if vary else ()
+        if ttl is False or "*" in names or size > self.max_bytes:
+            return False
+
+        with self._lock:
+            if self._vary.get(key, names) != names:
+                # The resource changed what it varies on; old variants are keyed differently
+                for full in list(self._variants.get(key, ())):
+                    self._remove(full)
+            # Drop the response being replaced before recording the Vary names: removing a key's last variant
+            # forgets them
+            full = (key, self._vary_values(names, request_headers or {}))
+            self._remove(full)
+            # Make room first: under LFU the newcomer has the fewest hits and would be its own victim
+            while self._entries and (self.bytes + size > self.max_bytes or len(self._entries) >= self.max_entries):
+                self._remove(self._victim())
+                self.evictions += 1
+            self._vary[key] = names
+
+            entry = CacheEntry(full, value, size, time.monotonic() + ttl if ttl else None)
+            self._entries[full] = entry
+            self._variants.setdefault(key, set()).add(full)
+            self.bytes += size
+            if self.policy == "lru":
+                self._order[full] = None
+            else:
+                self._freqs.setdefault(0, OrderedDict())[full] = None
+                self._min_freq = 0
+        return True
+
+    def invalidate(self, key: CacheKey = None):
+        """Drop every variant of `key`, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                for full in list(self._entries):
+                    self._remove(full)
+            else:
+                for full in list(self._variants.get(key, ())):
+                    self._remove(full)
+
+    clear = invalidate
+
+    def _touch(self, entry: CacheEntry):
+        if self.policy == "lru":
+            self._order.move_to_end(entry.key)
+            return
+        bucket = self._freqs[entry.hits]
+        del bucket[entry.key]
+        if not bucket:
+            del self._freqs[entry.hits]
+            if self._min_freq == entry.hits:
+                self._min_freq = entry.hits + 1
+        entry.hits += 1
+        self._freqs.setdefault(entry.hits, OrderedDict())[entry.key] = None
+
+    def _victim(self) -> CacheKey:
+        if self.policy == "lru":
+            return next(iter(self._order))
+        while self._min_freq not in self._freqs:
+            self._min_freq = min(self._freqs)
+        return next(iter(self._freqs[self._min_freq]))
+
+    def _remove(self, full: CacheKey):
+        entry = self._entries.pop(full, None)
+        if entry is None:
+            return
+        self.bytes -= entry.size
+        key = full[0]
+        variants = self._variants.get(key)
+        if variants is not None:
+            variants.discard(full)
+            if not variants:
+                del self._variants[key]
+                self._vary.pop(key, None)
+        if self.policy == "lru":
+            self._order.pop(full, None)
+        else:
+            bucket = self._freqs.get(entry.hits)
+            if bucket is not None:
+                bucket.pop(full, None)
+                if not bucket:
+                    del self._freqs[entry.hits]
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import weakref
+
+import httpx
+from loguru import logger as log
+
+DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+
+
+class ClientPool:
+    """Long-lived sync and async httpx clients sharing pool limits, keep-alive expiry and HTTP/2 settings"""
+
+    def __init__(self, limits: httpx.Limits = None, http2: bool = False, timeout: float | httpx.Timeout = None):
+        self.limits = limits or DEFAULT_LIMITS
+        self.http2 = http2
+        self.timeout = timeout
+        self._setup()
+
+    def _setup(self):
+        self._client: httpx.Client | None = None
+        # An AsyncClient's connections belong to the loop that opened them, so keep one per loop
+        self._async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"[ClientPool: http2={self.http2}, {self.limits}]"
+
+    def __getstate__(self):
+        # Clients and locks don't pickle; they are rebuilt lazily after unpickling
+        return {"limits": self.limits, "http2": self.http2, "timeout": self.timeout}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup()
+
+    def _client_kwargs(self) -> dict:
+        kwargs = {"limits": self.limits, "http2": self.http2}
+        if self.timeout is not None:
+            kwargs["timeout"] = self.timeout
+        return kwargs
+
+    def _build(self, client_cls):
+        try:
+            return client_cls(**self._client_kwargs())
+        except ImportError as e:
+            # http2=True without the 'h2' extra installed
+            log.warning(f"{self}: HTTP/2 unavailable, falling back to HTTP/1.1: {e}")
+            self.http2 = False
+            return client_cls(**self._client_kwargs())
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._build(httpx.Client)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = self._async_clients[loop] = self._build(httpx.AsyncClient)
+        return client
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        self.close()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        for client_loop, client in list(self._async_clients.items()):
+            if client_loop is loop:
+                await client.aclose()
+        # Clients of other loops can't be awaited from here; their connections die with those loops
+        self._async_clients.clear()
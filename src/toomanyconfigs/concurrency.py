@@ -0,0 +1,197 @@
+import asyncio
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterator
+
+# Only these are safe to answer with another caller's in-flight response
+COALESCE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+Call = tuple[str | None, Callable]
+
+
+class AsyncCoalescer:
+    """Lets identical concurrent coroutines share one in-flight call.
+
+    The call runs as a task of its own, so a caller that is cancelled stops waiting without cancelling it for the
+    others; it is only cancelled when every caller waiting on it has been.
+    """
+
+    def __init__(self):
+        self._inflight: dict[tuple[asyncio.AbstractEventLoop, Hashable], list] = {}  # slot -> [task, waiters]
+        self.coalesced = 0
+
+    def __getstate__(self):
+        # In-flight calls don't survive pickling
+        return {"coalesced": self.coalesced}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
+
+    def _done(self, slot, shared: list):
+        if self._inflight.get(slot) is shared:
+            del self._inflight[slot]
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable]):
+        loop = asyncio.get_running_loop()
+        slot = (loop, key)
+        if (shared := self._inflight.get(slot)) is not None:
+            self.coalesced += 1
+        else:
+            shared = self._inflight[slot] = [loop.create_task(call()), 0]
+            shared[0].add_done_callback(lambda _: self._done(slot, shared))
+
+        task = shared[0]
+        shared[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if task.cancelled() or shared[1] > 1:
+                raise
+            # The last caller gave up, so nobody is left to use the result
+            task.cancel()
+            raise
+        finally:
+            shared[1] -= 1
+
+
+class SyncCoalescer:
+    """Lets identical concurrent calls from different threads share one in-flight call"""
+
+    def __init__(self):
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    __getstate__ = AsyncCoalescer.__getstate__
+    __setstate__ = AsyncCoalescer.__setstate__
+
+    def run(self, key: Hashable, call: Callable[[], Any]):
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is None:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if pending is not None:
+            return pending.result()
+
+        try:
+            result = call()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+class ManagedExecutor:
+    """A thread pool created on first use and shut down explicitly; pickles as its settings only"""
+
+    def __init__(self, max_workers: int = 16, name: str = "toomanyconfigs"):
+        self.max_workers = max_workers
+        self.name = name
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"max_workers": self.max_workers, "name": self.name}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._pool
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+async def gather_limited(calls: list[Call], concurrency: int, per_host: int = None) -> AsyncIterator[tuple[int, Any]]:
+    """Run `(host, coroutine factory)` calls with bounded concurrency, yielding `(index, result)` as each finishes.
+
+    Failures are yielded as the exception instead of aborting the batch.
+    """
+    overall = asyncio.Semaphore(concurrency)
+    hosts = defaultdict(lambda: asyncio.Semaphore(per_host)) if per_host else None
+
+    async def one(index: int, host: str | None, factory: Callable[[], Awaitable]):
+        # Wait for the host's slot first so a busy host doesn't hold overall slots idle
+        host_slot = hosts[host] if hosts is not None else None
+        try:
+            if host_slot is not None:
+                await host_slot.acquire()
+            try:
+                async with overall:
+                    return index, await factory()
+            finally:
+                if host_slot is not None:
+                    host_slot.release()
+        except Exception as e:
+            return index, e
+
+    tasks = [asyncio.ensure_future(one(i, host, factory)) for i, (host, factory) in enumerate(calls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def threaded_limited(
+        executor: ThreadPoolExecutor, calls: list[Call], concurrency: int, per_host: int = None
+) -> Iterator[tuple[int, Any]]:
+    """Thread-pool counterpart of `gather_limited` for blocking calls.
+
+    A call is only submitted once it has a slot, overall and for its host, so pool threads never sit blocked
+    waiting for one while calls to other hosts could run.
+    """
+    queues: dict[str | None, deque] = {}  # per host when `per_host` is set, else one queue, in order of first call
+    for index, (host, fn) in enumerate(calls):
+        queues.setdefault(host if per_host else None, deque()).append((index, fn))
+    busy = defaultdict(int)
+    running: dict[Future, str | None] = {}
+
+    def one(index: int, fn: Callable[[], Any]):
+        try:
+            return index, fn()
+        except Exception as e:
+            return index, e
+
+    def submit_ready():
+        for host, queue in list(queues.items()):
+            while queue and len(running) < concurrency and (not per_host or busy[host] < per_host):
+                busy[host] += 1
+                running[executor.submit(one, *queue.popleft())] = host
+            if not queue:
+                del queues[host]
+            if len(running) >= concurrency:
+                break
+
+    try:
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                busy[running.pop(future)] -= 1
+            # Refill before handing results over, so a slow consumer doesn't leave slots idle
+            submit_ready()
+            for future in done:
+                yield future.result()
+    finally:
+        for future in running:
+            future.cancel()
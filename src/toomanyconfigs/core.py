@@ -1,33 +1,246 @@
-import time
+import os
+import stat
+import tempfile
+from contextlib import contextmanager
 from functools import cached_property
 from pathlib import Path
+from types import UnionType
+from typing import Union, get_args, get_origin
 
-import pyperclip
-import toml
 from loguru import logger as log
 
-from . import REPR
+try:
+    from annotationlib import Format, get_annotations
+except ImportError:  # before 3.14
+    from inspect import get_annotations
+    Format = None
+
+from . import REPR, ACTIVE_CFGS
+from . import backends
+from .logs import LOGS
+from .providers import default_providers, resolve
+
+
+def _load_toml(path: Path) -> dict:
+    """Parse a TOML file. Every config load goes through here exactly once."""
+    return backends.load(path)
+
+
+def _is_subconfig_type(field_type) -> bool:
+    return isinstance(field_type, type) and issubclass(field_type, TOMLSubConfig)
+
+
+def _optional_type(annotation):
+    """`T` for an optional `T | None` (or `Optional[T]`) annotation, else None"""
+    if get_origin(annotation) in (Union, UnionType):
+        args = get_args(annotation)
+        if len(args) == 2 and type(None) in args:
+            return args[0] if args[1] is type(None) else args[1]
+    return None
+
+
+_NO_DEFAULT = object()
+
+
+class Field:
+    """Attribute access for an annotated field whose value lives only in the dict.
+
+    Reads go through `__getitem__`, so sections that resolve templates on read do so for attributes too. On the
+    class it gives the annotated default, or raises AttributeError when there is none.
+    """
+    __slots__ = ("name", "default")
+
+    def __init__(self, name: str, default=_NO_DEFAULT):
+        self.name = name
+        self.default = default
+
+    def __repr__(self):
+        return f"[Field: {self.name}]"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            if self.default is _NO_DEFAULT:
+                raise AttributeError(f"'{owner.__name__}' has no default for '{self.name}'")
+            return self.default
+        try:
+            return instance[self.name]
+        except KeyError:
+            if self.default is _NO_DEFAULT:
+                raise AttributeError(f"'{type(instance).__name__}' object has no attribute '{self.name}'") from None
+            return self.default
+
+    def __set__(self, instance, value):
+        instance[self.name] = value
+
+
+def _annotations(cls) -> dict:
+    """A class's own annotations. From 3.14 (PEP 649/749) they are evaluated lazily and aren't in `cls.__dict__`
+    until asked for; names that aren't defined yet come back as forward references instead of raising."""
+    if Format is None:
+        return get_annotations(cls)
+    return get_annotations(cls, format=Format.FORWARDREF)
+
+
+def _install_fields(cls):
+    """Swap each public annotated field (and its default) for a Field descriptor"""
+    for name in _annotations(cls):
+        if not name.startswith('_') and not isinstance(cls.__dict__.get(name), Field):
+            setattr(cls, name, Field(name, cls.__dict__.get(name, _NO_DEFAULT)))
+
+
+def _umask() -> int:
+    """The process umask, from /proc where it can be read without changing it"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+def _fsync_dir(directory: Path):
+    """Make a rename in `directory` durable; a no-op where directories can't be opened (Windows)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Schema:
+    """A config class's annotations, worked out once when the class is created so instances don't re-inspect them.
+
+    - `fields`: every annotated name; a field that is absent or None after construction is missing
+    - `optional`: fields the class lists in `_optional`, which are never missing; with a None default they are only
+      stored (and written) once set, so an optional section absent from the file stays absent
+    - `defaults`: annotated fields with a default, in order; `public` and `private` split them by leading underscore
+    - `nested`: fields typed with something that has `create()`; plain dicts given for them are built as that type
+    - `sections`: the nested fields typed as TOMLSubConfig, which build themselves when missing
+    - `plain`: `__setitem__` isn't overridden, so construction can fill the dict in one call
+    - `types`: the type of each field (`T` for `T | None`), for converting provided strings
+    """
+    __slots__ = ("fields", "optional", "types", "defaults", "public", "private", "nested", "sections", "plain")
+
+    def __init__(self, cls, base: type):
+        annotations = _annotations(cls)
+        self.fields = tuple(annotations)
+        self.optional = frozenset(name for name in getattr(cls, '_optional', ()) if name in annotations)
+        self.types = {name: _optional_type(t) or t for name, t in annotations.items()}
+        self.defaults = {}
+        for name in annotations:
+            if (default := getattr(cls, name, _NO_DEFAULT)) is not _NO_DEFAULT:
+                if default is None and name in self.optional:
+                    continue
+                self.defaults[name] = default
+        self.public = {k: v for k, v in self.defaults.items() if not k.startswith('_')}
+        self.private = {k: v for k, v in self.defaults.items() if k.startswith('_')}
+        self.nested = {k: t for k, t in self.types.items() if hasattr(t, 'create')}
+        self.sections = {k: t for k, t in self.nested.items() if _is_subconfig_type(t)}
+        self.plain = cls.__setitem__ is base.__setitem__
+
+    def __repr__(self):
+        return f"[Schema: {len(self.fields)} fields, {len(self.sections)} sections]"
+
+    def missing(self, inst) -> list[str]:
+        return [name for name in self.fields if name not in self.optional and dict.get(inst, name) is None]
+
+
+def _persisted(section) -> dict:
+    """Public values as they are written to disk. Values filled in by a non-persisting provider (see providers.py)
+    are left out for as long as they are the value held; anything assigned over them is written as usual."""
+    provided = getattr(section, '_provided', None)
+    data = {}
+    for k, v in dict.items(section):
+        if k.startswith('_') or (provided and k in provided and v is provided[k]):
+            continue
+        data[k] = _persisted(v) if isinstance(v, TOMLSubConfig) else v
+    return data
+
+
+def _fill_missing(inst, missing: list[str], prompt_empty_fields: bool, providers, sections: dict = None):
+    """Build missing subconfigs, then resolve every other missing field through the providers in one pass"""
+    cls = type(inst)
+    schema = cls._schema
+    routine = LOGS.routine
+    if routine:
+        log.info(f"{cls.__name__}: Missing fields detected: {missing}")
+    values = []
+    for field_name in missing:
+        field_type = schema.sections.get(field_name)
+        if field_type is None:
+            values.append(field_name)
+            continue
+        # The subconfig resolves its own missing fields
+        inst[field_name] = field_type.create(
+            _data=(sections or {}).get(field_type.__name__.lower()),
+            prompt_empty_fields=prompt_empty_fields,
+            providers=providers
+        )
+        if routine:
+            log.success(f"{cls.__name__}: Created {field_type.__name__} for {field_name}")
+
+    if not values:
+        return
+    if providers is None:
+        providers = default_providers(prompt=prompt_empty_fields)
+    found = resolve(cls.__name__.lower(), values, providers, schema.types)
+    transient = {}
+    for field_name in values:
+        if field_name in found:
+            value, provider = found[field_name]
+            inst[field_name] = value
+            if not provider.persist:
+                transient[field_name] = value
+        else:
+            log.warning(f"{inst.__log_repr__}: Skipping empty field '{field_name}'")
+    if transient:
+        object.__setattr__(inst, '_provided', {**(getattr(inst, '_provided', None) or {}), **transient})
+    if found and routine:
+        log.success(f"{inst.__log_repr__}: Set {list(found)}")
 
 
 class TOMLSubConfig(dict):
+    """A config section. Values are stored once, as dict items; annotated fields read them through Field
+    descriptors and any other public key is reachable as an attribute through `__getattr__`.
+
+    The bookkeeping lives in slots, so a plain section never allocates an instance `__dict__`.
+    """
+    __slots__ = ("_dirty", "_revision", "_provided", "__dict__", "__weakref__")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _install_fields(cls)
+        cls._schema = Schema(cls, TOMLSubConfig)
+
     def __init__(self, **kwargs):
         super().__init__()
+        schema = self._schema
+        object.__setattr__(self, '_dirty', True)
+        object.__setattr__(self, '_revision', 0)
 
-        # Initialize with annotation defaults first
-        annotations = getattr(self.__class__, '__annotations__', {})
-        for field_name in annotations:
-            if hasattr(self.__class__, field_name):
-                default_value = getattr(self.__class__, field_name)
-                self[field_name] = default_value
-                setattr(self, field_name, default_value)
-
-        # Then update with kwargs, converting sub-dicts to subconfigs
+        # Annotation defaults first, then kwargs, with sub-dicts converted to subconfigs
+        values = {**schema.defaults, **kwargs}
         for k, v in kwargs.items():
             if isinstance(v, dict) and not isinstance(v, TOMLSubConfig):
-                # Convert dict to TOMLSubConfig
-                v = TOMLSubConfig(**v)
-            self[k] = v
-            setattr(self, k, v)
+                values[k] = TOMLSubConfig(**v)
+
+        if schema.plain:
+            dict.update(self, values)
+            object.__setattr__(self, '_revision', len(values))
+        else:
+            for k, v in values.items():
+                self[k] = v
 
     @cached_property
     def __log_repr__(self):
@@ -38,71 +251,85 @@ class TOMLSubConfig(dict):
             cls,
             _source: Path = None,
             _name: str = None,
+            _data: dict = None,
             prompt_empty_fields=True,
+            providers: list = None,
             **kwargs
     ):
-        hit = None
-        if _source:
+        """Build a subconfig from an already parsed section (`_data`) or, failing that, from `_source`.
+
+        Missing fields are looked up through `providers` (see providers.py; by default the environment, the secrets
+        directory and, with `prompt_empty_fields`, the terminal).
+        """
+        hit = _data
+        if hit is None and _source:
             if not _name: _name = cls.__name__.lower()
-            log.debug(f"{REPR}: Building subconfig named '{_name}' from {_source}")
-            with _source.open('r') as f:
-                raw_data = toml.load(f)
-                hit = raw_data.get(_name)
+            if LOGS.routine:
+                log.debug(f"{REPR}: Building subconfig named '{_name}' from {_source}")
+            hit = _load_toml(_source).get(_name)
 
         if hit: kwargs = {**hit, **kwargs}
 
+        # Hand parsed nested sections straight down to their typed subconfigs
+        schema = cls._schema
+        if schema.sections:
+            for field_name, field_type in schema.sections.items():
+                value = kwargs.get(field_name)
+                if isinstance(value, dict) and not isinstance(value, TOMLSubConfig):
+                    kwargs[field_name] = field_type.create(
+                        _data=value, prompt_empty_fields=prompt_empty_fields, providers=providers
+                    )
+
         inst = cls(**kwargs)
 
         # Check class annotations for required fields
-        required_fields = getattr(cls, '__annotations__', {})
-        missing_fields = []
-
-        for field_name in required_fields:
-            if field_name not in inst or inst[field_name] is None:
-                missing_fields.append(field_name)
-
-        if missing_fields:
-            log.info(f"{cls.__name__}: Missing fields detected: {missing_fields}")
-            for field_name in missing_fields:
-                # Check if this field should be a subconfig
-                field_type = required_fields.get(field_name)
-                if field_type and hasattr(field_type, 'create') and issubclass(field_type, TOMLSubConfig):
-                    # Create the subconfig, which will handle its own prompting
-                    subconfig = field_type.create()
-                    inst[field_name] = subconfig
-                    setattr(inst, field_name, subconfig)
-                    log.success(f"{cls.__name__}: Created {field_type.__name__} for {field_name}")
-                else:
-                    if prompt_empty_fields:
-                        inst._prompt_field(field_name)
-                    else:
-                        log.warning(f"{inst}: Skipping empty field '{field_name}'")
+        if missing_fields := schema.missing(inst):
+            _fill_missing(inst, missing_fields, prompt_empty_fields, providers)
 
         return inst
 
-    def _prompt_field(self, field_name):
-        time.sleep(1)
-        prompt = f"{self.__log_repr__}: Enter value for '{field_name}' (or press Enter to paste from clipboard): "
-        user_input = input(prompt).strip() or pyperclip.paste()
-        if not user_input.strip():
-            log.debug(f"{self.__log_repr__}: Using clipboard value for {field_name}")
-        # Update both dict and attribute
-        self[field_name] = user_input
-        setattr(self, field_name, user_input)
-        time.sleep(1)
-        log.success(f"{self.__log_repr__}: Set {field_name}")
+    def __getattr__(self, name):
+        # Only reached when normal lookup fails: public keys without a Field live in the dict alone
+        if not name.startswith('_'):
+            try:
+                return self[name]
+            except KeyError:
+                pass
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
 
     def __setattr__(self, name, value):
-        # Keep dict and attributes in sync
-        if not name.startswith('_'):
+        # Public names are config values and go to the dict; private ones are ordinary attributes
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
             self[name] = value
-        super().__setattr__(name, value)
 
     def __setitem__(self, name, value):
-        # Keep dict and attributes in sync
-        super().__setitem__(name, value)
+        dict.__setitem__(self, name, value)
         if not name.startswith('_'):
-            super().__setattr__(name, value)
+            object.__setattr__(self, '_dirty', True)
+            # Unpickling sets items before the slots are restored, hence the default
+            object.__setattr__(self, '_revision', getattr(self, '_revision', 0) + 1)
+
+    def __delitem__(self, name):
+        dict.__delitem__(self, name)
+        object.__setattr__(self, '_dirty', True)
+        object.__setattr__(self, '_revision', getattr(self, '_revision', 0) + 1)
+
+    def update(self, *args, **kwargs):
+        # Route through __setitem__ so the dirty flag follows
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def is_dirty(self) -> bool:
+        """Whether this subconfig or any nested one changed since it was last loaded or written"""
+        return self._dirty or any(isinstance(v, TOMLSubConfig) and v.is_dirty() for v in self.values())
+
+    def _mark_clean(self):
+        object.__setattr__(self, '_dirty', False)
+        for v in self.values():
+            if isinstance(v, TOMLSubConfig):
+                v._mark_clean()
 
     def as_dict(self):
         return {k: v for k, v in self.items() if not k.startswith('_')}
@@ -112,39 +339,41 @@ class TOMLSubConfig(dict):
 
 
 class TOMLConfig(dict):
+    """A config file. Public values are stored once, as dict items (see TOMLSubConfig); private ones such as
+    `_path` and `_cwd` are ordinary instance attributes."""
+    __slots__ = ("_path", "_cwd", "_callbacks", "_dirty", "_batch_depth", "_provided", "__dict__", "__weakref__")
     _path: Path
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _install_fields(cls)
+        cls._schema = Schema(cls, TOMLConfig)
+
     def __init__(self, **kwargs):
         super().__init__()
-        # Separate private attributes from config data
-        self._private = {}
-
-        # Initialize with annotation defaults first
-        annotations = getattr(self.__class__, '__annotations__', {})
-        for field_name in annotations:
-            if hasattr(self.__class__, field_name):
-                default_value = getattr(self.__class__, field_name)
-                if field_name.startswith('_'):
-                    self._private[field_name] = default_value
-                else:
-                    self[field_name] = default_value
-                    setattr(self, field_name, default_value)
+        schema = self._schema
+        object.__setattr__(self, '_callbacks', {})
+        object.__setattr__(self, '_dirty', True)
+        object.__setattr__(self, '_batch_depth', 0)
+        for k, v in schema.private.items():
+            setattr(self, k, v)
 
-        # Then update with kwargs, converting sub-dicts to subconfigs
+        # Annotation defaults first, then kwargs, with sub-dicts converted to their annotated types
+        values = dict(schema.public)
         for k, v in kwargs.items():
             if k.startswith('_'):
-                self._private[k] = v
                 setattr(self, k, v)
-            else:
-                if isinstance(v, dict) and not isinstance(v, (TOMLSubConfig, TOMLConfig)):
-                    # Check if we have a type annotation for this field
-                    field_type = annotations.get(k)
-                    if field_type and hasattr(field_type, 'create'):
-                        v = field_type(**v)
-                    else:
-                        v = TOMLSubConfig(**v)
+                continue
+            if isinstance(v, dict) and not isinstance(v, (TOMLSubConfig, TOMLConfig)):
+                field_type = schema.nested.get(k)
+                v = field_type(**v) if field_type is not None else TOMLSubConfig(**v)
+            values[k] = v
+
+        if schema.plain:
+            dict.update(self, values)
+        else:
+            for k, v in values.items():
                 self[k] = v
-                setattr(self, k, v)
 
     @cached_property
     def __log_repr__(self):
@@ -155,8 +384,20 @@ class TOMLConfig(dict):
             cls,
             _source: Path = None,
             prompt_empty_fields: bool = True,
+            memoize: bool = True,
+            _data: dict = None,
+            providers: list = None,
+            write: bool = True,
             **kwargs
     ):
+        """Build a config from its .toml, reusing the instance in ACTIVE_CFGS if the file hasn't changed and it was
+        built with the same `prompt_empty_fields`, `providers` and `write`.
+
+        `_data` is the file already parsed (as `load_many` does in worker processes), so it isn't read again. With
+        `write=False` the file is only read: it isn't created, and defaults or filled-in fields aren't saved to it.
+        Missing fields are looked up through `providers`: by default the environment (`{CLASS}_{FIELD}`), the
+        secrets directory and, with `prompt_empty_fields`, the terminal. See providers.py.
+        """
         # Set up paths first
         if _source:
             path = Path(_source)
@@ -166,35 +407,45 @@ class TOMLConfig(dict):
             name = cls.__name__.lower()
             path = Path.cwd() / (name + ".toml")
 
-        if path.exists():
-            log.info(f"{REPR}: Building config from {path}")
-            with path.open('r') as f:
-                raw_data = toml.load(f)
+        # Only plain loads are shared; explicit kwargs make the result caller-specific, and other options build
+        # (and share) an instance of their own
+        memoize = memoize and not kwargs
+        options = (prompt_empty_fields, write, None if providers is None else tuple(providers))
+        if memoize and (cached := ACTIVE_CFGS.get(cls, path, options)) is not None:
+            if LOGS.routine:
+                log.debug(f"{REPR}: Reusing {cls.__name__} built from {path}")
+            return cached
+
+        raw_data = {}
+        if _data is not None or path.exists():
+            if LOGS.routine:
+                log.info(f"{REPR}: Building config from {path}")
+            # Parse once; every subconfig below is built from its section of this document
+            raw_data = _load_toml(path) if _data is None else _data
 
             # Process subconfigs in the raw data
             file_data = {}
             for name, value in raw_data.items():
                 if isinstance(value, dict):
-                    # Check if we already have an instance passed in kwargs
-                    if name in kwargs and hasattr(kwargs[name], 'get'):
-                        # Use the type of the passed instance
-                        field_type = type(kwargs[name])
-                        file_data[name] = field_type.create(_source=path, _name=name, **value)
+                    if name in kwargs:
+                        # An explicitly passed value wins the merge below, so don't build one from the file
+                        continue
+                    field_type = cls._schema.nested.get(name)
+                    if field_type is not None:
+                        file_data[name] = field_type.create(
+                            _data=value, prompt_empty_fields=prompt_empty_fields, providers=providers
+                        )
                     else:
-                        # Try to get field type from class annotations or defaults
-                        field_type = getattr(cls, '__annotations__', {}).get(name)
-                        if field_type and hasattr(field_type, 'create'):
-                            file_data[name] = field_type.create(_source=path, _name=name, **value)
-                        else:
-                            file_data[name] = value
+                        file_data[name] = value
                 else:
                     file_data[name] = value
 
             # Merge file data with kwargs
             kwargs = {**file_data, **kwargs}
         else:
-            log.warning(f"{REPR}: Config file not found at {path}, creating new one")
-            path.touch(exist_ok=True)
+            log.warning(f"{REPR}: Config file not found at {path}" + (", creating new one" if write else ""))
+            if write:
+                path.touch(exist_ok=True)
 
         # Add private attributes
         kwargs['_cwd'] = cwd
@@ -203,47 +454,64 @@ class TOMLConfig(dict):
         inst = cls(**kwargs)
 
         # Check class annotations for required fields
-        required_fields = getattr(cls, '__annotations__', {})
-        missing_fields = []
-
-        for field_name in required_fields:
-            if field_name not in inst or inst[field_name] is None:
-                missing_fields.append(field_name)
-
-        if missing_fields:
-            log.info(f"{cls.__name__}: Missing fields detected: {missing_fields}")
-            for field_name in missing_fields:
-                # Check if this field should be a subconfig
-                field_type = required_fields.get(field_name)
-                if field_type and hasattr(field_type, 'create') and issubclass(field_type, TOMLSubConfig):
-                    subconfig = field_type.create(path)
-                    inst[field_name] = subconfig
-                    setattr(inst, field_name, subconfig)
-                    log.success(f"{cls.__name__}: Created {field_type.__name__} for {field_name}")
-                else:
-                    if prompt_empty_fields:
-                        inst._prompt_field(field_name)
-                    else:
-                        log.warning(f"{inst}: Skipping empty field '{field_name}'")
-
-        inst.write(verbose=False)
+        if missing_fields := cls._schema.missing(inst):
+            _fill_missing(inst, missing_fields, prompt_empty_fields, providers, raw_data)
+
+        if path.exists() and inst._to_data() == raw_data:
+            # Nothing differs from what's on disk, so the write below is a no-op
+            inst._mark_clean()
+        if write:
+            inst.write(verbose=False)
+        if memoize:
+            ACTIVE_CFGS.put(inst, options)
         return inst
 
+    @property
+    def _private(self) -> dict:
+        """The private attributes (`_path`, `_cwd`, ...), which are kept apart from the config data"""
+        private = {k: getattr(self, k) for k in TOMLConfig.__slots__ if not k.startswith('__') and hasattr(self, k)}
+        private.update((k, v) for k, v in self.__dict__.items() if not k.startswith('__'))
+        return private
+
+    def __getattr__(self, name):
+        # Only reached when normal lookup fails: public keys without a Field live in the dict alone
+        if not name.startswith('_'):
+            try:
+                return self[name]
+            except KeyError:
+                pass
+        raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+
     def __setattr__(self, name, value):
-        # Keep dict and attributes in sync, handle private attributes
+        # Public names are config values and go to the dict; private ones are ordinary attributes
         if name.startswith('_'):
-            if hasattr(self, '_private'):
-                self._private[name] = value
-            super().__setattr__(name, value)
+            object.__setattr__(self, name, value)
         else:
             self[name] = value
-            super().__setattr__(name, value)
 
     def __setitem__(self, name, value):
-        # Keep dict and attributes in sync
-        super().__setitem__(name, value)
+        dict.__setitem__(self, name, value)
         if not name.startswith('_'):
-            super().__setattr__(name, value)
+            object.__setattr__(self, '_dirty', True)
+
+    def __delitem__(self, name):
+        dict.__delitem__(self, name)
+        object.__setattr__(self, '_dirty', True)
+
+    def update(self, *args, **kwargs):
+        # Route through __setitem__ so the dirty flag follows
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def is_dirty(self) -> bool:
+        """Whether any value, including nested subconfigs, changed since the last load or write"""
+        return self._dirty or any(isinstance(v, TOMLSubConfig) and v.is_dirty() for v in self.values())
+
+    def _mark_clean(self):
+        object.__setattr__(self, '_dirty', False)
+        for v in self.values():
+            if isinstance(v, TOMLSubConfig):
+                v._mark_clean()
 
     def as_dict(self):
         return {k: v for k, v in self.items() if not k.startswith('_')}
@@ -251,41 +519,135 @@ class TOMLConfig(dict):
     def as_list(self):
         return [k for k in self if not k.startswith('_')]
 
-    def _prompt_field(self, field_name):
-        time.sleep(1)
-        prompt = f"{self.__log_repr__}: Enter value for '{field_name}' (or press Enter to paste from clipboard): "
-        user_input = input(prompt).strip() or pyperclip.paste()
-        if not user_input.strip():
-            log.debug(f"{self.__log_repr__}: Using clipboard value for {field_name}")
-        # Update both dict and attribute
-        self[field_name] = user_input
-        setattr(self, field_name, user_input)
-        time.sleep(1)
-        log.success(f"{self.__log_repr__}: Set {field_name}")
-
-    def write(self, verbose: bool = True):
+    def _to_data(self) -> dict:
+        """The plain document `write()` would serialize; values from the environment or secrets aren't in it"""
+        return backends.to_plain(_persisted(self))
+
+    def write(self, verbose: bool = True, force: bool = False):
+        """Atomically persist the config, skipping the write entirely when nothing changed"""
         if not hasattr(self, '_path') or not self._path:
             raise ValueError("No path set for configuration file")
+        if self._batch_depth:
+            return
+        if not force and not self.is_dirty() and self._path.exists():
+            return
+
+        if verbose and LOGS.routine: log.debug(f"{REPR}: Writing config to {self._path}")
+        text = backends.dumps(self._to_data())
+
+        # Write a sibling temp file and rename it over the original so a crash never leaves it truncated. Through a
+        # symlink, that's the file it points to, so the link survives; the file keeps its permissions.
+        target = Path(os.path.realpath(self._path))
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates 0600; keep the existing file's mode, or give a new one what open() would have
+            os.chmod(tmp, stat.S_IMODE(target.stat().st_mode) if target.exists() else 0o666 & ~_umask())
+            os.replace(tmp, target)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        _fsync_dir(target.parent)
+        self._mark_clean()
+        # The file now matches this instance, so it stays the shared one
+        ACTIVE_CFGS.refresh(self)
+
+    @contextmanager
+    def batch(self):
+        """Defer writes while mutating many keys, then flush once on exit"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth:
+            self.write(verbose=False)
+
+    def on_change(self, key: str, callback):
+        """Call `callback(key, old, new)` when a dotted key ('routes.base', a section, or '*') changes on reload"""
+        self._callbacks.setdefault(key, []).append(callback)
+        return callback
 
-        config_data = {}
-        for name, value in self.items():
-            if value is not None and not name.startswith('_'):
-                # Check if value is a dict-like config object
-                if isinstance(value, dict):
-                    config_data[name] = dict(value)
+    @classmethod
+    def load_many(cls, source, workers: int = None) -> "LoadResult":
+        """Build one config per .toml in a directory or glob, parsing them across a process pool (see bulk.py)"""
+        from .bulk import load_many
+        return load_many(cls, source, workers=workers)
+
+    def watch(self, callback=None):
+        """Hot-reload this config in the background whenever its file changes"""
+        from .watch import get_watcher
+        if callback:
+            self.on_change("*", callback)
+        get_watcher().add(self)
+        return self
+
+    def unwatch(self):
+        from .watch import get_watcher
+        get_watcher().remove(self)
+
+    def reload(self) -> list:
+        """Reparse the file and apply only the keys that changed, returning those changes"""
+        if not hasattr(self, '_path') or not self._path or not self._path.exists():
+            return []
+        return self._apply_source(self._parse_source())
+
+    def _parse_source(self) -> dict:
+        return _load_toml(self._path)
+
+    def _apply_source(self, data: dict) -> list:
+        from .watch import diff
+        was_dirty = self.is_dirty()
+        # Against what was written, so values from the environment or secrets don't read as removed from the file
+        changes = diff(_persisted(self), data)
+        for key_path, old, new in changes:
+            owner = self
+            for key in key_path[:-1]:
+                owner = owner[key]
+            name = key_path[-1]
+            if new is None:
+                # TOML has no null: the key is gone from the file, so it goes from the config too
+                if name in owner:
+                    del owner[name]
+                self._notify(".".join(key_path), old, new)
+                continue
+            if isinstance(new, dict):
+                field_type = owner._schema.sections.get(name)
+                if field_type is not None:
+                    new = field_type.create(_data=new, prompt_empty_fields=False)
                 else:
-                    config_data[name] = value
-
-        if verbose: log.debug(f"{REPR}: Writing config to {self._path}")
-        with self._path.open('w') as f:
-            toml.dump(config_data, f) #type: ignore
+                    new = TOMLSubConfig(**new)
+            owner[name] = new
+            self._notify(".".join(key_path), old, new)
+
+        if changes:
+            if not was_dirty:
+                # Values now match the file; unsaved local edits elsewhere stay pending
+                self._mark_clean()
+            if LOGS.routine:
+                log.info(f"{self.__log_repr__}: Reloaded {len(changes)} changed key(s) from {self._path}")
+            ACTIVE_CFGS.refresh(self)
+        return changes
+
+    def _notify(self, dotted: str, old, new):
+        for key, callbacks in self._callbacks.items():
+            if key == "*" or key == dotted or dotted.startswith(key + "."):
+                for callback in callbacks:
+                    try:
+                        callback(dotted, old, new)
+                    except Exception as e:
+                        log.error(f"{self.__log_repr__}: Change callback for '{key}' failed: {e}")
 
     def read(self):
         if not hasattr(self, '_path') or not self._path or not self._path.exists():
             return {}
-        log.debug(f"{REPR}: Reading config from {self._path}")
-        with self._path.open('r') as f:
-            data = toml.load(f)
+        routine = LOGS.routine
+        if routine:
+            log.debug(f"{REPR}: Reading config from {self._path}")
+        data = _load_toml(self._path)
 
         # Update self with data from file
         for name, value in data.items():
@@ -294,10 +656,15 @@ class TOMLConfig(dict):
                 current_obj = self[name]
                 if isinstance(current_obj, dict):
                     current_obj.update(value)
-                    log.debug(f"{self.__log_repr__}: Updated '{name}' from file!")
+                    if routine:
+                        log.debug(f"{self.__log_repr__}: Updated '{name}' from file!")
             else:
                 self[name] = value
-                setattr(self, name, value)
-                log.debug(f"{self.__log_repr__}: Overrode '{name}' from file!")
+                if routine:
+                    log.debug(f"{self.__log_repr__}: Overrode '{name}' from file!")
 
         return data
+
+
+TOMLSubConfig._schema = Schema(TOMLSubConfig, TOMLSubConfig)
+TOMLConfig._schema = Schema(TOMLConfig, TOMLConfig)
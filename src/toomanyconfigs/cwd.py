@@ -2,6 +2,9 @@ from loguru import logger as log
 from pathlib import Path
 from typing import Union
 
+from .logs import LOGS
+
+
 class CWDNamespace:
     def __init__(self, path: Path):
         self._path = path
@@ -90,7 +93,8 @@ class CWD:
                 else:
                     file_path.touch()
 
-        log.info(f"{self}: Created file structure:\n{self.tree_structure}")
+        # The tree is only drawn if some sink will actually show the message
+        log.opt(lazy=True).info("{}: Created file structure:\n{}", lambda: self, lambda: self.tree_structure)
 
     @property
     def tree_structure(self):
@@ -133,6 +137,8 @@ class CWD:
         return "\n".join(lines)
 
     def list_structure(self):
+        if not LOGS.routine:
+            return
         for path in self.folder_structure:
             log.debug(f"Folder: {path}")
         for path in self.file_structure:
@@ -0,0 +1,425 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from loguru import logger as log
+
+_RECORD = struct.Struct("<IIdI")  # key length, value length, expiry (0 = never), crc32 of key + value
+_TOMBSTONE = 0xFFFFFFFF
+_INDEX_HEADER = struct.Struct("<8sQQ")  # magic, entry count, segment bytes covered by the index
+_INDEX_ENTRY = struct.Struct("<QQ")  # key hash, record offset
+_MAGIC = b"TMCIDX01"
+
+
+def _hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class _Record:
+    __slots__ = ("key", "expires", "value_start", "value_len", "size")
+
+    def __init__(self, buf, offset: int):
+        key_len, value_len, self.expires, _ = _RECORD.unpack_from(buf, offset)
+        start = offset + _RECORD.size
+        self.key = bytes(buf[start:start + key_len])
+        self.value_start = start + key_len
+        self.value_len = value_len
+        self.size = _RECORD.size + key_len + (0 if value_len == _TOMBSTONE else value_len)
+
+    @property
+    def deleted(self) -> bool:
+        return self.value_len == _TOMBSTONE
+
+    def expired(self, now: float) -> bool:
+        return 0 < self.expires <= now
+
+
+class DiskCache:
+    """Persistent key -> value cache: an append-only segment file plus a sorted, memory-mapped hash index.
+
+    Reopening maps the index rather than loading it, and values are read from the mapped segment only when asked
+    for, so a cache of millions of entries opens instantly. New writes append to the segment and are tracked in a
+    small in-memory tail until the index is rewritten (`flush()`, `close()` or compaction). Overwritten, deleted
+    and expired records are reclaimed by compaction on a background thread.
+
+    Safe to share between threads, not between processes.
+    """
+    SEGMENT = "cache.seg"
+    INDEX = "cache.idx"
+
+    def __init__(
+            self,
+            directory: str | Path,
+            default_ttl: float | None = None,
+            compact_ratio: float = 0.5,
+            compact_min_bytes: int = 1 << 20,
+            dumps: Callable[[Any], bytes] = None,
+            loads: Callable[[bytes], Any] = None
+    ):
+        self.directory = Path(directory)
+        self.default_ttl = default_ttl
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.dumps = dumps
+        self.loads = loads
+        self.hits = 0
+        self.misses = 0
+        self.compactions = 0
+        self._lock = threading.RLock()
+        self._compactor: threading.Thread | None = None
+        self._changed: set[bytes] | None = None  # keys written while a compaction is copying
+        self._open()
+
+    def __repr__(self):
+        return f"[DiskCache: {self.directory}, {self._size} bytes]"
+
+    def __getstate__(self):
+        # Everything lives on disk; a pickle only needs to know where and how to reopen it
+        self.flush()
+        return {k: getattr(self, k) for k in (
+            "directory", "default_ttl", "compact_ratio", "compact_min_bytes", "dumps", "loads"
+        )}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    # Files
+
+    def _open(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.directory / self.SEGMENT, "a+b")
+        self._size = self._file.seek(0, os.SEEK_END)
+        self._segment_map: mmap.mmap | None = None
+        self._tail: dict[bytes, int | None] = {}  # key -> offset of its newest record, None once deleted
+        self._garbage = 0
+
+        self._index_map, self._count, covered = self._map_index()
+        if covered > self._size:
+            # The index describes some other segment; rebuild from the records instead
+            self._close_index()
+            covered = 0
+        self._replay(covered)
+
+    def _map_index(self):
+        path = self.directory / self.INDEX
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < _INDEX_HEADER.size:
+                    return None, 0, 0
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None, 0, 0
+        magic, count, covered = _INDEX_HEADER.unpack_from(index, 0)
+        if magic != _MAGIC or len(index) < _INDEX_HEADER.size + count * _INDEX_ENTRY.size:
+            index.close()
+            return None, 0, 0
+        return index, count, covered
+
+    def _close_index(self):
+        if self._index_map is not None:
+            self._index_map.close()
+        self._index_map, self._count = None, 0
+
+    def _segment(self, end: int):
+        """The segment mapped at least up to `end`"""
+        if not end:
+            # An empty segment (a fresh cache, or everything compacted away) can't be mapped and has nothing to read
+            return b""
+        if self._segment_map is None or len(self._segment_map) < end:
+            self._file.flush()
+            if self._segment_map is not None:
+                self._segment_map.close()
+            self._segment_map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._segment_map
+
+    def _replay(self, start: int):
+        """Rebuild the tail from records appended after the index was written, dropping a torn final record"""
+        if start >= self._size:
+            return
+        buf = self._segment(self._size)
+        pos = start
+        while pos + _RECORD.size <= self._size:
+            key_len, value_len, _, crc = _RECORD.unpack_from(buf, pos)
+            body_len = key_len + (0 if value_len == _TOMBSTONE else value_len)
+            end = pos + _RECORD.size + body_len
+            if end > self._size or zlib.crc32(buf[pos + _RECORD.size:end]) != crc:
+                break
+            key = bytes(buf[pos + _RECORD.size:pos + _RECORD.size + key_len])
+            if (previous := self._locate(key)) is not None:
+                self._garbage += _Record(buf, previous).size
+            self._tail[key] = None if value_len == _TOMBSTONE else pos
+            pos = end
+
+        if pos < self._size:
+            log.warning(f"{self}: Dropping {self._size - pos} bytes of incomplete records")
+            self._segment_map.close()
+            self._segment_map = None
+            self._file.truncate(pos)
+            self._size = pos
+
+    # Lookups
+
+    def _index_entry(self, i: int) -> tuple[int, int]:
+        return _INDEX_ENTRY.unpack_from(self._index_map, _INDEX_HEADER.size + i * _INDEX_ENTRY.size)
+
+    def _locate(self, key: bytes) -> int | None:
+        """Offset of the newest record for `key`, or None"""
+        if key in self._tail:
+            return self._tail[key]
+        if self._index_map is None or not self._count:
+            return None
+
+        wanted = _hash(key)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._index_entry(mid)[0] < wanted:
+                lo = mid + 1
+            else:
+                hi = mid
+        buf = self._segment(self._size)
+        while lo < self._count:
+            entry_hash, offset = self._index_entry(lo)
+            if entry_hash != wanted:
+                break
+            if _Record(buf, offset).key == key:
+                return offset
+            lo += 1
+        return None
+
+    def get(self, key: str, default=None):
+        raw = key.encode()
+        with self._lock:
+            offset = self._locate(raw)
+            if offset is None:
+                self.misses += 1
+                return default
+            buf = self._segment(self._size)
+            record = _Record(buf, offset)
+            if record.deleted:
+                self.misses += 1
+                return default
+            if record.expired(time.time()):
+                self._garbage += record.size
+                self._tail[raw] = None
+                self.misses += 1
+                return default
+            value = buf[record.value_start:record.value_start + record.value_len]
+            self.hits += 1
+        return self.loads(value) if self.loads else value
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        raw = key.encode()
+        with self._lock:
+            offset = self._locate(raw)
+            if offset is None:
+                return False
+            record = _Record(self._segment(self._size), offset)
+            return not record.deleted and not record.expired(time.time())
+
+    # Writes
+
+    def _append(self, key: bytes, value: bytes | None, expires: float):
+        body = key if value is None else key + value
+        header = _RECORD.pack(len(key), _TOMBSTONE if value is None else len(value), expires, zlib.crc32(body))
+        if (previous := self._locate(key)) is not None:
+            self._garbage += _Record(self._segment(self._size), previous).size
+        offset = self._size
+        self._file.write(header + body)
+        self._size += len(header) + len(body)
+        self._tail[key] = None if value is None else offset
+        if self._changed is not None:
+            self._changed.add(key)
+        self._maybe_compact()
+
+    def put(self, key: str, value, ttl: float | None = None):
+        """Store `value` for `ttl` seconds (default_ttl when not given; no expiry when both are None)"""
+        data = self.dumps(value) if self.dumps else value
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._append(key.encode(), data, time.time() + ttl if ttl else 0.0)
+
+    __setitem__ = put
+
+    def delete(self, key: str) -> bool:
+        raw = key.encode()
+        with self._lock:
+            if self._locate(raw) is None:
+                return False
+            self._append(raw, None, 0.0)
+            return True
+
+    def __delitem__(self, key: str):
+        if not self.delete(key):
+            raise KeyError(key)
+
+    def clear(self):
+        """Drop every entry and start from empty files"""
+        self._wait_for_compaction()
+        with self._lock:
+            self._close_files()
+            (self.directory / self.SEGMENT).unlink(missing_ok=True)
+            (self.directory / self.INDEX).unlink(missing_ok=True)
+            self._open()
+
+    # Index maintenance
+
+    def _live(self) -> Iterator[tuple[bytes, int]]:
+        """(key, offset) of the newest record of every key; call with the lock held or the index pinned"""
+        buf = self._segment(self._size)
+        tail = dict(self._tail)
+        for i in range(self._count):
+            _, offset = self._index_entry(i)
+            record = _Record(buf, offset)
+            if record.key not in tail:
+                yield record.key, offset
+        for key, offset in tail.items():
+            if offset is not None:
+                yield key, offset
+
+    def _write_index(self, entries: list[tuple[int, int]], covered: int):
+        entries.sort()
+        tmp = self.directory / (self.INDEX + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_INDEX_HEADER.pack(_MAGIC, len(entries), covered))
+            f.writelines(_INDEX_ENTRY.pack(h, offset) for h, offset in entries)
+            f.flush()
+            os.fsync(f.fileno())
+        self._close_index()
+        os.replace(tmp, self.directory / self.INDEX)
+        self._index_map, self._count, _ = self._map_index()
+
+    def flush(self):
+        """Fold the in-memory tail into the on-disk index so the next open needn't replay it"""
+        with self._lock:
+            if self._compactor is not None or not self._tail:
+                return  # a running compaction writes a fresh index itself
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            entries = [(_hash(key), offset) for key, offset in self._live()]
+            self._write_index(entries, self._size)
+            self._tail.clear()
+
+    def _maybe_compact(self):
+        if (self._compactor is None and self._size >= self.compact_min_bytes
+                and self._garbage > self._size * self.compact_ratio):
+            self._compactor = threading.Thread(target=self.compact, name="diskcache-compact", daemon=True)
+            self._compactor.start()
+
+    def _wait_for_compaction(self):
+        compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+
+    def compact(self):
+        """Rewrite the segment with only live, unexpired records and rebuild the index.
+
+        Copying happens without the lock; keys written meanwhile are reconciled under it before the swap.
+        """
+        with self._lock:
+            if self._changed is not None:
+                return
+            self._changed = set()
+            self._file.flush()
+            end = self._size
+            snapshot = list(self._live())
+
+        tmp = self.directory / (self.SEGMENT + ".compact")
+        now = time.time()
+        copied: dict[bytes, int] = {}
+        try:
+            with open(self.directory / self.SEGMENT, "rb") as src, open(tmp, "wb") as out:
+                old = mmap.mmap(src.fileno(), end, access=mmap.ACCESS_READ) if end else b""
+                position = 0
+                for key, offset in snapshot:
+                    record = _Record(old, offset)
+                    if record.deleted or record.expired(now):
+                        continue
+                    out.write(old[offset:offset + record.size])
+                    copied[key] = position
+                    position += record.size
+                if end:
+                    old.close()
+
+                with self._lock:
+                    buf = self._segment(self._size)
+                    for key in self._changed:
+                        copied.pop(key, None)
+                        offset = self._locate(key)
+                        if offset is None:
+                            continue
+                        record = _Record(buf, offset)
+                        if record.deleted or record.expired(now):
+                            continue
+                        out.write(buf[offset:offset + record.size])
+                        copied[key] = position
+                        position += record.size
+                    out.flush()
+                    os.fsync(out.fileno())
+                    out.close()
+
+                    reclaimed = self._size - position
+                    self._close_files()
+                    try:
+                        os.replace(tmp, self.directory / self.SEGMENT)
+                    except OSError:
+                        # The old segment is still in place; reopen it rather than leave the cache closed
+                        self._open()
+                        raise
+                    self._file = open(self.directory / self.SEGMENT, "a+b")
+                    self._size = position
+                    self._write_index([(_hash(key), offset) for key, offset in copied.items()], position)
+                    self.compactions += 1
+                    log.debug(f"{self}: Compacted {len(copied)} entries, reclaimed {reclaimed} bytes")
+        finally:
+            # Remove the temp file before another compaction can start and reuse its name
+            Path(tmp).unlink(missing_ok=True)
+            with self._lock:
+                self._changed = None
+                if self._compactor is threading.current_thread():
+                    self._compactor = None
+
+    def _close_files(self):
+        if self._segment_map is not None:
+            self._segment_map.close()
+            self._segment_map = None
+        self._close_index()
+        self._file.close()
+        self._tail = {}
+        self._garbage = 0
+
+    def close(self):
+        """Finish any compaction, write the index and release the files"""
+        self._wait_for_compaction()
+        with self._lock:
+            if self._file.closed:
+                return
+            self.flush()
+            self._close_files()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "indexed": self._count,
+            "unindexed": len(self._tail),
+            "segment_bytes": self._size,
+            "garbage_bytes": self._garbage,
+            "compactions": self.compactions,
+        }
+
+
+_MISSING = object()
@@ -0,0 +1,95 @@
+from types import MappingProxyType
+from typing import Iterator, Mapping
+
+import httpx
+
+from .substitution import section_stamp
+
+
+class HeaderSet(Mapping):
+    """A HeadersConfig frozen into an immutable mapping, with the httpx.Headers and coalescing key built once.
+
+    Values are resolved and stringified; empty (None) headers are left out.
+    """
+
+    def __init__(self, section):
+        self.source = section
+        self.stamp = section_stamp(section)
+        values = {k: str(v) for k, v in section.resolved().items() if v is not None}
+        self.mapping = MappingProxyType(values)
+        self.encoded = httpx.Headers(values)
+        self.key = tuple(sorted(values.items()))
+
+    def __repr__(self):
+        return f"[HeaderSet: {len(self.mapping)} headers]"
+
+    def __getitem__(self, key):
+        return self.mapping[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.mapping)
+
+    def __len__(self):
+        return len(self.mapping)
+
+    def is_current(self) -> bool:
+        """False once the headers or the vars they resolve from have changed"""
+        return self.stamp == section_stamp(self.source)
+
+    def overlay(self, extra: Mapping = None) -> "HeaderSet | HeaderOverlay":
+        """These headers with `extra` layered on top, without copying the base set"""
+        return HeaderOverlay(self, extra) if extra else self
+
+
+class HeaderOverlay(Mapping):
+    """Per-request headers layered over a HeaderSet. An extra header hides a base one of the same name in any case."""
+    __slots__ = ("base", "extra", "_hidden", "_encoded")
+
+    def __init__(self, base: HeaderSet, extra: Mapping):
+        self.base = base
+        self.extra = dict(extra)
+        self._hidden = {k.lower() for k in self.extra}
+        self._encoded = None
+
+    def __repr__(self):
+        return f"[HeaderOverlay: {len(self.extra)} over {self.base}]"
+
+    def __getitem__(self, key):
+        if key in self.extra:
+            return self.extra[key]
+        if key.lower() in self._hidden:
+            raise KeyError(key)
+        return self.base.mapping[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.extra
+        for key in self.base.mapping:
+            if key.lower() not in self._hidden:
+                yield key
+
+    def __len__(self):
+        return len(self.extra) + sum(1 for key in self.base.mapping if key.lower() not in self._hidden)
+
+    @property
+    def encoded(self) -> httpx.Headers:
+        # Start from the base set's already-encoded headers and only encode the extras
+        if self._encoded is None:
+            headers = self.base.encoded.copy()
+            for k, v in self.extra.items():
+                headers[k] = v
+            self._encoded = headers
+        return self._encoded
+
+    @property
+    def key(self) -> tuple:
+        return tuple(sorted(self.items()))
+
+
+def encoded(headers: Mapping):
+    """What to hand httpx for `headers`: the pre-built httpx.Headers when there is one"""
+    return headers.encoded if isinstance(headers, (HeaderSet, HeaderOverlay)) else headers
+
+
+def headers_key(headers: Mapping) -> tuple:
+    """Hashable identity of a header set, for coalescing identical requests"""
+    return headers.key if isinstance(headers, (HeaderSet, HeaderOverlay)) else tuple(sorted(headers.items()))
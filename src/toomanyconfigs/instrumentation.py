@@ -0,0 +1,326 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable, Mapping
+
+from loguru import logger as log
+
+EVENTS = ("before_request", "after_response", "cache_hit", "error")
+
+# Bucket boundaries (seconds) used when exporting histograms to Prometheus
+EXPORT_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for requests that don't map to a known route, and for every new route once `max_routes` is reached
+OTHER_ROUTE = "other"
+
+# httpcore trace events that close each phase; connect includes DNS resolution, which httpcore doesn't time apart
+_PHASE_ENDS = {
+    "connection.connect_tcp.complete": "connect",
+    "connection.connect_unix_socket.complete": "connect",
+    "connection.start_tls.complete": "tls",
+    "http11.send_request_body.complete": "send",
+    "http2.send_request_body.complete": "send",
+    "http11.receive_response_headers.complete": "wait",
+    "http2.receive_response_headers.complete": "wait",
+    "http11.receive_response_body.complete": "transfer",
+    "http2.receive_response_body.complete": "transfer",
+}
+
+
+class Histogram:
+    """HDR-style latency histogram: log-linear buckets over microseconds, within ~6% of the true value.
+
+    Values below 32µs are exact; above, every power of two is split into 16 buckets. Recording is an index
+    computation and an increment, with no allocation once the bucket list has grown to the largest value seen.
+    Not locked itself: Instrumentation records under its own lock, and readers work on copies.
+    """
+    SUB_BITS = 5
+    _HALF = 1 << (SUB_BITS - 1)
+
+    def __init__(self):
+        self.counts: list[int] = []
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def __repr__(self):
+        return f"[Histogram: {self.count} samples]"
+
+    @classmethod
+    def _upper(cls, index: int) -> float:
+        """Upper edge of a bucket, in seconds"""
+        if index < 2 * cls._HALF:
+            return (index + 1) / 1e6
+        shift = index // cls._HALF - 1
+        return ((index - shift * cls._HALF + 1) << shift) / 1e6
+
+    def record(self, seconds: float):
+        micros = int(seconds * 1e6) or 1
+        bits = micros.bit_length()
+        if bits <= self.SUB_BITS:
+            index = micros
+        else:
+            shift = bits - self.SUB_BITS
+            index = shift * self._HALF + (micros >> shift)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile, in seconds (0.0 when empty)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * p / 100))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self._upper(index), self.max)
+        return self.max
+
+    def cumulative(self, bounds: Iterable[float] = EXPORT_BOUNDS) -> list[tuple[float, int]]:
+        """(le, count of samples in buckets whose upper edge is <= le) for each bound, as Prometheus wants them"""
+        counts = self.counts
+        out, seen, index = [], 0, 0
+        for bound in bounds:
+            while index < len(counts) and self._upper(index) <= bound:
+                seen += counts[index]
+                index += 1
+            out.append((bound, seen))
+        return out
+
+    def copy(self) -> "Histogram":
+        clone = Histogram()
+        clone.counts, clone.count, clone.sum, clone.max = list(self.counts), self.count, self.sum, self.max
+        return clone
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            **{f"p{p:g}": self.percentile(p) for p in (50, 90, 99, 99.9)},
+        }
+
+
+class RequestTiming:
+    """One attempt in flight: what hooks receive, and where trace callbacks collect phase timings"""
+    __slots__ = ("method", "route", "url", "started", "elapsed", "response", "error", "phases", "_mark")
+
+    def __init__(self, method: str, route: str, url: str):
+        self.method = method
+        self.route = route
+        self.url = url
+        self.started = time.perf_counter()
+        self.elapsed: float | None = None
+        self.response = None
+        self.error: BaseException | None = None
+        self.phases: dict[str, float] = {}
+        self._mark = self.started
+
+    def __repr__(self):
+        return f"[RequestTiming: {self.method} {self.route} {self.elapsed}]"
+
+    @property
+    def status(self) -> int | None:
+        return self.response.status_code if self.response is not None else None
+
+    def trace(self, event: str, info: dict):
+        """httpx `trace` extension for sync clients"""
+        if event.endswith(".started"):
+            self._mark = time.perf_counter()
+        elif (phase := _PHASE_ENDS.get(event)) is not None:
+            self.phases[phase] = time.perf_counter() - self._mark
+
+    async def atrace(self, event: str, info: dict):
+        """httpx `trace` extension for async clients"""
+        self.trace(event, info)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def prometheus_counters(prefix: str, counters: Mapping[str, int | float], help: str = "") -> str:
+    """Plain counters (e.g. ResilienceStats.as_dict()) in Prometheus text format"""
+    lines = []
+    for name, value in counters.items():
+        metric = f"{prefix}_{name}_total"
+        if help:
+            lines.append(f"# HELP {metric} {help}")
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+class Instrumentation:
+    """Hooks and per-route metrics for API requests.
+
+    Hooks are registered per event (`before_request`, `after_response`, `cache_hit`, `error`) and called with the
+    RequestTiming; a failing hook is logged and otherwise ignored. Every attempt's latency goes into a histogram
+    per route; with `phases`, httpx trace events also split it into connect, tls, send, wait and transfer.
+
+    At most `max_routes` route labels are kept; requests for any route past that are counted under "other", so
+    per-request paths can't grow the metrics (or Prometheus series) without bound.
+    """
+
+    def __init__(self, phases: bool = False, prefix: str = "toomanyconfigs", max_routes: int = 100):
+        self.phases = phases
+        self.prefix = prefix
+        self.max_routes = max_routes
+        self._routes: set[str] = set()
+        self.hooks: dict[str, list[Callable[[RequestTiming], None]]] = {event: [] for event in EVENTS}
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+        self._responses: dict[tuple[str, str, int], int] = defaultdict(int)
+        self._errors: dict[tuple[str, str, str], int] = defaultdict(int)
+        self._cache_hits: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"[Instrumentation: {len(self._histograms)} series]"
+
+    def __getstate__(self):
+        # Hooks may be closures and metrics are runtime state; a pickle keeps only the settings
+        return {"phases": self.phases, "prefix": self.prefix, "max_routes": self.max_routes}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def add_hook(self, event: str, fn: Callable[[RequestTiming], None]):
+        if event not in self.hooks:
+            raise ValueError(f"Unknown event '{event}', expected one of {EVENTS}")
+        self.hooks[event].append(fn)
+        return fn
+
+    def hook(self, event: str):
+        """Decorator form of `add_hook`"""
+        return lambda fn: self.add_hook(event, fn)
+
+    def _emit(self, event: str, timing: RequestTiming):
+        for fn in self.hooks[event]:
+            try:
+                fn(timing)
+            except Exception as e:
+                log.warning(f"{self}: '{event}' hook {getattr(fn, '__name__', fn)} failed: {e}")
+
+    def _histogram(self, route: str, phase: str) -> Histogram:
+        """Call with the lock held"""
+        if (histogram := self._histograms.get((route, phase))) is None:
+            histogram = self._histograms[(route, phase)] = Histogram()
+        return histogram
+
+    # Recording
+
+    def label(self, route: str) -> str:
+        """`route`, unless `max_routes` other labels are already in use"""
+        if route in self._routes:
+            return route
+        with self._lock:
+            if len(self._routes) < self.max_routes:
+                self._routes.add(route)
+                return route
+        return OTHER_ROUTE
+
+    def start(self, method: str, route: str, url: str) -> RequestTiming:
+        timing = RequestTiming(method.upper(), self.label(route), url)
+        if self.hooks["before_request"]:
+            self._emit("before_request", timing)
+        return timing
+
+    def extensions(self, timing: RequestTiming, kwargs: dict, is_async: bool = False) -> dict:
+        """Request kwargs with the trace extension added when phase timing is on"""
+        if not self.phases:
+            return kwargs
+        extensions = {**kwargs.get('extensions', {}), "trace": timing.atrace if is_async else timing.trace}
+        return {**kwargs, "extensions": extensions}
+
+    def finish(self, timing: RequestTiming, response):
+        timing.elapsed = time.perf_counter() - timing.started
+        timing.response = response
+        route = timing.route
+        with self._lock:
+            self._histogram(route, "total").record(timing.elapsed)
+            for phase, seconds in timing.phases.items():
+                self._histogram(route, phase).record(seconds)
+            self._responses[(route, timing.method, response.status_code)] += 1
+        if self.hooks["after_response"]:
+            self._emit("after_response", timing)
+
+    def fail(self, timing: RequestTiming, error: BaseException):
+        timing.elapsed = time.perf_counter() - timing.started
+        timing.error = error
+        with self._lock:
+            self._errors[(timing.route, timing.method, type(error).__name__)] += 1
+        if self.hooks["error"]:
+            self._emit("error", timing)
+
+    def cache_hit(self, method: str, route: str, url: str):
+        route = self.label(route)
+        with self._lock:
+            self._cache_hits[route] += 1
+        if self.hooks["cache_hit"]:
+            timing = RequestTiming(method.upper(), route, url)
+            timing.elapsed = 0.0
+            self._emit("cache_hit", timing)
+
+    # Export
+
+    def _frozen(self):
+        with self._lock:
+            return ({key: histogram.copy() for key, histogram in self._histograms.items()},
+                    dict(self._responses), dict(self._errors), dict(self._cache_hits))
+
+    def snapshot(self) -> dict:
+        """Point-in-time copy of every metric: latency summaries per route and phase, and the counters"""
+        histograms, responses, errors, cache_hits = self._frozen()
+        latency = defaultdict(dict)
+        for (route, phase), histogram in histograms.items():
+            latency[route][phase] = histogram.summary()
+        return {
+            "latency": dict(latency),
+            "responses": {f"{route} {method} {status}": n for (route, method, status), n in responses.items()},
+            "errors": {f"{route} {method} {error}": n for (route, method, error), n in errors.items()},
+            "cache_hits": cache_hits,
+        }
+
+    def prometheus(self) -> str:
+        """Every metric in the Prometheus text exposition format"""
+        histograms, responses, errors, cache_hits = self._frozen()
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_request_duration_seconds Request latency by route and phase",
+            f"# TYPE {p}_request_duration_seconds histogram",
+        ]
+        for (route, phase), histogram in sorted(histograms.items()):
+            for bound, n in histogram.cumulative():
+                lines.append(f"{p}_request_duration_seconds_bucket{_labels(route=route, phase=phase, le=bound)} {n}")
+            labels = _labels(route=route, phase=phase)
+            lines.append(f"{p}_request_duration_seconds_bucket{_labels(route=route, phase=phase, le='+Inf')} "
+                         f"{histogram.count}")
+            lines.append(f"{p}_request_duration_seconds_sum{labels} {histogram.sum}")
+            lines.append(f"{p}_request_duration_seconds_count{labels} {histogram.count}")
+
+        lines += [f"# HELP {p}_responses_total Responses by route, method and status",
+                  f"# TYPE {p}_responses_total counter"]
+        for (route, method, status), n in sorted(responses.items()):
+            lines.append(f"{p}_responses_total{_labels(route=route, method=method, status=status)} {n}")
+
+        lines += [f"# HELP {p}_request_errors_total Failed requests by route, method and error type",
+                  f"# TYPE {p}_request_errors_total counter"]
+        for (route, method, error), n in sorted(errors.items()):
+            lines.append(f"{p}_request_errors_total{_labels(route=route, method=method, error=error)} {n}")
+
+        lines += [f"# HELP {p}_cache_hits_total Requests answered from the cache by route",
+                  f"# TYPE {p}_cache_hits_total counter"]
+        for route, n in sorted(cache_hits.items()):
+            lines.append(f"{p}_cache_hits_total{_labels(route=route)} {n}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,345 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger as log
+
+from .substitution import section_stamp
+
+# Statuses that mean "slow down" rather than "this request failed"
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+def retry_after(headers: Mapping) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or an HTTP date), if there is one"""
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """`rate` requests per second with bursts of up to `burst`. A rate of 0 is unlimited but can still be paused.
+
+    Callers take a token straight away and are told how long to wait, so waiting happens outside the lock and
+    concurrent callers queue up at evenly spaced times instead of polling.
+    """
+
+    def __init__(self, rate: float = 0.0, burst: int = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()  # may lie in the future while paused
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"[TokenBucket: {self.rate}/s, burst {self.burst}]"
+
+    def reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                if self.rate:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            wait = self._updated - now
+            if self.rate:
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait += -self._tokens / self.rate
+            return wait
+
+    def pause(self, seconds: float):
+        """Hand out nothing for `seconds`, e.g. after a Retry-After; pacing resumes from empty afterwards"""
+        with self._lock:
+            self._updated = max(self._updated, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: grows by about one slot per round trip while responses stay healthy and fast, and is
+    cut by `backoff` on 429/503, timeouts or latency above `latency_factor` times the best recently seen.
+
+    At most one cut happens per round trip, so one burst of rejections doesn't collapse the limit.
+    """
+
+    def __init__(self, initial: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 backoff: float = 0.5, latency_factor: float = 2.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_factor = latency_factor
+        self.inflight = 0
+        self._best: float | None = None
+        self._cut_at = 0.0
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"[AdaptiveLimiter: {self.inflight}/{int(self.limit)}]"
+
+    def _take(self) -> bool:
+        if self.inflight < int(self.limit):
+            self.inflight += 1
+            return True
+        return False
+
+    def _hand_over(self):
+        # Pass freed slots straight to waiters, so a newcomer can't jump the queue
+        while self._waiters and self.inflight < int(self.limit):
+            waiter = self._waiters.popleft()
+            self.inflight += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._grant, future)
+
+    def _grant(self, future: asyncio.Future):
+        if future.done():
+            self.release()  # the waiter was cancelled before the slot arrived
+        else:
+            future.set_result(None)
+
+    def acquire(self):
+        with self._lock:
+            if self._take():
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._take():
+                return
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    raise
+                except ValueError:
+                    pass
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    def release(self, latency: float = None, overloaded: bool = False):
+        """Free a slot and adjust the limit from how the request went"""
+        with self._lock:
+            self.inflight -= 1
+            now = time.monotonic()
+            slow = latency is not None and self._best is not None and latency > self._best * self.latency_factor
+            if overloaded or slow:
+                if now - self._cut_at > (self._best or 0.0):
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._cut_at = now
+            elif latency is not None:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            if latency is not None and not overloaded:
+                # Falls immediately, creeps back up slowly, so a permanently slower upstream becomes the new normal
+                self._best = latency if self._best is None or latency < self._best else \
+                    self._best + (latency - self._best) * 0.01
+            self._hand_over()
+
+
+class Slot:
+    """One request's turn under a Limits: waits on entry (`with` or `async with`), reports back on exit.
+
+    Call `record(response)` inside the block so the status and Retry-After can steer the limits.
+    """
+    __slots__ = ("limits", "host", "route", "limiter", "started", "response")
+
+    def __init__(self, limits: "Limits", host: str, route: str | None):
+        self.limits = limits
+        self.host = host
+        self.route = route
+        self.limiter = limits.limiter(host)
+        self.started = 0.0
+        self.response = None
+
+    def record(self, response: httpx.Response):
+        self.response = response
+
+    def __enter__(self):
+        if (wait := self.limits.reserve(self.host, self.route)) > 0:
+            time.sleep(wait)
+        if self.limiter is not None:
+            self.limiter.acquire()
+        self.started = time.perf_counter()
+        return self
+
+    async def __aenter__(self):
+        if (wait := self.limits.reserve(self.host, self.route)) > 0:
+            await asyncio.sleep(wait)
+        if self.limiter is not None:
+            await self.limiter.aacquire()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.limits.finish(self, exc)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.limits.finish(self, exc)
+
+
+class _Unlimited:
+    """Stand-in slot when no limits are configured"""
+
+    def record(self, response):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+UNLIMITED = _Unlimited()
+
+
+def _spec(value) -> tuple[float, int | None]:
+    """A per-host/route setting: `rate` or `{rate = ..., burst = ...}`"""
+    if isinstance(value, Mapping):
+        return float(value.get("rate", 0.0)), value.get("burst") or None
+    if isinstance(value, tuple):
+        return value  # already parsed, e.g. settings restored from a pickle
+    return float(value), None
+
+
+class Limits:
+    """Client-side throttling: token buckets per host (and optionally per route), an optional AIMD concurrency
+    limit per host, and Retry-After pauses honoured for everything sent to that host.
+
+    `rate`/`burst` apply to every host without an entry in `hosts`; routes listed in `routes` get their own
+    bucket on top of the host's.
+    """
+
+    def __init__(
+            self,
+            rate: float = 0.0,
+            burst: int = 0,
+            hosts: Mapping = None,
+            routes: Mapping = None,
+            adaptive: bool = False,
+            initial_concurrency: int = 8,
+            min_concurrency: int = 1,
+            max_concurrency: int = 64,
+            latency_factor: float = 2.0
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.hosts = {k: _spec(v) for k, v in (hosts or {}).items() if not str(k).startswith('_')}
+        self.routes = {k: _spec(v) for k, v in (routes or {}).items() if not str(k).startswith('_')}
+        self.adaptive = adaptive
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_factor = latency_factor
+        self.source = None
+        self.stamp = None
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._limiters: dict[str, AdaptiveLimiter] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"[Limits: {self.rate or 'unlimited'}/s per host{', adaptive' if self.adaptive else ''}]"
+
+    def __getstate__(self):
+        # Buckets and limiters are live state; a pickle keeps only the settings
+        return {k: getattr(self, k) for k in (
+            "rate", "burst", "hosts", "routes", "adaptive", "initial_concurrency",
+            "min_concurrency", "max_concurrency", "latency_factor"
+        )}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @classmethod
+    def from_config(cls, section: Mapping) -> "Limits":
+        """Build from a `[limits]` section; `is_current()` then tells whether the section has changed since"""
+        settings = {k: v for k, v in section.items() if not k.startswith('_')}
+        limits = cls(**settings)
+        limits.source = section
+        limits.stamp = section_stamp(section)
+        return limits
+
+    def is_current(self) -> bool:
+        return self.source is None or self.stamp == section_stamp(self.source)
+
+    def _bucket(self, kind: str, name: str, spec: tuple[float, int | None]) -> TokenBucket:
+        key = (kind, name)
+        if (bucket := self._buckets.get(key)) is None:
+            with self._lock:
+                if (bucket := self._buckets.get(key)) is None:
+                    bucket = self._buckets[key] = TokenBucket(*spec)
+        return bucket
+
+    def buckets(self, host: str, route: str = None) -> list[TokenBucket]:
+        buckets = [self._bucket("host", host, self.hosts.get(host, (self.rate, self.burst)))]
+        if route is not None and route in self.routes:
+            buckets.append(self._bucket("route", route, self.routes[route]))
+        return buckets
+
+    def limiter(self, host: str) -> AdaptiveLimiter | None:
+        if not self.adaptive:
+            return None
+        if (limiter := self._limiters.get(host)) is None:
+            with self._lock:
+                if (limiter := self._limiters.get(host)) is None:
+                    limiter = self._limiters[host] = AdaptiveLimiter(
+                        self.initial_concurrency, self.min_concurrency, self.max_concurrency,
+                        latency_factor=self.latency_factor
+                    )
+        return limiter
+
+    def reserve(self, host: str, route: str = None) -> float:
+        """Take a token from every bucket that applies and return the longest wait"""
+        return max(bucket.reserve() for bucket in self.buckets(host, route))
+
+    def slot(self, url: str, route: str = None) -> Slot:
+        return Slot(self, urlsplit(url).netloc, route)
+
+    def finish(self, slot: Slot, exc: BaseException = None):
+        status = slot.response.status_code if slot.response is not None else None
+        overloaded = status in OVERLOAD_STATUSES or isinstance(exc, httpx.TimeoutException)
+        if status in OVERLOAD_STATUSES and (delay := retry_after(slot.response.headers)):
+            log.warning(f"{self}: {slot.host} answered {status}, pausing requests to it for {delay:.1f}s")
+            for bucket in self.buckets(slot.host, slot.route):
+                bucket.pause(delay)
+        if slot.limiter is not None:
+            healthy = exc is None and status is not None
+            slot.limiter.release(time.perf_counter() - slot.started if healthy else None, overloaded)
+
+    @property
+    def stats(self) -> dict:
+        """Current concurrency limit and requests in flight per host (adaptive mode)"""
+        return {host: {"limit": int(limiter.limit), "inflight": limiter.inflight}
+                for host, limiter in self._limiters.items()}
@@ -0,0 +1,61 @@
+import os
+from contextlib import contextmanager
+
+from loguru import logger as log
+
+from . import REPR
+
+MODES = ("debug", "normal", "quiet")
+
+
+class LogPolicy:
+    """Which of the library's own messages get built at all.
+
+    Hot paths test a flag here before formatting anything, so a filtered message costs one attribute read instead
+    of an f-string and a loguru call:
+      - `routine`: per-request and per-key messages (on in "normal" and "debug")
+      - `detail`: resolved values and response details (only in "debug")
+    "quiet" leaves only warnings and errors, which are never gated. The starting mode comes from the
+    TOOMANYCONFIGS_LOG environment variable, defaulting to "normal" (also used, with a warning, for unknown values).
+    """
+    __slots__ = ("mode", "routine", "detail")
+
+    def __init__(self, mode: str = "normal"):
+        self.set(mode)
+
+    def __repr__(self):
+        return f"[LogPolicy: {self.mode}]"
+
+    def set(self, mode: str):
+        if mode not in MODES:
+            raise ValueError(f"Unknown log mode '{mode}', expected one of {MODES}")
+        self.mode = mode
+        self.routine = mode != "quiet"
+        self.detail = mode == "debug"
+
+
+def _initial_mode() -> str:
+    mode = os.environ.get("TOOMANYCONFIGS_LOG", "normal").lower()
+    if mode not in MODES:
+        log.warning(f"{REPR}: Ignoring unknown TOOMANYCONFIGS_LOG '{mode}', expected one of {MODES}; using 'normal'")
+        return "normal"
+    return mode
+
+
+LOGS = LogPolicy(_initial_mode())
+
+
+def set_log_mode(mode: str):
+    """Switch the library-wide log mode: "debug", "normal" or "quiet" (for hot paths in production)"""
+    LOGS.set(mode)
+
+
+@contextmanager
+def log_mode(mode: str):
+    """Use a log mode for the duration of a block"""
+    previous = LOGS.mode
+    LOGS.set(mode)
+    try:
+        yield LOGS
+    finally:
+        LOGS.set(previous)
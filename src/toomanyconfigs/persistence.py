@@ -0,0 +1,125 @@
+import asyncio
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Callable
+
+from loguru import logger as log
+
+_STOP = object()
+
+
+class _Flush:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class WriteBehind:
+    """Collects writes and hands them to `write_batch` in batches on a background thread.
+
+    A batch is flushed once it reaches `batch_size` items or `interval` seconds after its first item.
+    When `max_queue` items are pending, `put()` blocks (and `aput()` waits) until the writer catches up.
+    """
+
+    def __init__(
+            self,
+            write_batch: Callable[[list], Any],
+            batch_size: int = 100,
+            interval: float = 1.0,
+            max_queue: int = 10_000,
+            name: str = "write-behind"
+    ):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.interval = interval
+        self.name = name
+        self.written = 0
+        self.failed = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __repr__(self):
+        return f"[WriteBehind: {self.name}, {self.pending} pending]"
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def put(self, item, timeout: float = None):
+        """Enqueue `item`, blocking while the queue is full"""
+        if self._closed:
+            raise RuntimeError(f"{self} is closed")
+        self._queue.put(item, timeout=timeout)
+
+    async def aput(self, item, poll: float = 0.01):
+        """Enqueue `item` without blocking the event loop, waiting while the queue is full"""
+        if self._closed:
+            raise RuntimeError(f"{self} is closed")
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                await asyncio.sleep(poll)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until everything enqueued so far is persisted"""
+        if self._closed or not self._thread.is_alive():
+            return True
+        marker = _Flush()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = None):
+        """Flush what's pending and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _write(self, batch: list) -> list:
+        """Hand `batch` over and return an empty one; the list given to `write_batch` is never reused"""
+        if not batch:
+            return batch
+        try:
+            self.write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            log.error(f"{self}: Failed to persist {len(batch)} item(s): {e}")
+        return []
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # The oldest item in the batch has waited `interval`
+                batch = self._write(batch)
+                deadline = None
+                continue
+
+            if item is _STOP:
+                self._write(batch)
+                return
+            if isinstance(item, _Flush):
+                batch = self._write(batch)
+                deadline = None
+                item.done.set()
+                continue
+
+            batch.append(item)
+            if deadline is None:
+                deadline = time.monotonic() + self.interval
+            if len(batch) >= self.batch_size:
+                batch = self._write(batch)
+                deadline = None
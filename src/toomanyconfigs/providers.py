@@ -0,0 +1,181 @@
+import os
+import sys
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from loguru import logger as log
+
+from . import REPR
+from .logs import LOGS
+
+# Where container runtimes (Docker, Kubernetes) mount secrets by default
+SECRETS_DIR = Path("/run/secrets")
+
+_TRUE = frozenset({"1", "true", "yes", "on"})
+_FALSE = frozenset({"0", "false", "no", "off", ""})
+
+
+def coerce(value, field_type):
+    """Convert a string from the environment, a file or a prompt to the field's annotated int/float/bool"""
+    if not isinstance(value, str) or field_type in (str, None):
+        return value
+    if field_type is bool:
+        lowered = value.strip().lower()
+        if lowered in _TRUE or lowered in _FALSE:
+            return lowered in _TRUE
+        raise ValueError(f"Not a boolean: {value!r}")
+    if field_type in (int, float):
+        return field_type(value.strip())
+    return value
+
+
+class ValueProvider:
+    """Supplies values for fields a config is missing. `owner` is the config's section name (its class name,
+    lowercased); `provide` returns whatever it has for `fields` and leaves the rest to the next provider.
+
+    Provided values are kept in memory only, so secrets from the environment never end up in the file, unless the
+    provider sets `persist` (as the prompt does: a typed answer is saved so it isn't asked for again).
+    """
+    name = "provider"
+    persist = False
+
+    def __repr__(self):
+        return f"[{self.__class__.__name__}]"
+
+    def provide(self, owner: str, fields: list[str]) -> dict:
+        raise NotImplementedError
+
+
+class EnvProvider(ValueProvider):
+    """`{PREFIX}{OWNER}_{FIELD}` environment variables, e.g. ROUTESCONFIG_BASE"""
+    name = "environment"
+
+    def __init__(self, prefix: str = "", environ: Mapping[str, str] = None):
+        self.prefix = prefix.upper()
+        self.environ = os.environ if environ is None else environ
+
+    def __repr__(self):
+        return f"[EnvProvider: {self.prefix}*]"
+
+    def provide(self, owner: str, fields: list[str]) -> dict:
+        found = {}
+        for field in fields:
+            value = self.environ.get(f"{self.prefix}{owner}_{field}".upper())
+            if value is not None:
+                found[field] = value
+        return found
+
+
+class SecretsDirProvider(ValueProvider):
+    """Files named `{owner}_{field}` in a secrets directory (/run/secrets by default), trailing newline stripped"""
+    name = "secrets"
+
+    def __init__(self, directory: Path | str = SECRETS_DIR):
+        self.directory = Path(directory)
+
+    def __repr__(self):
+        return f"[SecretsDirProvider: {self.directory}]"
+
+    def provide(self, owner: str, fields: list[str]) -> dict:
+        try:
+            # One listing instead of a stat per field; a missing directory means there is nothing to find
+            names = set(os.listdir(self.directory))
+        except OSError:
+            return {}
+        found = {}
+        for field in fields:
+            for name in (f"{owner}_{field}", f"{owner}_{field}".upper()):
+                if name in names:
+                    found[field] = (self.directory / name).read_text().rstrip("\r\n")
+                    break
+        return found
+
+
+class MappingProvider(ValueProvider):
+    """Values from a mapping, keyed `"owner.field"` or just `"field"`"""
+    name = "mapping"
+
+    def __init__(self, values: Mapping):
+        self.values = values
+
+    def __repr__(self):
+        return f"[MappingProvider: {len(self.values)} values]"
+
+    def provide(self, owner: str, fields: list[str]) -> dict:
+        found = {}
+        for field in fields:
+            for key in (f"{owner}.{field}", field):
+                if key in self.values:
+                    found[field] = self.values[key]
+                    break
+        return found
+
+
+class PromptProvider(ValueProvider):
+    """Asks on the terminal, falling back to the clipboard when the answer is empty. Without a terminal (as in a
+    container or CI) it provides nothing rather than block on input."""
+    name = "prompt"
+    persist = True
+
+    def __init__(self, clipboard: bool = True, require_tty: bool = True):
+        self.clipboard = clipboard
+        self.require_tty = require_tty
+
+    def available(self) -> bool:
+        return not self.require_tty or (sys.stdin is not None and sys.stdin.isatty())
+
+    def _paste(self) -> str:
+        try:
+            import pyperclip  # only now: it probes for a clipboard tool on import and paste()
+            return pyperclip.paste() or ""
+        except Exception as e:
+            log.warning(f"{REPR}: Clipboard unavailable: {e}")
+            return ""
+
+    def provide(self, owner: str, fields: list[str]) -> dict:
+        if not self.available():
+            log.warning(f"{REPR}: No terminal to prompt on for [{owner}] {fields}")
+            return {}
+        found = {}
+        for field in fields:
+            hint = " (or press Enter to paste from clipboard)" if self.clipboard else ""
+            value = input(f"[{owner}]: Enter value for '{field}'{hint}: ").strip()
+            if not value and self.clipboard:
+                value = self._paste().strip()
+                if value:
+                    log.debug(f"{REPR}: Using clipboard value for [{owner}] '{field}'")
+            if value:
+                found[field] = value
+        return found
+
+
+def default_providers(prompt: bool = True) -> list[ValueProvider]:
+    """Environment, then the secrets directory, then (with `prompt`) the terminal"""
+    providers = [EnvProvider(), SecretsDirProvider()]
+    if prompt:
+        providers.append(PromptProvider())
+    return providers
+
+
+def resolve(owner: str, fields: list[str], providers: Iterable[ValueProvider],
+            types: Mapping[str, type] = None) -> dict[str, tuple[object, ValueProvider]]:
+    """Ask each provider in turn for whichever of `fields` are still unresolved, in one pass over the pipeline.
+
+    Returns `{field: (value, provider it came from)}`.
+    """
+    types = types or {}
+    routine = LOGS.routine
+    resolved, remaining = {}, list(fields)
+    for provider in providers:
+        if not remaining:
+            break
+        for field, value in provider.provide(owner, remaining).items():
+            try:
+                resolved[field] = coerce(value, types.get(field)), provider
+            except ValueError as e:
+                log.warning(f"{REPR}: Ignoring {provider.name} value for [{owner}] '{field}': {e}")
+                continue
+            if routine:
+                log.debug(f"{REPR}: [{owner}] '{field}' from {provider.name}")
+        remaining = [field for field in remaining if field not in resolved]
+    return resolved
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+def _stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ConfigRegistry:
+    """Process-wide memo of built configs, keyed on (class, resolved path, create options) and checked against the
+    file's mtime/size. Options are whatever changes how `create()` builds an instance (providers, prompting,
+    writing), so a call made with other options never gets an instance it didn't ask for."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[type, Path, tuple], tuple[tuple[int, int], object]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return f"[ConfigRegistry: {len(self)}/{self.maxsize}]"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: tuple[type, Path]):
+        cls, path = key
+        path = Path(path).resolve()
+        return any(k[0] is cls and k[1] == path for k in list(self._entries))
+
+    def get(self, cls: type, path: Path, options: tuple = ()):
+        """Return the instance built for this class, file and options, unless the file changed since"""
+        key = (cls, Path(path).resolve(), options)
+        stamp = _stamp(key[1])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or stamp is None or entry[0] != stamp:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, inst, options: tuple = ()):
+        """Remember `inst` under its class, options and current file stamp, evicting the least recently used"""
+        key = (type(inst), Path(inst._path).resolve(), options)
+        stamp = _stamp(key[1])
+        if stamp is None:
+            return
+        with self._lock:
+            self._entries[key] = (stamp, inst)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def refresh(self, inst):
+        """Re-stamp `inst` after it wrote its file or reloaded it, if it is a registered instance"""
+        cls, path = type(inst), Path(inst._path).resolve()
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry[1] is inst and key[0] is cls and key[1] == path:
+                    self._entries[key] = (_stamp(path), inst)
+
+    def invalidate(self, cls: type = None, path: Path = None) -> int:
+        """Drop entries matching `cls` and/or `path` (everything when neither is given)"""
+        path = Path(path).resolve() if path else None
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if (cls is None or key[0] is cls) and (path is None or key[1] == path)
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self), "maxsize": self.maxsize}
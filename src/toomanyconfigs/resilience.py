@@ -0,0 +1,274 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Mapping
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger as log
+
+from .limits import retry_after
+from .substitution import section_stamp
+
+# Safe to send twice: repeating them can't change the outcome
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Failures where the request never reached the server, so even a POST can go again
+_NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class LatencyWindow:
+    """Latencies of the last `size` requests; percentiles are computed lazily and cached until the next sample"""
+
+    def __init__(self, size: int = 256):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._sorted: list[float] | None = None
+
+    def __len__(self):
+        return len(self._samples)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self._sorted = None
+
+    def percentile(self, p: float) -> float:
+        ordered = self._sorted
+        if ordered is None:
+            ordered = self._sorted = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class ResilienceStats:
+    """Counters for retries and hedging"""
+    FIELDS = ("attempts", "retries", "exhausted", "hedges", "hedge_wins")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        for name in self.FIELDS:
+            setattr(self, name, 0)
+
+    def __repr__(self):
+        return f"[ResilienceStats: {self.as_dict()}]"
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class RetryPolicy:
+    """Retries with exponential backoff and full jitter, plus optional hedged requests.
+
+    Idempotent requests are retried on transport errors and on `statuses`, honouring Retry-After up to
+    `max_backoff`; any method is retried when the connection was never made. With `hedge`, an idempotent request
+    still running after the host's `hedge_percentile` latency gets a duplicate, and the first response wins.
+    """
+
+    def __init__(
+            self,
+            attempts: int = 3,
+            backoff: float = 0.2,
+            max_backoff: float = 10.0,
+            statuses=RETRY_STATUSES,
+            hedge: bool = False,
+            hedge_percentile: float = 95.0,
+            hedge_min_delay: float = 0.01,
+            hedge_min_samples: int = 20,
+            methods=IDEMPOTENT_METHODS
+    ):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.methods = frozenset(m.upper() for m in methods)
+        self.stats = ResilienceStats()
+        self.source = None
+        self.stamp = None
+        self._latency: dict[str, LatencyWindow] = {}
+
+    def __repr__(self):
+        return f"[RetryPolicy: {self.attempts} attempts{', hedged' if self.hedge else ''}]"
+
+    def __getstate__(self):
+        # Latency windows and counters are runtime state; a pickle keeps only the settings
+        return {
+            "attempts": self.attempts, "backoff": self.backoff, "max_backoff": self.max_backoff,
+            "statuses": tuple(self.statuses), "hedge": self.hedge, "hedge_percentile": self.hedge_percentile,
+            "hedge_min_delay": self.hedge_min_delay, "hedge_min_samples": self.hedge_min_samples,
+            "methods": tuple(self.methods),
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @classmethod
+    def from_config(cls, section: Mapping) -> "RetryPolicy":
+        """Build from a `[retries]` section; `is_current()` then tells whether the section has changed since"""
+        policy = cls(**{k: v for k, v in section.items() if not k.startswith('_')})
+        policy.source = section
+        policy.stamp = section_stamp(section)
+        return policy
+
+    def is_current(self) -> bool:
+        return self.source is None or self.stamp == section_stamp(self.source)
+
+    # Decisions
+
+    def backoff_delay(self, attempt: int, response: httpx.Response = None) -> float | None:
+        """Seconds to wait before attempt `attempt + 1`, or None if Retry-After asks for longer than max_backoff"""
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        if response is not None and (asked := retry_after(response.headers)) is not None:
+            if asked > self.max_backoff:
+                return None
+            delay = max(delay, asked)
+        return delay
+
+    def _next_delay(self, method: str, attempt: int, response: httpx.Response = None,
+                    exc: Exception = None) -> float | None:
+        """How long to wait before trying again, or None to stop here"""
+        if exc is not None:
+            retryable = isinstance(exc, _NOT_SENT) or (method in self.methods and isinstance(exc, httpx.TransportError))
+        else:
+            retryable = method in self.methods and response.status_code in self.statuses
+        if not retryable:
+            return None
+        if attempt >= self.attempts:
+            self.stats.incr("exhausted")
+            return None
+        return self.backoff_delay(attempt, response)
+
+    def hedge_delay(self, host: str) -> float | None:
+        window = self._latency.get(host)
+        if window is None or len(window) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, window.percentile(self.hedge_percentile))
+
+    def _observe(self, host: str, seconds: float):
+        if (window := self._latency.get(host)) is None:
+            window = self._latency.setdefault(host, LatencyWindow())
+        window.add(seconds)
+
+    def _log_retry(self, method: str, url: str, attempt: int, delay: float, response=None, exc=None):
+        reason = type(exc).__name__ if exc is not None else response.status_code
+        log.warning(f"{self}: {method} {url} failed ({reason}), retry {attempt}/{self.attempts - 1} in {delay:.2f}s")
+
+    # Sync
+
+    def _timed(self, send: Callable[[], httpx.Response], host: str) -> httpx.Response:
+        self.stats.incr("attempts")
+        started = time.perf_counter()
+        response = send()
+        self._observe(host, time.perf_counter() - started)
+        return response
+
+    def _hedged(self, send: Callable[[], httpx.Response], host: str, pool: ThreadPoolExecutor) -> httpx.Response:
+        delay = self.hedge_delay(host)
+        if delay is None or pool is None:
+            return self._timed(send, host)
+
+        first = pool.submit(self._timed, send, host)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self.stats.incr("hedges")
+        second = pool.submit(self._timed, send, host)
+        pending, error = {first, second}, None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self.stats.incr("hedge_wins")
+                    return future.result()  # the loser finishes in the background and is dropped
+                error = error or future.exception()
+        raise error
+
+    def run(self, method: str, url: str, send: Callable[[], httpx.Response],
+            pool: ThreadPoolExecutor = None) -> httpx.Response:
+        """Call `send` until it succeeds or the policy gives up; hedged copies run on `pool`"""
+        method, host = method.upper(), urlsplit(url).netloc
+        hedge = self.hedge and method in self.methods
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self._hedged(send, host, pool) if hedge else self._timed(send, host)
+            except Exception as e:
+                if (delay := self._next_delay(method, attempt, exc=e)) is None:
+                    raise
+                self._log_retry(method, url, attempt, delay, exc=e)
+            else:
+                if (delay := self._next_delay(method, attempt, response)) is None:
+                    return response
+                self._log_retry(method, url, attempt, delay, response)
+            self.stats.incr("retries")
+            time.sleep(delay)
+
+    # Async
+
+    async def _atimed(self, send: Callable[[], Awaitable[httpx.Response]], host: str) -> httpx.Response:
+        self.stats.incr("attempts")
+        started = time.perf_counter()
+        response = await send()
+        self._observe(host, time.perf_counter() - started)
+        return response
+
+    async def _ahedged(self, send: Callable[[], Awaitable[httpx.Response]], host: str) -> httpx.Response:
+        delay = self.hedge_delay(host)
+        if delay is None:
+            return await self._atimed(send, host)
+
+        first = asyncio.ensure_future(self._atimed(send, host))
+        pending = {first}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return first.result()
+
+            self.stats.incr("hedges")
+            second = asyncio.ensure_future(self._atimed(send, host))
+            pending.add(second)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.stats.incr("hedge_wins")
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def arun(self, method: str, url: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """`run` for coroutines; a hedge is a second task and the loser is cancelled"""
+        method, host = method.upper(), urlsplit(url).netloc
+        hedge = self.hedge and method in self.methods
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await (self._ahedged(send, host) if hedge else self._atimed(send, host))
+            except Exception as e:
+                if (delay := self._next_delay(method, attempt, exc=e)) is None:
+                    raise
+                self._log_retry(method, url, attempt, delay, exc=e)
+            else:
+                if (delay := self._next_delay(method, attempt, response)) is None:
+                    return response
+                self._log_retry(method, url, attempt, delay, response)
+            self.stats.incr("retries")
+            await asyncio.sleep(delay)
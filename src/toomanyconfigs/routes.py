@@ -0,0 +1,75 @@
+from string import Formatter
+from typing import Mapping
+
+from .substitution import section_stamp
+
+_FORMATTER = Formatter()
+
+
+class RouteTemplate:
+    """A full URL whose `{name}` path parameters are parsed once, up front"""
+    __slots__ = ("url", "params")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.params = frozenset(
+            field.partition('.')[0].partition('[')[0]
+            for _, field, _, _ in _FORMATTER.parse(url) if field is not None
+        )
+        if "" in self.params:
+            raise ValueError(f"Route '{url}' uses positional '{{}}' parameters; name them, e.g. '{{id}}'")
+
+    def __repr__(self):
+        return f"[RouteTemplate: {self.url}]"
+
+    def render(self, params: Mapping = None) -> str:
+        if not params:
+            return self.url
+        if missing := self.params.difference(params):
+            raise ValueError(f"Route '{self.url}' is missing path parameter(s): {sorted(missing)}")
+        return self.url.format_map(params)
+
+
+class RouteTable:
+    """The shortcuts of a RoutesConfig, each compiled into a ready URL template from the resolved base and shortcut
+    the first time it is used, so a malformed shortcut only fails the requests made with it"""
+
+    def __init__(self, routes):
+        self.source = routes
+        self.stamp = section_stamp(routes)
+        self.base = routes.base or ""
+        self.shortcuts = dict.get(routes, 'shortcuts') or {}
+        self.names = frozenset(name for name in dict.keys(self.shortcuts) if not name.startswith('_'))
+        self.routes: dict[str, RouteTemplate] = {}
+
+    def __repr__(self):
+        return f"[RouteTable: {len(self.names)} routes, {len(self.routes)} compiled]"
+
+    def __contains__(self, route):
+        return route in self.names
+
+    def template(self, route: str) -> RouteTemplate | None:
+        """The compiled template for a shortcut name, or None when `route` isn't a shortcut"""
+        if (template := self.routes.get(route)) is None and route in self.names:
+            template = self.routes[route] = RouteTemplate(self.base + str(self.shortcuts[route]))
+        return template
+
+    def is_current(self) -> bool:
+        """False once the routes, shortcuts or vars it was built from have changed"""
+        return self.stamp == section_stamp(self.source)
+
+    def build(self, route: str = None, append: str = "", format: Mapping = None) -> str:
+        """The full URL for a shortcut name, or for a path relative to the base when `route` isn't a shortcut"""
+        if not route:
+            path = self.base
+        elif (template := self.template(route)) is not None:
+            path = template.render(format)
+            format = None
+        else:
+            path = self.base + str(route)
+
+        if format:
+            path = RouteTemplate(path).render(format)
+        if append:
+            path += append
+        return path
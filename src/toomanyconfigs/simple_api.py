@@ -1,12 +1,26 @@
 import json
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from urllib.parse import urlsplit
 
 import httpx
 from httpx import Response
 from loguru import logger as log
 from pickleclass import PickleClass
 
+from .cache import request_key
+from .clients import ClientPool
+from .concurrency import (
+    COALESCE_METHODS, AsyncCoalescer, ManagedExecutor, SyncCoalescer, gather_limited, threaded_limited
+)
+from .diskcache import DiskCache
+from .instrumentation import Instrumentation
+from .limits import UNLIMITED, Limits
+from .logs import LOGS
+from .streaming import StreamResponse, aopen_stream, open_stream
+
 
 @dataclass
 class SimpleAPIResponse:
@@ -16,19 +30,80 @@ class SimpleAPIResponse:
     body: dict | str
 
 
+def _dump_response(response: SimpleAPIResponse) -> bytes:
+    return json.dumps(asdict(response), separators=(',', ':')).encode()
+
+
+def _load_response(data: bytes) -> SimpleAPIResponse:
+    return SimpleAPIResponse(**json.loads(data))
+
+
+def _label(path: str) -> str:
+    """Metrics label for a path: without its query string; Instrumentation caps how many distinct ones it keeps"""
+    return urlsplit(path).path or "/"
+
+
 class SimpleAPI(PickleClass):
-    def __init__(self, base_url: str, headers: Optional[Dict] = None, cache: bool = True):
+    def __init__(
+            self,
+            base_url: str,
+            headers: Optional[Dict] = None,
+            cache: bool = True,
+            limits: httpx.Limits = None,
+            http2: bool = False,
+            timeout: float | httpx.Timeout = None,
+            max_workers: int = 16,
+            cache_dir: str | Path = None,
+            cache_ttl: float = None,
+            rate_limit: float | Limits = None,
+            instrumentation: Instrumentation = None
+    ):
         PickleClass.__init__(
             self
         )
         self.base_url = base_url.rstrip('/')
         self.headers = headers or {}
         self.cache_enabled = cache
-        self.cache: Dict[str, SimpleAPIResponse] = {}
+        # With a cache_dir, responses persist on disk (optionally expiring after cache_ttl seconds)
+        self.cache: Dict[str, SimpleAPIResponse] | DiskCache = DiskCache(
+            cache_dir, default_ttl=cache_ttl, dumps=_dump_response, loads=_load_response
+        ) if cache_dir else {}
+        self.clients = ClientPool(limits=limits, http2=http2, timeout=timeout)
+        self.executor = ManagedExecutor(max_workers, name="simple-api")
+        # A number is requests per second per host; pass a Limits for per-route rates or adaptive concurrency
+        self.rate_limits = Limits(rate=rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+        self.instrumentation = instrumentation or Instrumentation()
+        self._inflight = AsyncCoalescer()
+        self._sync_inflight = SyncCoalescer()
 
     def __repr__(self):
         return f"[{self.__class__.__name__}]"
 
+    def close(self):
+        """Stop batch workers, close the pooled connections and write out a disk cache's index"""
+        self.executor.shutdown()
+        self.clients.close()
+        if isinstance(self.cache, DiskCache):
+            self.cache.close()
+
+    async def aclose(self):
+        self.executor.shutdown(wait=False)
+        await self.clients.aclose()
+        if isinstance(self.cache, DiskCache):
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
     def _build_path(self, path: str = "") -> str:
         """Build the full request path"""
         if path.startswith('http'):
@@ -40,18 +115,17 @@ class SimpleAPI(PickleClass):
         if force_refresh or not self.cache_enabled:
             return None
 
-        cache_key = f"{method.upper()}:{path}"
-        if cache_key in self.cache:
+        cached = self.cache.get(f"{method.upper()}:{path}")
+        if cached is not None and LOGS.routine:
             log.debug(f"{self}: Cache hit for {method.upper()} {path}")
-            return self.cache[cache_key]
-        return None
+        return cached
 
     def _make_response(self, httpx_response: Response, method: str) -> SimpleAPIResponse:
         try:
             body = httpx_response.json()
         except Exception as e:
             log.warning(f"{self}: Could not get JSON from {httpx_response.request.url}\n  - Returning string instead: {e}")
-            body = httpx_response
+            body = httpx_response.text
 
         return SimpleAPIResponse(
             status=httpx_response.status_code,
@@ -60,16 +134,78 @@ class SimpleAPI(PickleClass):
             body=body,
         )
 
+    @staticmethod
+    def _coalesce_key(method: str, full_path: str, request_headers: dict, kwargs: dict):
+        """Identical safe requests in flight at the same time share one network call"""
+        if method.upper() not in COALESCE_METHODS or 'files' in kwargs:
+            return None
+        key = request_key(method, full_path, kwargs.get('params'), kwargs.get('json'),
+                          kwargs.get('data'), kwargs.get('content'))
+        return key and (key, tuple(sorted(request_headers.items())))
+
+    def _finish(self, response: Response, method: str, full_path: str) -> SimpleAPIResponse:
+        if LOGS.detail:
+            log.debug(f"{self}: {response.status_code} from {method.upper()} {full_path} "
+                      f"({len(response.content)} bytes)")
+
+        # Create response object
+        result = self._make_response(response, method)
+
+        # Cache if enabled
+        if self.cache_enabled:
+            cache_key = f"{method.upper()}:{full_path}"
+            self.cache[cache_key] = result
+
+        return result
+
+    def _slot(self, full_path: str, path: str):
+        return self.rate_limits.slot(full_path, path) if self.rate_limits is not None else UNLIMITED
+
+    def _send(self, method: str, full_path: str, request_headers: dict, kwargs: dict,
+              path: str = None) -> SimpleAPIResponse:
+        instrumentation = self.instrumentation
+        with self._slot(full_path, path) as slot:
+            timing = instrumentation.start(method, _label(path), full_path)
+            try:
+                response = self.clients.client.request(
+                    method.upper(), full_path, headers=request_headers, **instrumentation.extensions(timing, kwargs)
+                )
+            except Exception as e:
+                instrumentation.fail(timing, e)
+                raise
+            slot.record(response)
+        instrumentation.finish(timing, response)
+        return self._finish(response, method, full_path)
+
+    async def _async_send(self, method: str, full_path: str, request_headers: dict, kwargs: dict,
+                          path: str = None) -> SimpleAPIResponse:
+        instrumentation = self.instrumentation
+        async with self._slot(full_path, path) as slot:
+            timing = instrumentation.start(method, _label(path), full_path)
+            try:
+                response = await self.clients.async_client.request(
+                    method.upper(), full_path, headers=request_headers,
+                    **instrumentation.extensions(timing, kwargs, is_async=True)
+                )
+            except Exception as e:
+                instrumentation.fail(timing, e)
+                raise
+            slot.record(response)
+        instrumentation.finish(timing, response)
+        return self._finish(response, method, full_path)
+
     def request(self, method: str, path: str = "", force_refresh: bool = False,
                 headers: Optional[Dict] = None, **kwargs) -> SimpleAPIResponse:
         """Make synchronous HTTP request"""
         full_path = self._build_path(path)
         method = method.lower()
 
-        log.info(f"{self}: {method.upper()} request to {full_path}")
+        if LOGS.routine:
+            log.info(f"{self}: {method.upper()} request to {full_path}")
 
         # Check cache first
         if cached := self._check_cache(full_path, method, force_refresh):
+            self.instrumentation.cache_hit(method, _label(path), full_path)
             return cached
 
         # Merge headers
@@ -77,21 +213,10 @@ class SimpleAPI(PickleClass):
         if headers:
             request_headers.update(headers)
 
-        # Make request
-        with httpx.Client(headers=request_headers) as client:
-            response = client.request(method.upper(), full_path, **kwargs)
-            log.debug(f"{self}: Got raw HTTP response for {method.upper()} request to {full_path}: \n{response.__dict__}")
-
-
-        # Create response object
-        result = self._make_response(response, method)
-
-        # Cache if enabled
-        if self.cache_enabled:
-            cache_key = f"{method.upper()}:{full_path}"
-            self.cache[cache_key] = result
-
-        return result
+        # Make request, sharing an identical one already in flight
+        if key := self._coalesce_key(method, full_path, request_headers, kwargs):
+            return self._sync_inflight.run(key, lambda: self._send(method, full_path, request_headers, kwargs, path))
+        return self._send(method, full_path, request_headers, kwargs, path)
 
     async def async_request(self, method: str, path: str = "", force_refresh: bool = False,
                             headers: Optional[Dict] = None, **kwargs) -> SimpleAPIResponse:
@@ -99,10 +224,12 @@ class SimpleAPI(PickleClass):
         full_path = self._build_path(path)
         method = method.lower()
 
-        log.info(f"{self}: {method.upper()} request to {full_path}")
+        if LOGS.routine:
+            log.info(f"{self}: {method.upper()} request to {full_path}")
 
         # Check cache first
         if cached := self._check_cache(full_path, method, force_refresh):
+            self.instrumentation.cache_hit(method, _label(path), full_path)
             return cached
 
         # Merge headers
@@ -110,17 +237,74 @@ class SimpleAPI(PickleClass):
         if headers:
             request_headers.update(headers)
 
-        # Make request
-        async with httpx.AsyncClient(headers=request_headers) as client:
-            response = await client.request(method.upper(), full_path, **kwargs)
-            log.debug(f"{self}: Got raw HTTP response for {method.upper()} request to {full_path}: \n{response.__dict__}")
+        # Make request, sharing an identical one already in flight
+        if key := self._coalesce_key(method, full_path, request_headers, kwargs):
+            return await self._inflight.run(
+                key, lambda: self._async_send(method, full_path, request_headers, kwargs, path)
+            )
+        return await self._async_send(method, full_path, request_headers, kwargs, path)
 
-        # Create response object
-        result = self._make_response(response, method)
+    @contextmanager
+    def stream(self, method: str, path: str = "", mode: str = "bytes", chunk_size: int = None,
+               headers: Optional[Dict] = None, **kwargs) -> Iterator[StreamResponse]:
+        """Open a request and iterate its body (as bytes, text, lines, NDJSON records or JSON array items)
+        without holding it in memory. Streamed responses are never cached, but take a rate-limit slot and are
+        timed like any other request.
+        """
+        full_path = self._build_path(path)
+        if LOGS.routine:
+            log.info(f"{self}: Streaming {method.upper()} request to {full_path}")
+        with open_stream(self.clients.client, self._slot(full_path, path), self.instrumentation, method.lower(),
+                         full_path, _label(path), {**self.headers, **(headers or {})}, kwargs,
+                         mode, chunk_size) as stream:
+            yield stream
 
-        # Cache if enabled
-        if self.cache_enabled:
-            cache_key = f"{method.upper()}:{full_path}"
-            self.cache[cache_key] = result
+    @asynccontextmanager
+    async def async_stream(self, method: str, path: str = "", mode: str = "bytes", chunk_size: int = None,
+                           headers: Optional[Dict] = None, **kwargs) -> AsyncIterator[StreamResponse]:
+        """`stream` for async code; iterate the stream with `async for`"""
+        full_path = self._build_path(path)
+        if LOGS.routine:
+            log.info(f"{self}: Streaming {method.upper()} request to {full_path}")
+        async with aopen_stream(self.clients.async_client, self._slot(full_path, path), self.instrumentation,
+                                method.lower(), full_path, _label(path), {**self.headers, **(headers or {})}, kwargs,
+                                mode, chunk_size) as stream:
+            yield stream
 
-        return result
+    def _batch_calls(self, requests: list[dict], call, per_host: int = None) -> list:
+        """Pair each request spec ({'method': 'get', 'path': ..., **kwargs}) with its host and a call"""
+        calls = []
+        for spec in requests:
+            spec = dict(spec)
+            method = spec.pop('method', 'get')
+            host = urlsplit(self._build_path(spec.get('path', ''))).netloc if per_host else None
+            calls.append((host, lambda method=method, spec=spec: call(method, **spec)))
+        return calls
+
+    async def async_request_many_iter(
+            self, requests: list[dict], concurrency: int = 10, per_host: int = None
+    ) -> AsyncIterator[tuple[int, SimpleAPIResponse | Exception]]:
+        """Run many requests concurrently, yielding (index, response or exception) as each completes"""
+        calls = self._batch_calls(requests, self.async_request, per_host)
+        async for index, result in gather_limited(calls, concurrency, per_host):
+            yield index, result
+
+    async def async_request_many(self, requests: list[dict], concurrency: int = 10, per_host: int = None) -> list:
+        """Run many requests concurrently; results (responses or exceptions) come back in request order"""
+        results = [None] * len(requests)
+        async for index, result in self.async_request_many_iter(requests, concurrency, per_host):
+            results[index] = result
+        return results
+
+    def request_many_iter(
+            self, requests: list[dict], concurrency: int = 10, per_host: int = None
+    ) -> Iterator[tuple[int, SimpleAPIResponse | Exception]]:
+        """`async_request_many_iter` for sync code, run on the instance's thread pool"""
+        calls = self._batch_calls(requests, self.request, per_host)
+        yield from threaded_limited(self.executor.pool, calls, concurrency, per_host)
+
+    def request_many(self, requests: list[dict], concurrency: int = 10, per_host: int = None) -> list:
+        results = [None] * len(requests)
+        for index, result in self.request_many_iter(requests, concurrency, per_host):
+            results[index] = result
+        return results
@@ -0,0 +1,208 @@
+import json
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Iterator
+
+import httpx
+
+MODES = ("bytes", "text", "lines", "ndjson", "json")
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+class JSONArrayDecoder:
+    """Decodes the items of a top-level JSON array from text fed in pieces, holding at most one partial item.
+
+    A failed attempt on a partial item isn't retried until a few KB more have arrived, so one huge item doesn't
+    get re-parsed from scratch for every small chunk.
+    """
+
+    def __init__(self, retry_bytes: int = 4096):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._state = "start"  # start -> first -> separator -> item -> separator ... -> done
+        self._retry_at = 0
+        self._retry_bytes = retry_bytes
+
+    def feed(self, text: str) -> list:
+        """Add text and return every item it completes"""
+        self._buffer += text
+        if len(self._buffer) < self._retry_at:
+            return []
+        return self._drain(final=False)
+
+    def close(self) -> list:
+        """Decode whatever is left; raises ValueError if the document is incomplete or malformed"""
+        items = self._drain(final=True)
+        if self._state != "done":
+            raise ValueError("Incomplete JSON array")
+        if self._buffer.strip(_WHITESPACE):
+            raise ValueError(f"Unexpected data after JSON array: {self._buffer[:40]!r}")
+        return items
+
+    def _drain(self, final: bool) -> list:
+        items, buffer, pos = [], self._buffer, 0
+        self._retry_at = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer) or self._state == "done":
+                break
+            char = buffer[pos]
+
+            if self._state == "start":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {char!r}")
+                pos += 1
+                self._state = "first"
+            elif self._state in ("first", "item"):
+                if char == "]" and self._state == "first":
+                    pos += 1
+                    self._state = "done"
+                    continue
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    self._retry_at = len(buffer) - pos + self._retry_bytes
+                    break
+                if not final and (end == len(buffer) or (
+                        type(item) in (int, float) and buffer[end] in _NUMBER_CHARS)):
+                    break  # a number at the end of the buffer may still be growing
+                items.append(item)
+                pos = end
+                self._state = "separator"
+            else:
+                if char == ",":
+                    self._state = "item"
+                elif char == "]":
+                    self._state = "done"
+                else:
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+                pos += 1
+
+        self._buffer = buffer[pos:]
+        return items
+
+
+def iter_stream(response: httpx.Response, mode: str = "bytes", chunk_size: int = None) -> Iterator[Any]:
+    """Iterate an open streaming response as raw chunks, text, lines, NDJSON records or JSON array items"""
+    if mode == "bytes":
+        yield from response.iter_bytes(chunk_size)
+    elif mode == "text":
+        yield from response.iter_text(chunk_size)
+    elif mode == "lines":
+        yield from response.iter_lines()
+    elif mode == "ndjson":
+        for line in response.iter_lines():
+            if line.strip():
+                yield json.loads(line)
+    elif mode == "json":
+        decoder = JSONArrayDecoder()
+        for text in response.iter_text(chunk_size):
+            yield from decoder.feed(text)
+        yield from decoder.close()
+    else:
+        raise ValueError(f"Unknown stream mode '{mode}', expected one of {MODES}")
+
+
+async def aiter_stream(response: httpx.Response, mode: str = "bytes", chunk_size: int = None) -> AsyncIterator[Any]:
+    """`iter_stream` for responses opened on an AsyncClient"""
+    if mode == "bytes":
+        async for chunk in response.aiter_bytes(chunk_size):
+            yield chunk
+    elif mode == "text":
+        async for text in response.aiter_text(chunk_size):
+            yield text
+    elif mode == "lines":
+        async for line in response.aiter_lines():
+            yield line
+    elif mode == "ndjson":
+        async for line in response.aiter_lines():
+            if line.strip():
+                yield json.loads(line)
+    elif mode == "json":
+        decoder = JSONArrayDecoder()
+        async for text in response.aiter_text(chunk_size):
+            for item in decoder.feed(text):
+                yield item
+        for item in decoder.close():
+            yield item
+    else:
+        raise ValueError(f"Unknown stream mode '{mode}', expected one of {MODES}")
+
+
+class StreamResponse:
+    """Status and headers of a response whose body is consumed by iterating it (`for` or `async for`)"""
+
+    def __init__(self, response: httpx.Response, method: str, mode: str = "bytes", chunk_size: int = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown stream mode '{mode}', expected one of {MODES}")
+        self.status = response.status_code
+        self.method = method
+        self.headers = dict(response.headers)
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.raw = response
+
+    def __repr__(self):
+        return f"StreamResponse(status={self.status}, method='{self.method}', mode='{self.mode}')"
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter_stream(self.raw, self.mode, self.chunk_size)
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return aiter_stream(self.raw, self.mode, self.chunk_size)
+
+
+@contextmanager
+def open_stream(client: httpx.Client, slot, instrumentation, method: str, url: str, label: str, headers,
+                kwargs: dict, mode: str = "bytes", chunk_size: int = None) -> Iterator[StreamResponse]:
+    """Open a streaming request the way buffered ones are sent: inside its rate-limit slot, which it holds until the
+    body is closed, and timed by `instrumentation` over the same span. Errors reading the response count as failed
+    requests; the caller's own errors in the block end the request as answered and are re-raised after."""
+    caller_error = None
+    with slot:
+        timing = instrumentation.start(method, label, url)
+        try:
+            with client.stream(method.upper(), url, headers=headers,
+                               **instrumentation.extensions(timing, kwargs)) as response:
+                slot.record(response)
+                try:
+                    yield StreamResponse(response, method, mode, chunk_size)
+                except httpx.HTTPError:
+                    raise
+                except BaseException as e:
+                    caller_error = e
+        except Exception as e:
+            instrumentation.fail(timing, e)
+            raise
+    instrumentation.finish(timing, response)
+    if caller_error is not None:
+        raise caller_error
+
+
+@asynccontextmanager
+async def aopen_stream(client: httpx.AsyncClient, slot, instrumentation, method: str, url: str, label: str, headers,
+                       kwargs: dict, mode: str = "bytes", chunk_size: int = None) -> AsyncIterator[StreamResponse]:
+    """`open_stream` for an AsyncClient"""
+    caller_error = None
+    async with slot:
+        timing = instrumentation.start(method, label, url)
+        try:
+            async with client.stream(method.upper(), url, headers=headers,
+                                     **instrumentation.extensions(timing, kwargs, is_async=True)) as response:
+                slot.record(response)
+                try:
+                    yield StreamResponse(response, method, mode, chunk_size)
+                except httpx.HTTPError:
+                    raise
+                except BaseException as e:
+                    caller_error = e
+        except Exception as e:
+            instrumentation.fail(timing, e)
+            raise
+    instrumentation.finish(timing, response)
+    if caller_error is not None:
+        raise caller_error
@@ -0,0 +1,249 @@
+import copy
+import re
+from typing import Callable, Mapping
+
+
+def vars_signature(vars_dict: Mapping) -> tuple:
+    """Hashable snapshot of the vars that take part in substitution"""
+    return tuple((k, str(v)) for k, v in dict.items(vars_dict) if v and not k.startswith('_'))
+
+
+def section_stamp(section) -> tuple:
+    """Changes whenever `section` or a section nested in it changes, or, once bound, any var it may resolve from"""
+    resolver = section.__dict__.get('_resolver')
+    if resolver is not None:
+        return id(resolver), resolver.generation
+    return (getattr(section, '_revision', None), *(
+        (id(value), section_stamp(value)) for value in dict.values(section) if isinstance(value, dict)
+    ))
+
+
+class Substitutor:
+    """`${VAR}` / `$VAR` substitution compiled into one regex alternation, so each string is scanned once.
+
+    Var names match in upper case. Names are tried longest first, so `$API_KEY` is never cut short by a var named `api`.
+    """
+
+    def __init__(self, vars_dict: Mapping):
+        self.values: dict[str, str] = {}
+        for k, v in vars_signature(vars_dict):
+            self.values.setdefault(k.upper(), v)
+
+        names = "|".join(re.escape(name) for name in sorted(self.values, key=len, reverse=True))
+        self.pattern = re.compile(rf"\$\{{({names})\}}|\$({names})") if names else None
+
+    def __repr__(self):
+        return f"[Substitutor: {len(self.values)} vars]"
+
+    def names(self, template: str) -> set[str]:
+        """The vars `template` refers to"""
+        if self.pattern is None or '$' not in template:
+            return set()
+        return {m.group(1) or m.group(2) for m in self.pattern.finditer(template)}
+
+    def sub(self, template: str, lookup: Callable[[str], str] = None) -> str:
+        """Render `template` with the raw var values, or with whatever `lookup(NAME)` returns"""
+        if self.pattern is None or '$' not in template:
+            return template
+        lookup = lookup or self.values.__getitem__
+        return self.pattern.sub(lambda m: lookup(m.group(1) or m.group(2)), template)
+
+
+class VarResolver:
+    """Resolves placeholders in config sections the first time each value is read, and memoizes the result.
+
+    Templates stay in the sections, so they are what gets written back to disk. A reverse index from each var to the
+    fields and vars that use it means a changed var only invalidates its dependents. Vars may refer to other vars.
+    """
+
+    def __init__(self):
+        self.vars: Mapping = {}
+        self._substitutor: Substitutor | None = None
+        self._sections: dict[int, "TemplatedSection"] = {}
+        self._var_values: dict[str, str] = {}
+        self._dependents: dict[str, set[tuple[int, str]]] = {}  # VAR -> (section id, key) of fields using it
+        self._var_dependents: dict[str, set[str]] = {}  # VAR -> vars whose value uses it
+        self.resolutions = 0
+        self.generation = 0  # bumped whenever a bound section or var changes
+
+    def __repr__(self):
+        return f"[VarResolver: {len(self._sections)} sections, {len(self._var_values)} vars resolved]"
+
+    def __getstate__(self):
+        # The indexes are keyed on object ids, which don't survive pickling
+        return {"vars": self.vars, "sections": list(self._sections.values())}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.vars = state["vars"]
+        for section in state["sections"]:
+            self._sections[id(section)] = section
+
+    def __deepcopy__(self, memo):
+        # Initialise the copy before copying its sections: refilling them reports each var and section to it
+        new = memo[id(self)] = type(self)()
+        new.vars = copy.deepcopy(self.vars, memo)
+        for section in copy.deepcopy(list(self._sections.values()), memo):
+            new._sections[id(section)] = section
+        return new
+
+    @property
+    def substitutor(self) -> Substitutor:
+        if self._substitutor is None:
+            self._substitutor = Substitutor(self.vars)
+        return self._substitutor
+
+    def bind(self, vars_section: Mapping, *sections):
+        """Resolve `sections` (and sections nested in them) against `vars_section`, dropping anything memoized"""
+        for section in self._sections.values():
+            section._resolved.clear()
+        self._sections.clear()
+        self.vars = vars_section if vars_section is not None else {}
+        if isinstance(vars_section, VarsSection):
+            vars_section._resolver = self
+        for section in sections:
+            if isinstance(section, TemplatedSection):
+                self.attach(section)
+        self.clear()
+
+    def attach(self, section: "TemplatedSection"):
+        self._sections[id(section)] = section
+        section._resolver = self
+        section._resolved.clear()
+        for value in dict.values(section):
+            if isinstance(value, TemplatedSection):
+                self.attach(value)
+
+    def detach(self, section: "TemplatedSection"):
+        self._sections.pop(id(section), None)
+        section._resolved.clear()
+        for value in dict.values(section):
+            if isinstance(value, TemplatedSection):
+                self.detach(value)
+
+    def clear(self):
+        """Forget every resolved value"""
+        self.generation += 1
+        self._substitutor = None
+        self._var_values.clear()
+        self._dependents.clear()
+        self._var_dependents.clear()
+        for section in self._sections.values():
+            section._resolved.clear()
+
+    def var(self, name: str, _stack: tuple = ()) -> str:
+        """The fully resolved value of var `name` (upper case)"""
+        if (value := self._var_values.get(name)) is not None:
+            return value
+        if name in _stack:
+            raise ValueError(f"{self}: Variable reference cycle: {' -> '.join((*_stack, name))}")
+
+        substitutor = self.substitutor
+        raw = substitutor.values[name]
+        for ref in substitutor.names(raw):
+            self._var_dependents.setdefault(ref, set()).add(name)
+        stack = (*_stack, name)
+        value = substitutor.sub(raw, lambda ref: self.var(ref, stack))
+        self._var_values[name] = value
+        return value
+
+    def resolve(self, section: "TemplatedSection", key: str, template: str) -> str:
+        memo = section._resolved
+        if key in memo:
+            return memo[key]
+        substitutor = self.substitutor
+        slot = (id(section), key)
+        for name in substitutor.names(template):
+            self._dependents.setdefault(name, set()).add(slot)
+        value = substitutor.sub(template, self.var)
+        memo[key] = value
+        self.resolutions += 1
+        return value
+
+    def var_changed(self, name: str):
+        """Invalidate the fields and vars that depend on var `name`"""
+        previous = self._substitutor
+        if previous is None:
+            return  # nothing has been resolved since the last clear
+        self.generation += 1
+        self._substitutor = Substitutor(self.vars)
+        if previous.values.keys() != self._substitutor.values.keys():
+            # A var appeared or disappeared, which changes what the placeholders match
+            self.clear()
+            return
+
+        stale, pending = set(), [name.upper()]
+        while pending:
+            var = pending.pop()
+            if var in stale:
+                continue
+            stale.add(var)
+            pending.extend(self._var_dependents.pop(var, ()))
+        for var in stale:
+            self._var_values.pop(var, None)
+            for section_id, key in self._dependents.pop(var, ()):
+                if (section := self._sections.get(section_id)) is not None:
+                    section._resolved.pop(key, None)
+
+
+class TemplatedSection:
+    """Mixin for subconfigs whose string values may hold placeholders: item and attribute reads come back resolved.
+
+    `items()`, `values()` and `as_dict()` still see the templates. Attribute reads already go through
+    `__getitem__` (see core.Field), so they resolve as well.
+    """
+
+    def __init__(self, **kwargs):
+        self._resolver: VarResolver | None = None
+        self._resolved: dict[str, str] = {}
+        super().__init__(**kwargs)
+
+    def __getstate__(self):
+        # Memoized values are rebuilt on first read after unpickling; the slots pickle as they are
+        state, slots = super().__getstate__()
+        return {**state, '_resolved': {}}, slots
+
+    def __getitem__(self, key):
+        value = dict.__getitem__(self, key)
+        if type(value) is str and '$' in value and (resolver := self.__dict__.get('_resolver')) is not None:
+            return resolver.resolve(self, key, value)
+        return value
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, name, value):
+        resolver = self.__dict__.get('_resolver')
+        if resolver is not None:
+            previous = dict.get(self, name)
+            if isinstance(previous, TemplatedSection):
+                resolver.detach(previous)
+            if isinstance(value, TemplatedSection):
+                resolver.attach(value)
+            self._resolved.pop(name, None)
+            resolver.generation += 1
+        super().__setitem__(name, value)
+
+    def __delitem__(self, name):
+        self.__dict__.get('_resolved', {}).pop(name, None)
+        if (resolver := self.__dict__.get('_resolver')) is not None:
+            resolver.generation += 1
+        super().__delitem__(name)
+
+    def resolved(self) -> dict:
+        """Public values with placeholders resolved"""
+        return {k: self[k] for k in self.as_list()}
+
+
+class VarsSection:
+    """Mixin for the vars subconfig: tells the resolver which var changed"""
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        if (resolver := self.__dict__.get('_resolver')) is not None:
+            resolver.var_changed(name)
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        if (resolver := self.__dict__.get('_resolver')) is not None:
+            resolver.var_changed(name)
@@ -0,0 +1,204 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import weakref
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from loguru import logger as log
+
+from . import REPR
+from .backends import to_plain
+from .registry import _stamp
+
+Change = tuple[tuple[str, ...], Any, Any]
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+_EVENT = struct.Struct("iIII")
+
+
+def _stored(mapping: Mapping, key: str):
+    """The value as stored, or None. Not item access or .get(): templated sections substitute variables on read
+    (the file holds the template) and config classes such as RoutesConfig redefine get()."""
+    if key not in mapping:
+        return None
+    return dict.__getitem__(mapping, key) if isinstance(mapping, dict) else mapping[key]
+
+
+def diff(old: Mapping, new: Mapping, prefix: tuple[str, ...] = ()) -> list[Change]:
+    """Structural diff of two nested mappings as (key path, old value, new value) leaves"""
+    changes = []
+    for key in old.keys() | new.keys():
+        if key.startswith('_'):
+            continue
+        before = _stored(old, key)
+        after = _stored(new, key)
+        if isinstance(before, Mapping) and isinstance(after, Mapping):
+            changes.extend(diff(before, after, prefix + (key,)))
+        elif before != after and to_plain(before) != to_plain(after):
+            # TOML has no tuples, so a tuple default compares equal to the list read back for it
+            changes.append((prefix + (key,), before, after))
+    return changes
+
+
+class _Inotify:
+    """Minimal ctypes binding watching directories for files being rewritten or replaced"""
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: dict[int, Path] = {}
+
+    def fileno(self):
+        return self._fd
+
+    def add(self, directory: Path):
+        if directory in self._dirs.values():
+            return
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+
+    def read(self) -> set[Path]:
+        touched = set()
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return touched
+        offset = 0
+        while offset < len(buf):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            offset += _EVENT.size
+            name = buf[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if wd in self._dirs and name:
+                touched.add(self._dirs[wd] / os.fsdecode(name))
+        return touched
+
+    def close(self):
+        os.close(self._fd)
+
+
+class ConfigWatcher:
+    """Background thread reloading watched configs when their file changes"""
+
+    def __init__(self, interval: float = 1.0, use_inotify: bool = True):
+        self.interval = interval
+        # Configs are unhashable dicts, so track them by id through weak references
+        self._configs: dict[Path, dict[int, weakref.ref]] = {}
+        self._stamps: dict[Path, tuple[int, int] | None] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError) as e:
+                log.debug(f"{REPR}: inotify unavailable, polling instead: {e}")
+        self._thread = threading.Thread(target=self._run, name="toomanyconfigs-watcher", daemon=True)
+        self._thread.start()
+
+    def __repr__(self):
+        return f"[ConfigWatcher: {'inotify' if self._inotify else 'polling'}, {len(self._configs)} files]"
+
+    def add(self, config):
+        path = Path(config._path).resolve()
+        with self._lock:
+            if path not in self._configs:
+                self._configs[path] = {}
+                self._stamps[path] = _stamp(path)
+                if self._inotify:
+                    self._inotify.add(path.parent)
+            self._configs[path][id(config)] = weakref.ref(config)
+
+    def remove(self, config):
+        path = Path(config._path).resolve()
+        with self._lock:
+            if path in self._configs:
+                self._configs[path].pop(id(config), None)
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        if self._inotify:
+            self._inotify.close()
+
+    def _changed(self, candidates) -> list[Path]:
+        """Paths among `candidates` whose mtime/size moved since the last look"""
+        changed = []
+        with self._lock:
+            for path in candidates:
+                if path not in self._stamps:
+                    continue
+                stamp = _stamp(path)
+                if stamp is not None and stamp != self._stamps[path]:
+                    self._stamps[path] = stamp
+                    changed.append(path)
+        return changed
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._inotify:
+                ready, _, _ = select.select([self._inotify], [], [], self.interval)
+                if not ready:
+                    continue
+                # Let a burst of writes from one save settle before reparsing
+                self._stop.wait(0.05)
+                candidates = self._inotify.read()
+            else:
+                self._stop.wait(self.interval)
+                candidates = list(self._configs)
+
+            changed = self._changed(candidates)
+            if changed and not self._inotify:
+                # A poll can land mid-save (e.g. right after truncation); once it settles, the stamp check below sees
+                # the file moved on and leaves it to the next poll
+                self._stop.wait(0.05)
+            for path in changed:
+                with self._lock:
+                    refs = self._configs.get(path, {})
+                    configs = [config for ref in refs.values() if (config := ref()) is not None]
+                if not configs:
+                    continue
+                try:
+                    data = configs[0]._parse_source()
+                except Exception as e:
+                    log.warning(f"{REPR}: Ignoring unreadable change to {path}: {e}")
+                    continue
+                if _stamp(path) != self._stamps[path]:
+                    # Still being written; the next event or poll picks up the finished file
+                    continue
+                for config in configs:
+                    try:
+                        config._apply_source(data)
+                    except Exception as e:
+                        log.error(f"{config.__log_repr__}: Hot reload failed: {e}")
+
+
+_watcher: ConfigWatcher | None = None
+_watcher_lock = threading.Lock()
+
+
+def get_watcher() -> ConfigWatcher:
+    """The shared watcher, started on first use and again after it was stopped"""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None or _watcher.stopped:
+            _watcher = ConfigWatcher()
+        return _watcher
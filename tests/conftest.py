@@ -0,0 +1,120 @@
+import json
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class Recorder(BaseHTTPRequestHandler):
+    """Answers `/status/<code>` with that status, `/slow` after a pause, `/lines/<n>` with n NDJSON records and
+    anything else with a JSON echo of the path and headers; every request is recorded on the server"""
+    protocol_version = "HTTP/1.1"
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        self.server.requests.append((self.command, self.path, dict(self.headers), body))
+        path = self.path.partition("?")[0]
+        status = 200
+        if path.startswith("/status/"):
+            status = int(path.rpartition("/")[2])
+        elif path == "/slow":
+            time.sleep(0.2)
+        if path.startswith("/lines/"):
+            payload = b"".join(json.dumps({"n": i}).encode() + b"\n" for i in range(int(path.rpartition("/")[2])))
+            content_type = "application/x-ndjson"
+        else:
+            payload = json.dumps({"path": self.path, "headers": dict(self.headers)}).encode()
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """A local HTTP server; yields it, with its base URL as `server.url` and what it received as `server.requests`"""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Recorder)
+    httpd.daemon_threads = True
+    httpd.requests = []
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+API_CONFIG = '''[headers]
+accept = "application/json"
+
+[routes]
+base = "{url}"
+
+[routes.shortcuts]
+user = "/users/{{id}}"
+health = "/health"
+
+[vars]
+'''
+
+
+@pytest.fixture
+def api_config(tmp_path, http_server):
+    """An apiconfig.toml pointing at `http_server`, with `user` and `health` shortcuts"""
+    from toomanyconfigs.api import APIConfig
+
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(API_CONFIG.format(url=http_server.url))
+    return APIConfig.create(path, prompt_empty_fields=False, memoize=False)
+
+
+class Frame:
+    """Just enough of a DataFrame for ResponseIndex: `columns` and `frame[column].tolist()`"""
+
+    class Column(list):
+        def tolist(self):
+            return list(self)
+
+    def __init__(self, columns, rows):
+        self.columns = list(columns)
+        self.rows = rows
+
+    def __getitem__(self, column):
+        return self.Column(row.get(column) for row in self.rows)
+
+
+class FakeDatabase:
+    """Stands in for p2d2.Database: keeps rows in memory and counts table loads"""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.tables = {name: [] for name in getattr(schema, "__annotations__", {})}
+        self.loads = 0
+
+    def create(self, table, signature, **data):
+        self.tables[table].append({"signature": signature, **data})
+
+    def get_table(self, table):
+        self.loads += 1
+        return Frame(["signature", "path", "status", "method", "headers", "body"], list(self.tables[table]))
+
+
+@pytest.fixture
+def fake_p2d2(monkeypatch):
+    """A stand-in `p2d2` module, so database mode runs without the real package; yields the module"""
+    module = types.ModuleType("p2d2")
+    module.Database = FakeDatabase
+    module.Table = type("Table", (), {})
+    module.Schema = type("Schema", (), {})
+    monkeypatch.setitem(sys.modules, "p2d2", module)
+    return module
@@ -0,0 +1,85 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from toomanyconfigs.api import API, APIConfig, LimitsConfig, RetryConfig
+
+EXISTING = '''[headers]
+authorization = "Bearer x"
+accept = "application/json"
+
+[routes]
+base = "http://example.com"
+
+[routes.shortcuts]
+
+[vars]
+'''
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(EXISTING)
+    return path
+
+
+def test_absent_limits_are_not_created_or_written(config_path):
+    config = APIConfig.create(config_path, prompt_empty_fields=False, memoize=False)
+    assert config.limits is None and "limits" not in config
+    assert "[limits" not in config_path.read_text()
+
+
+def test_limits_section_is_built_without_adding_tables(config_path):
+    config_path.write_text(EXISTING + "\n[limits]\nrate = 5.0\n")
+    config = APIConfig.create(config_path, prompt_empty_fields=False, memoize=False)
+    assert isinstance(config.limits, LimitsConfig)
+    assert config.limits.rate == 5.0 and config.limits.limiter.rate == 5.0
+    assert "[limits.hosts]" not in config_path.read_text()
+    assert "[limits.routes]" not in config_path.read_text()
+
+
+def test_limits_added_to_the_file_are_picked_up_on_reload(config_path):
+    config = APIConfig.create(config_path, prompt_empty_fields=False, memoize=False)
+    config_path.write_text(config_path.read_text() + '\n[limits]\nrate = 2.0\n\n[limits.hosts]\n"a.com" = 1\n')
+    config.reload()
+    assert isinstance(config.limits, LimitsConfig)
+    assert config.limits.limiter.hosts == {"a.com": (1.0, None)}
+
+
+@pytest.fixture
+def server():
+    hits = []
+
+    class Unavailable(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Unavailable)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", hits
+    httpd.shutdown()
+
+
+def test_retries_are_opt_in(config_path, server):
+    url, hits = server
+    config_path.write_text(EXISTING.replace("http://example.com", url))
+    api = API(APIConfig.create(config_path, prompt_empty_fields=False, memoize=False))
+    assert api.retry_policy is None and "[retries]" not in config_path.read_text()
+    api.sync_api_request("get", append="/a")
+    assert hits == ["/a"]
+    api.close()
+
+    config_path.write_text(EXISTING.replace("http://example.com", url) + "\n[retries]\nattempts = 3\nbackoff = 0.0\n")
+    api = API(APIConfig.create(config_path, prompt_empty_fields=False, memoize=False))
+    assert isinstance(api.config.retries, RetryConfig) and api.retry_policy.attempts == 3
+    api.sync_api_request("get", append="/b")
+    assert hits == ["/a", "/b", "/b", "/b"]
+    api.close()
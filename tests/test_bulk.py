@@ -0,0 +1,59 @@
+import pytest
+
+from toomanyconfigs import TOMLConfig, TOMLSubConfig, load_many
+
+
+class Limits(TOMLSubConfig):
+    requests: int = 100
+    burst: int = None
+
+
+class Tenant(TOMLConfig):
+    name: str = None
+    region: str = "eu-west-1"
+    token: str = None
+    limits: Limits
+
+
+@pytest.fixture
+def tenants(tmp_path, monkeypatch):
+    monkeypatch.setenv("TENANT_TOKEN", "s3cr3t")
+    monkeypatch.setenv("LIMITS_BURST", "5")
+    for i in range(6):
+        (tmp_path / f"tenant-{i}.toml").write_text(f'name = "tenant-{i}"\n\n[limits]\nrequests = {i}\n')
+    (tmp_path / "broken.toml").write_text("name = \n")
+    return tmp_path
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_many_builds_every_file_and_collects_errors(tenants, workers):
+    result = load_many(Tenant, tenants, workers=workers, chunksize=2)
+    assert len(result) == 6 and list(result.errors) == ["broken"]
+    tenant = result["tenant-3"]
+    assert tenant.name == "tenant-3" and tenant.region == "eu-west-1" and tenant.limits.requests == 3
+    assert tenant.token == "s3cr3t" and tenant.limits.burst == 5
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_load_many_is_read_only(tenants, workers):
+    before = {path.name: (path.read_text(), path.stat().st_mtime_ns) for path in tenants.iterdir()}
+    load_many(Tenant, tenants, workers=workers, chunksize=2)
+    assert {path.name: (path.read_text(), path.stat().st_mtime_ns) for path in tenants.iterdir()} == before
+
+
+def test_load_many_from_a_glob(tenants):
+    result = load_many(Tenant, str(tenants / "tenant-[0-2].toml"), workers=1)
+    assert sorted(result.configs) == ["tenant-0", "tenant-1", "tenant-2"] and not result.errors
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_files_with_the_same_stem_in_different_directories_stay_apart(tmp_path, workers):
+    for region in ("eu", "us"):
+        (tmp_path / region).mkdir()
+        (tmp_path / region / "acme.toml").write_text(f'name = "{region}"\n')
+    result = load_many(Tenant, str(tmp_path / "**" / "*.toml"), workers=workers, chunksize=1)
+    assert {name: config.name for name, config in result.configs.items()} == {"eu/acme": "eu", "us/acme": "us"}
+
+    result = load_many(Tenant, [tmp_path / "eu" / "acme.toml", tmp_path / "us" / "acme.toml"], workers=1)
+    assert sorted(result.configs) == ["eu/acme", "us/acme"]
+    assert list(load_many(Tenant, [tmp_path / "eu" / "acme.toml"], workers=1).configs) == ["acme"]
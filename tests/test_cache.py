@@ -0,0 +1,133 @@
+import time
+
+import pytest
+
+from toomanyconfigs.cache import ResponseCache, freshness, request_key
+
+KEY = request_key("get", "http://api.example/users", params={"b": 2, "a": 1})
+
+
+def test_request_key_ignores_query_order_and_hashes_the_body():
+    assert request_key("GET", "http://api.example/users?a=1&b=2") == KEY
+    assert request_key("post", "http://api.example/x", json_body={"a": 1}) != \
+        request_key("post", "http://api.example/x", json_body={"a": 2})
+    assert request_key("post", "http://api.example/x", content=iter([b"streamed"])) is None
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, 30),
+    ({"Cache-Control": "max-age=5"}, 5),
+    ({"cache-control": "no-store"}, False),
+    ({"Cache-Control": "private, no-cache"}, False),
+    ({"Cache-Control": "max-age=0"}, False),
+    ({"Expires": "0"}, False),
+])
+def test_freshness(headers, expected):
+    assert freshness(headers, 30) == expected
+
+
+def test_re_put_replaces_the_stored_response():
+    cache = ResponseCache()
+    assert cache.put(KEY, "old", {}, size=10)
+    # What force_refresh does with the fresh response
+    assert cache.put(KEY, "new", {}, size=10)
+    assert cache.get(KEY) == "new"
+    assert len(cache) == 1 and cache.bytes == 10
+
+
+def test_re_put_of_a_vary_variant_keeps_the_others():
+    cache = ResponseCache()
+    vary = {"Vary": "Accept-Language"}
+    cache.put(KEY, "en", vary, {"Accept-Language": "en"}, size=1)
+    cache.put(KEY, "fr", vary, {"accept-language": "fr"}, size=1)
+    cache.put(KEY, "en2", vary, {"Accept-Language": "en"}, size=1)
+    assert cache.get(KEY, {"Accept-Language": "en"}) == "en2"
+    assert cache.get(KEY, {"Accept-Language": "fr"}) == "fr"
+    assert cache.get(KEY, {"Accept-Language": "de"}) is None
+    assert len(cache) == 2
+
+
+def test_vary_star_and_no_store_are_not_cached():
+    cache = ResponseCache()
+    assert not cache.put(KEY, "x", {"Vary": "*"})
+    assert not cache.put(KEY, "x", {"Cache-Control": "no-store"})
+    assert len(cache) == 0 and cache.get(KEY) is None
+
+
+def test_changed_vary_names_drop_the_old_variants():
+    cache = ResponseCache()
+    cache.put(KEY, "en", {"Vary": "Accept-Language"}, {"Accept-Language": "en"}, size=1)
+    cache.put(KEY, "json", {"Vary": "Accept"}, {"Accept": "application/json"}, size=1)
+    assert len(cache) == 1 and cache.bytes == 1
+    assert cache.get(KEY, {"Accept": "application/json", "Accept-Language": "en"}) == "json"
+
+
+def test_entries_expire_after_their_ttl():
+    cache = ResponseCache()
+    cache.put(KEY, "short", {"Cache-Control": "max-age=1"}, size=4)
+    assert cache.get(KEY) == "short"
+    cache._entries[(KEY, ())].expires = time.monotonic() - 0.01
+    assert cache.get(KEY) is None
+    assert cache.expirations == 1 and len(cache) == 0 and cache.bytes == 0
+
+
+def test_default_ttl_applies_without_headers():
+    cache = ResponseCache(default_ttl=0.01)
+    cache.put(KEY, "x", {})
+    time.sleep(0.02)
+    assert cache.get(KEY) is None
+
+
+def keys(n):
+    return [request_key("GET", f"http://api.example/{i}") for i in range(n)]
+
+
+def test_lru_evicts_the_least_recently_used_under_max_bytes():
+    a, b, c = keys(3)
+    cache = ResponseCache(max_bytes=20, policy="lru")
+    cache.put(a, "a", {}, size=10)
+    cache.put(b, "b", {}, size=10)
+    cache.get(a)
+    cache.put(c, "c", {}, size=10)
+    assert cache.get(b) is None and cache.get(a) == "a" and cache.get(c) == "c"
+    assert cache.bytes == 20 and cache.evictions == 1
+
+
+def test_lfu_evicts_the_least_frequently_used_under_max_bytes():
+    a, b, c = keys(3)
+    cache = ResponseCache(max_bytes=20, policy="lfu")
+    cache.put(a, "a", {}, size=10)
+    cache.put(b, "b", {}, size=10)
+    for _ in range(3):
+        cache.get(b)
+    cache.get(a)
+    cache.put(c, "c", {}, size=10)
+    # a was read less often than b, and c is new
+    assert cache.get(a) is None and cache.get(b) == "b" and cache.get(c) == "c"
+    assert cache.bytes == 20 and cache.evictions == 1
+
+
+def test_oversized_responses_are_refused_and_max_entries_is_enforced():
+    cache = ResponseCache(max_bytes=10, max_entries=2)
+    assert not cache.put(KEY, "big", {}, size=11)
+    for key in keys(3):
+        cache.put(key, "x", {}, size=1)
+    assert len(cache) == 2 and cache.evictions == 1
+
+
+def test_invalidate_drops_every_variant():
+    cache = ResponseCache()
+    vary = {"Vary": "Accept"}
+    cache.put(KEY, "json", vary, {"Accept": "application/json"}, size=1)
+    cache.put(KEY, "xml", vary, {"Accept": "text/xml"}, size=1)
+    other, = keys(1)
+    cache.put(other, "other", {}, size=1)
+    cache.invalidate(KEY)
+    assert len(cache) == 1 and cache.get(other) == "other"
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes == 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ResponseCache(policy="fifo")
@@ -0,0 +1,84 @@
+import asyncio
+import pickle
+import threading
+
+import httpx
+
+from toomanyconfigs.api import API
+from toomanyconfigs.clients import DEFAULT_LIMITS, ClientPool
+
+
+def test_sync_client_is_built_once_and_shared_across_threads():
+    pool = ClientPool(timeout=5.0)
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(pool.client)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in clients}) == 1
+    assert clients[0].timeout == httpx.Timeout(5.0)
+    pool.close()
+    assert clients[0].is_closed and pool._client is None
+    assert pool.client is not clients[0]
+    pool.close()
+
+
+def test_async_clients_belong_to_their_event_loop():
+    pool = ClientPool()
+
+    async def clients():
+        return pool.async_client, pool.async_client
+
+    first, again = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+    assert first is again and second is not first
+
+    async def close():
+        client = pool.async_client
+        await pool.aclose()
+        return client
+
+    assert asyncio.run(close()).is_closed and len(pool._async_clients) == 0
+
+
+def test_http2_without_h2_falls_back_to_http1(monkeypatch):
+    built = []
+
+    class NoH2(httpx.Client):
+        def __init__(self, **kwargs):
+            if kwargs.get("http2"):
+                raise ImportError("Using http2=True, but the 'h2' package is not installed")
+            built.append(kwargs)
+            super().__init__(**kwargs)
+
+    pool = ClientPool(http2=True)
+    client = pool._build(NoH2)
+    assert pool.http2 is False and built == [{"limits": DEFAULT_LIMITS, "http2": False}]
+    client.close()
+
+
+def test_pickle_keeps_settings_and_rebuilds_clients():
+    limits = httpx.Limits(max_connections=5)
+    pool = ClientPool(limits=limits, timeout=2.0)
+    pool.client
+    copied = pickle.loads(pickle.dumps(pool))
+    assert (copied.limits, copied.http2, copied.timeout) == (limits, False, 2.0)
+    assert copied._client is None and copied.client is not pool.client
+    pool.close()
+    copied.close()
+
+
+def test_api_builds_one_client_for_all_its_requests(api_config, http_server, monkeypatch):
+    built = []
+    build = ClientPool._build
+    monkeypatch.setattr(ClientPool, "_build", lambda self, cls: built.append(cls) or build(self, cls))
+    api = API(api_config)
+    try:
+        for i in range(5):
+            api.sync_api_request("get", route="user", format={"id": i})
+        assert api.sync_api_batch([{"route": "user", "format": {"id": i}} for i in range(5, 10)])
+        assert built == [httpx.Client]
+    finally:
+        api.close()
+    assert len(http_server.requests) == 10 and api.clients._client is None
@@ -0,0 +1,222 @@
+import asyncio
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from toomanyconfigs.concurrency import (
+    AsyncCoalescer, ManagedExecutor, SyncCoalescer, gather_limited, threaded_limited
+)
+
+
+def test_async_callers_share_one_call():
+    coalescer = AsyncCoalescer()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        same = [coalescer.run("a", lambda: fetch("a")) for _ in range(3)]
+        return await asyncio.gather(*same, coalescer.run("b", lambda: fetch("b")))
+
+    assert asyncio.run(main()) == ["a", "a", "a", "b"]
+    assert calls == ["a", "b"] and coalescer.coalesced == 2 and coalescer._inflight == {}
+
+
+def test_async_errors_reach_every_caller():
+    coalescer = AsyncCoalescer()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream")
+
+    async def main():
+        return await asyncio.gather(*(coalescer.run("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [ValueError] * 3
+
+
+def test_cancelling_the_first_caller_leaves_the_others_their_result():
+    coalescer = AsyncCoalescer()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(coalescer.run("k", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(coalescer.run("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return results
+
+    assert asyncio.run(main()) == ["done", "done"] and calls == [1]
+
+
+def test_the_call_is_cancelled_once_every_caller_is():
+    coalescer = AsyncCoalescer()
+    finished = []
+
+    async def fetch():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            finished.append("cancelled")
+            raise
+
+    async def main():
+        waiters = [asyncio.ensure_future(coalescer.run("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return coalescer._inflight
+
+    assert asyncio.run(main()) == {} and finished == ["cancelled"]
+
+
+def test_threads_share_one_call_and_its_error():
+    coalescer = SyncCoalescer()
+    gate = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        gate.wait(5)
+        if len(calls) > 1:
+            raise ValueError("second round")
+        return "shared"
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(coalescer.run, "k", fetch) for _ in range(4)]
+        time.sleep(0.05)
+        gate.set()
+        assert [f.result() for f in futures] == ["shared"] * 4
+    assert calls == [1] and coalescer.coalesced == 3
+
+    with pytest.raises(ValueError):
+        coalescer.run("k", fetch)
+
+
+def test_coalescers_pickle_without_in_flight_calls():
+    coalescer = AsyncCoalescer()
+    coalescer.coalesced = 5
+    copied = pickle.loads(pickle.dumps(coalescer))
+    assert copied.coalesced == 5 and copied._inflight == {}
+
+
+class Tracker:
+    """Records how many calls run at once, overall and per host"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.peak = {}
+        self.started = {}
+
+    def enter(self, host, index):
+        with self.lock:
+            self.started[index] = time.monotonic()
+            for key in (host, "*"):
+                self.running[key] = self.running.get(key, 0) + 1
+                self.peak[key] = max(self.peak.get(key, 0), self.running[key])
+
+    def leave(self, host):
+        with self.lock:
+            for key in (host, "*"):
+                self.running[key] -= 1
+
+
+def blocking_calls(tracker, hosts, seconds=0.02):
+    def call(index, host):
+        def run():
+            tracker.enter(host, index)
+            time.sleep(seconds)
+            tracker.leave(host)
+            if index == 3:
+                raise ValueError("bad request")
+            return index * 10
+        return run
+    return [(host, call(i, host)) for i, host in enumerate(hosts)]
+
+
+def async_calls(tracker, hosts, seconds=0.02):
+    def call(index, host):
+        async def run():
+            tracker.enter(host, index)
+            await asyncio.sleep(seconds)
+            tracker.leave(host)
+            if index == 3:
+                raise ValueError("bad request")
+            return index * 10
+        return run
+    return [(host, call(i, host)) for i, host in enumerate(hosts)]
+
+
+HOSTS = ["a", "a", "a", "b", "b", "c", "a", "b", "c", "c"]
+
+
+def check(results, tracker):
+    by_index = dict(results)
+    assert sorted(by_index) == list(range(len(HOSTS)))
+    assert isinstance(by_index.pop(3), ValueError)
+    assert all(value == index * 10 for index, value in by_index.items())
+    assert tracker.peak["*"] <= 3 and all(tracker.peak[h] <= 2 for h in "abc")
+
+
+def test_gather_limited_bounds_concurrency_and_yields_errors():
+    tracker = Tracker()
+
+    async def main():
+        return [item async for item in gather_limited(async_calls(tracker, HOSTS), 3, per_host=2)]
+
+    check(asyncio.run(main()), tracker)
+
+
+def test_threaded_limited_bounds_concurrency_and_yields_errors():
+    tracker = Tracker()
+    with ThreadPoolExecutor(8) as pool:
+        check(list(threaded_limited(pool, blocking_calls(tracker, HOSTS), 3, per_host=2)), tracker)
+
+
+def test_threaded_limited_doesnt_park_pool_threads_on_a_busy_host():
+    tracker = Tracker()
+    hosts = ["a", "a", "a", "a", "b", "c", "d"]
+    start = time.monotonic()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(threaded_limited(pool, blocking_calls(tracker, hosts, seconds=0.1), 4, per_host=1))
+    assert len(results) == len(hosts) and tracker.peak["a"] == 1
+    # The other hosts start straight away instead of queueing behind workers waiting for host "a"
+    assert all(tracker.started[i] - start < 0.08 for i in (4, 5, 6))
+
+
+def test_threaded_limited_stops_submitting_when_closed_early():
+    tracker = Tracker()
+    with ThreadPoolExecutor(2) as pool:
+        results = threaded_limited(pool, blocking_calls(tracker, ["a"] * 20), 2)
+        next(results)
+        results.close()
+    assert len(tracker.started) <= 4
+
+
+def test_managed_executor_starts_lazily_and_pickles_as_settings():
+    executor = ManagedExecutor(3, name="test")
+    assert executor._pool is None
+    assert executor.pool.submit(lambda: 1).result() == 1
+    copied = pickle.loads(pickle.dumps(executor))
+    assert copied._pool is None and copied.max_workers == 3
+    executor.shutdown()
+    assert executor._pool is None
@@ -0,0 +1,246 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from toomanyconfigs import ACTIVE_CFGS, TOMLConfig, TOMLSubConfig, backends
+from toomanyconfigs.core import Field
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Count every TOML document parsed"""
+    count = [0]
+    loads = backends.loads
+
+    def counting(text):
+        count[0] += 1
+        return loads(text)
+
+    monkeypatch.setattr(backends, "loads", counting)
+    return count
+
+
+class Leaf(TOMLSubConfig):
+    value: int = 0
+
+
+class Branch(TOMLSubConfig):
+    label: str = "branch"
+    leaf: Leaf
+
+
+def config_with_sections(n: int) -> type:
+    annotations = {f"section_{i}": Branch for i in range(n)}
+    return type(f"Sections{n}", (TOMLConfig,), {"__annotations__": {"name": str, **annotations}, "name": "x"})
+
+
+@pytest.mark.parametrize("sections", [1, 5, 40])
+def test_create_parses_the_file_once(tmp_path, parses, sections):
+    cls = config_with_sections(sections)
+    path = tmp_path / "config.toml"
+    path.write_text("".join(
+        f'[section_{i}]\nlabel = "s{i}"\n\n[section_{i}.leaf]\nvalue = {i}\n\n' for i in range(sections)
+    ))
+    config = cls.create(path, prompt_empty_fields=False, memoize=False)
+    assert parses[0] == 1
+    assert config[f"section_{sections - 1}"].leaf.value == sections - 1
+    assert config.section_0.label == "s0"
+
+
+def test_sections_missing_from_the_file_are_built_without_parsing(tmp_path, parses):
+    cls = config_with_sections(3)
+    path = tmp_path / "config.toml"
+    path.write_text('name = "only"\n')
+    config = cls.create(path, prompt_empty_fields=False, memoize=False)
+    assert parses[0] == 1
+    assert config.section_2.leaf.value == 0
+
+
+def test_memoized_create_does_not_parse_again(tmp_path, parses):
+    cls = config_with_sections(2)
+    path = tmp_path / "config.toml"
+    path.write_text('[section_0]\nlabel = "a"\n')
+    try:
+        first = cls.create(path, prompt_empty_fields=False)
+        assert cls.create(path, prompt_empty_fields=False) is first
+        assert parses[0] == 1
+    finally:
+        ACTIVE_CFGS.clear()
+
+
+class Service(TOMLConfig):
+    name: str = "service"
+    port: int = 8080
+    leaf: Leaf
+
+
+def test_write_keeps_the_file_mode(tmp_path):
+    path = tmp_path / "service.toml"
+    config = Service.create(path, prompt_empty_fields=False, memoize=False)
+    path.chmod(0o640)
+    config.port = 9000
+    config.write()
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    assert "port = 9000" in path.read_text()
+
+
+@pytest.mark.parametrize("umask", [0o022, 0o027], ids=["022", "027"])
+def test_new_files_get_the_umask_default_mode(tmp_path, umask):
+    config = Service.create(tmp_path / "service.toml", prompt_empty_fields=False, memoize=False, write=False)
+    previous = os.umask(umask)
+    try:
+        config.write()
+    finally:
+        os.umask(previous)
+    assert stat.S_IMODE((tmp_path / "service.toml").stat().st_mode) == 0o666 & ~umask
+
+
+@pytest.mark.skipif(not hasattr(os, "O_DIRECTORY"), reason="directories can't be fsynced here")
+def test_write_fsyncs_the_directory_after_the_rename(tmp_path, monkeypatch):
+    config = Service.create(tmp_path / "service.toml", prompt_empty_fields=False, memoize=False)
+    synced = []
+    fsync, replace = os.fsync, os.replace
+    monkeypatch.setattr("os.fsync", lambda fd: (synced.append(stat.S_ISDIR(os.fstat(fd).st_mode)), fsync(fd)))
+    monkeypatch.setattr("os.replace", lambda *args: (synced.append("replace"), replace(*args)))
+    config.port = 1
+    config.write()
+    assert synced == [False, "replace", True]
+
+
+def test_write_through_a_symlink_updates_its_target(tmp_path):
+    target = tmp_path / "real" / "service.toml"
+    target.parent.mkdir()
+    target.write_text('name = "real"\n')
+    link = tmp_path / "service.toml"
+    link.symlink_to(target)
+
+    config = Service.create(link, prompt_empty_fields=False, memoize=False)
+    config.name = "renamed"
+    config.write()
+    assert link.is_symlink()
+    assert 'name = "renamed"' in target.read_text()
+    assert [p.name for p in target.parent.iterdir()] == ["service.toml"]
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """Count the documents serialized for writing"""
+    count = [0]
+    dumps = backends.dumps
+
+    def counting(data):
+        count[0] += 1
+        return dumps(data)
+
+    monkeypatch.setattr(backends, "dumps", counting)
+    return count
+
+
+def test_unchanged_config_is_not_rewritten(tmp_path, writes):
+    path = tmp_path / "service.toml"
+    Service.create(path, prompt_empty_fields=False, memoize=False)
+    assert writes[0] == 1
+    mtime = path.stat().st_mtime_ns
+
+    config = Service.create(path, prompt_empty_fields=False, memoize=False)
+    assert not config.is_dirty()
+    config.write()
+    assert writes[0] == 1 and path.stat().st_mtime_ns == mtime
+
+
+@pytest.mark.parametrize("change", [
+    lambda c: setattr(c, "port", 1),
+    lambda c: c.__setitem__("port", 1),
+    lambda c: c.update(port=1),
+    lambda c: setattr(c.leaf, "value", 1),
+    lambda c: c.leaf.__setitem__("value", 1),
+    lambda c: c.leaf.__delitem__("value"),
+], ids=["attribute", "item", "update", "nested attribute", "nested item", "nested delete"])
+def test_changes_mark_the_config_dirty(tmp_path, writes, change):
+    config = Service.create(tmp_path / "service.toml", prompt_empty_fields=False, memoize=False)
+    assert not config.is_dirty()
+    change(config)
+    assert config.is_dirty()
+    config.write()
+    assert writes[0] == 2 and not config.is_dirty()
+
+
+def test_failed_write_leaves_the_file_intact(tmp_path, monkeypatch):
+    path = tmp_path / "service.toml"
+    config = Service.create(path, prompt_empty_fields=False, memoize=False)
+    before = path.read_text()
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    config.port = 1
+    monkeypatch.setattr("os.replace", fail)
+    with pytest.raises(OSError):
+        config.write()
+    assert path.read_text() == before
+    assert [p.name for p in tmp_path.iterdir()] == ["service.toml"]
+    assert config.is_dirty()
+
+
+def test_batch_writes_once_on_exit(tmp_path, writes):
+    path = tmp_path / "service.toml"
+    config = Service.create(path, prompt_empty_fields=False, memoize=False)
+    with config.batch():
+        for port in range(100):
+            config.port = port
+        with config.batch():
+            config.name = "nested"
+        assert writes[0] == 1
+    assert writes[0] == 2
+    assert "port = 99" in path.read_text() and 'name = "nested"' in path.read_text()
+
+
+def test_schema_reads_the_class_annotations():
+    schema = Service._schema
+    assert schema.fields == ("name", "port", "leaf")
+    assert schema.public == {"name": "service", "port": 8080}
+    assert schema.sections == {"leaf": Leaf}
+    assert isinstance(Service.__dict__["port"], Field)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 14), reason="annotations are only evaluated lazily from 3.14")
+def test_undefined_annotation_names_do_not_break_class_creation():
+    class Early(TOMLConfig):
+        name: str = "early"
+        later: DefinedLater  # noqa: F821
+
+    assert Early._schema.fields == ("name", "later") and Early._schema.public == {"name": "early"}
+
+
+class Annotated(TOMLConfig):
+    name: str | None = None
+    section: Leaf | None = None
+
+
+class OptIn(TOMLConfig):
+    name: str = "opt-in"
+    section: Leaf | None = None
+    _optional = ("section",)
+
+
+def test_none_annotations_are_still_required_unless_declared_optional():
+    assert Annotated._schema.optional == frozenset() and Annotated._schema.types["name"] is str
+    assert OptIn._schema.optional == {"section"} and "_optional" not in OptIn._schema.fields
+
+
+def test_undeclared_none_fields_are_reported_missing_and_written(tmp_path):
+    path = tmp_path / "annotated.toml"
+    config = Annotated.create(path, prompt_empty_fields=False, memoize=False)
+    assert "name" in Annotated._schema.missing(config)
+    assert isinstance(config.section, Leaf) and "[section]" in path.read_text()
+
+
+def test_declared_optional_sections_stay_absent_until_set(tmp_path):
+    path = tmp_path / "optin.toml"
+    config = OptIn.create(path, prompt_empty_fields=False, memoize=False)
+    assert config.section is None and "section" not in config
+    assert OptIn._schema.missing(config) == [] and "[section]" not in path.read_text()
+    path.write_text(path.read_text() + "\n[section]\nvalue = 3\n")
+    assert OptIn.create(path, prompt_empty_fields=False, memoize=False).section.value == 3
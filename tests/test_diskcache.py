@@ -0,0 +1,133 @@
+import os
+import pickle
+import random
+import threading
+import time
+
+import pytest
+
+from toomanyconfigs.diskcache import DiskCache
+
+
+def test_round_trip_and_reopen(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache["a"] = b"1"
+    cache["b"] = b"2"
+    cache["a"] = b"11"
+    del cache["b"]
+    assert cache["a"] == b"11" and "b" not in cache
+    with pytest.raises(KeyError):
+        cache["b"]
+    cache.close()
+
+    cache = DiskCache(tmp_path)
+    assert cache["a"] == b"11" and "b" not in cache
+    assert cache.stats["unindexed"] == 0
+    cache.close()
+
+
+def test_ttl(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache.put("t", b"x", ttl=0.05)
+    assert "t" in cache
+    time.sleep(0.1)
+    assert "t" not in cache and cache.get("t") is None
+    cache.close()
+
+
+def test_unflushed_writes_and_torn_record_survive_reopen(tmp_path):
+    cache = DiskCache(tmp_path)
+    cache["a"] = b"1"
+    cache.close()
+    cache = DiskCache(tmp_path)
+    cache["z"] = b"zz"
+    # A crash partway through the next record
+    cache._file.write(b"\x01\x02\x03")
+    cache._file.flush()
+
+    reopened = DiskCache(tmp_path)
+    assert reopened["z"] == b"zz" and reopened["a"] == b"1"
+    reopened.close()
+
+
+def test_usable_after_everything_is_compacted_away(tmp_path):
+    cache = DiskCache(tmp_path, default_ttl=0.01)
+    cache.put("a", b"1")
+    time.sleep(0.05)
+    cache.compact()
+    assert cache.get("a") is None
+    cache.put("b", b"2", ttl=60)
+    assert cache["b"] == b"2"
+    cache.close()
+
+    cache = DiskCache(tmp_path)
+    assert cache["b"] == b"2"
+    cache.clear()
+    cache.compact()
+    assert cache.get("b") is None and "b" not in cache
+    cache.close()
+
+    cache = DiskCache(tmp_path)
+    assert cache.get("b") is None
+    cache["c"] = b"3"
+    assert cache["c"] == b"3"
+    cache.close()
+
+
+def test_concurrent_writes_with_background_compaction(tmp_path):
+    cache = DiskCache(tmp_path, compact_min_bytes=10_000, compact_ratio=0.3)
+    truth, lock = {}, threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(2000):
+            key = f"k{rng.randrange(200)}"
+            with lock:
+                if rng.random() < 0.1:
+                    cache.delete(key)
+                    truth.pop(key, None)
+                else:
+                    cache[key] = truth[key] = rng.randbytes(rng.randrange(10, 200))
+            cache.get(f"k{rng.randrange(200)}")
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    cache._wait_for_compaction()
+    assert cache.compactions > 0
+    assert all(cache.get(f"k{i}") == truth.get(f"k{i}") for i in range(200))
+    cache.close()
+
+    cache = DiskCache(tmp_path)
+    assert all(cache.get(f"k{i}") == truth.get(f"k{i}") for i in range(200))
+    cache.close()
+
+
+def test_pickle_reopens(tmp_path):
+    cache = DiskCache(tmp_path, default_ttl=60)
+    cache["a"] = b"1"
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy["a"] == b"1" and copy.default_ttl == 60
+    copy.close()
+    cache.close()
+
+
+def test_failed_compaction_swap_leaves_cache_usable(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path)
+    cache["a"] = b"1"
+    cache["a"] = b"2"
+
+    def fail(*args):
+        raise OSError("replace failed")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(os, "replace", fail)
+        with pytest.raises(OSError):
+            cache.compact()
+    assert cache["a"] == b"2"
+    cache["b"] = b"3"
+    cache.compact()
+    assert cache["a"] == b"2" and cache["b"] == b"3"
+    cache.close()
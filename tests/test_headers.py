@@ -0,0 +1,87 @@
+import pytest
+
+from toomanyconfigs.api import API, APIConfig
+from toomanyconfigs.headers import HeaderOverlay, HeaderSet, encoded, headers_key
+
+CONFIG = '''[headers]
+authorization = "Bearer ${API_KEY}"
+accept = "application/json"
+
+[routes]
+base = "http://example.com"
+
+[routes.shortcuts]
+
+[vars]
+api_key = "secret"
+'''
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(CONFIG)
+    return APIConfig.create(path, prompt_empty_fields=False, memoize=False)
+
+
+def test_header_set_is_resolved_frozen_and_prebuilt(config):
+    config.headers["x-retries"] = 3
+    config.headers["x-empty"] = None
+    headers = HeaderSet(config.headers)
+    assert dict(headers) == {"authorization": "Bearer secret", "accept": "application/json", "x-retries": "3"}
+    assert headers.encoded["Authorization"] == "Bearer secret"
+    assert headers.key == tuple(sorted(dict(headers).items()))
+    with pytest.raises(TypeError):
+        headers.mapping["accept"] = "text/html"
+
+
+def test_snapshot_is_reused_until_the_headers_or_vars_change(config):
+    first = config.headers.snapshot
+    assert config.headers.snapshot is first and first.is_current()
+
+    config.vars.api_key = "rotated"
+    assert not first.is_current()
+    second = config.headers.snapshot
+    assert second is not first and second["authorization"] == "Bearer rotated"
+
+    config.headers.accept = "text/csv"
+    assert not second.is_current() and config.headers.snapshot["accept"] == "text/csv"
+
+
+def test_overlay_hides_base_headers_in_any_case(config):
+    base = config.headers.snapshot
+    assert base.overlay(None) is base and base.overlay({}) is base
+
+    overlay = base.overlay({"Accept": "text/csv", "x-trace": "1"})
+    assert isinstance(overlay, HeaderOverlay)
+    assert dict(overlay) == {"Accept": "text/csv", "x-trace": "1", "authorization": "Bearer secret"}
+    assert len(overlay) == 3
+    with pytest.raises(KeyError):
+        overlay["accept"]
+    assert overlay.encoded.get_list("accept") == ["text/csv"]
+    assert overlay.encoded["authorization"] == "Bearer secret"
+    # The base set is left untouched
+    assert base["accept"] == "application/json" and base.encoded["accept"] == "application/json"
+
+
+def test_helpers_accept_plain_mappings_too(config):
+    overlay = config.headers.snapshot.overlay({"x-trace": "1"})
+    assert encoded(overlay) is overlay.encoded
+    assert headers_key(overlay) == overlay.key == tuple(sorted(overlay.items()))
+    plain = {"b": "2", "a": "1"}
+    assert encoded(plain) is plain and headers_key(plain) == (("a", "1"), ("b", "2"))
+
+
+def test_requests_send_the_snapshot_and_per_request_headers(api_config, http_server):
+    api = API(api_config)
+    try:
+        api.sync_api_request("get", route="health", append_headers={"X-Trace": "abc"})
+        api.sync_api_request("get", route="health", override_headers={"X-Only": "1"}, force_refresh=True)
+        api_config.headers.accept = "text/plain"
+        api.sync_api_request("get", route="health", force_refresh=True)
+    finally:
+        api.close()
+    sent = [{k.lower(): v for k, v in headers.items()} for _, _, headers, _ in http_server.requests]
+    assert sent[0]["accept"] == "application/json" and sent[0]["x-trace"] == "abc"
+    assert sent[1]["x-only"] == "1" and sent[1].get("accept") != "application/json"
+    assert sent[2]["accept"] == "text/plain" and "x-trace" not in sent[2]
@@ -0,0 +1,102 @@
+import pickle
+
+import httpx
+import pytest
+
+from toomanyconfigs.api import API
+from toomanyconfigs.instrumentation import OTHER_ROUTE, Histogram, Instrumentation
+
+
+def test_histogram_percentiles_stay_within_bucket_precision():
+    histogram = Histogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1000)
+    assert histogram.count == 1000 and histogram.max == 1.0
+    for p, expected in ((50, 0.5), (90, 0.9), (99, 0.99)):
+        assert histogram.percentile(p) == pytest.approx(expected, rel=0.07)
+    assert histogram.percentile(100) == 1.0
+    assert Histogram().percentile(50) == 0.0
+
+
+def test_histogram_exports_cumulative_buckets():
+    histogram = Histogram()
+    for seconds in (0.0005, 0.003, 0.003, 2.0):
+        histogram.record(seconds)
+    buckets = dict(histogram.cumulative())
+    assert buckets[0.001] == 1 and buckets[0.005] == 3 and buckets[1.0] == 3 and buckets[2.5] == 4
+
+
+def response(status=200):
+    return httpx.Response(status, request=httpx.Request("GET", "http://api.example/"))
+
+
+def test_finish_and_fail_record_per_route_and_call_hooks():
+    metrics = Instrumentation()
+    seen = []
+    metrics.add_hook("before_request", lambda t: seen.append(("before", t.route)))
+    metrics.add_hook("after_response", lambda t: seen.append(("after", t.status)))
+    metrics.add_hook("error", lambda t: seen.append(("error", type(t.error).__name__)))
+
+    @metrics.hook("after_response")
+    def broken(timing):
+        raise RuntimeError("hooks can't break requests")
+
+    metrics.finish(metrics.start("get", "users", "http://api.example/users"), response(200))
+    metrics.finish(metrics.start("get", "users", "http://api.example/users"), response(404))
+    metrics.fail(metrics.start("post", "users", "http://api.example/users"), httpx.ConnectError("down"))
+    metrics.cache_hit("get", "users", "http://api.example/users")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["latency"]["users"]["total"]["count"] == 2
+    assert snapshot["responses"] == {"users GET 200": 1, "users GET 404": 1}
+    assert snapshot["errors"] == {"users POST ConnectError": 1}
+    assert snapshot["cache_hits"] == {"users": 1}
+    assert seen == [("before", "users"), ("after", 200), ("before", "users"), ("after", 404),
+                    ("before", "users"), ("error", "ConnectError")]
+    with pytest.raises(ValueError):
+        metrics.add_hook("on_retry", print)
+
+
+def test_route_labels_are_capped():
+    metrics = Instrumentation(max_routes=3)
+    for i in range(50):
+        metrics.finish(metrics.start("get", f"/users/{i}", f"http://api.example/users/{i}"), response())
+    latency = metrics.snapshot()["latency"]
+    assert set(latency) == {"/users/0", "/users/1", "/users/2", OTHER_ROUTE}
+    assert latency[OTHER_ROUTE]["total"]["count"] == 47
+    # Known routes keep their own series
+    metrics.cache_hit("get", "/users/1", "http://api.example/users/1")
+    metrics.cache_hit("get", "/users/99", "http://api.example/users/99")
+    assert metrics.snapshot()["cache_hits"] == {"/users/1": 1, OTHER_ROUTE: 1}
+
+
+def test_prometheus_text():
+    metrics = Instrumentation(prefix="app")
+    metrics.finish(metrics.start("get", 'odd"route', "http://api.example/"), response())
+    text = metrics.prometheus()
+    assert '# TYPE app_request_duration_seconds histogram' in text
+    assert 'app_request_duration_seconds_count{route="odd\\"route",phase="total"} 1' in text
+    assert 'app_request_duration_seconds_bucket{route="odd\\"route",phase="total",le="+Inf"} 1' in text
+    assert 'app_responses_total{route="odd\\"route",method="GET",status="200"} 1' in text
+
+
+def test_pickle_keeps_settings_only():
+    metrics = Instrumentation(phases=True, prefix="x", max_routes=7)
+    metrics.add_hook("error", print)
+    metrics.cache_hit("get", "a", "http://api.example/a")
+    copied = pickle.loads(pickle.dumps(metrics))
+    assert (copied.phases, copied.prefix, copied.max_routes) == (True, "x", 7)
+    assert copied.snapshot()["cache_hits"] == {} and copied.hooks["error"] == []
+
+
+def test_api_labels_requests_by_shortcut(api_config):
+    api = API(api_config)
+    try:
+        for i in range(5):
+            api.sync_api_request("get", route="user", format={"id": i})
+            api.sync_api_request("get", route=f"/items/{i}", params={"page": i})
+        api.sync_api_request("get", append="/")
+        latency = api.instrumentation.snapshot()["latency"]
+        assert {route: s["total"]["count"] for route, s in latency.items()} == {"user": 5, OTHER_ROUTE: 5, "/": 1}
+    finally:
+        api.close()
@@ -0,0 +1,185 @@
+import asyncio
+import pickle
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from toomanyconfigs.api import LimitsConfig
+from toomanyconfigs.limits import AdaptiveLimiter, Limits, TokenBucket, retry_after
+
+
+def test_bucket_allows_a_burst_then_paces_callers():
+    bucket = TokenBucket(rate=10, burst=3)
+    waits = [bucket.reserve() for _ in range(6)]
+    assert waits[:3] == [0, 0, 0]
+    # Each caller past the burst is given its own turn, a tenth of a second after the one before
+    assert waits[3:] == pytest.approx([0.1, 0.2, 0.3], abs=0.02)
+
+
+def test_bucket_refills_over_time():
+    bucket = TokenBucket(rate=100, burst=1)
+    assert bucket.reserve() == 0
+    time.sleep(0.02)
+    assert bucket.reserve() == 0
+
+
+def test_unlimited_bucket_never_waits_until_paused():
+    bucket = TokenBucket()
+    assert all(bucket.reserve() == 0 for _ in range(1000))
+    bucket.pause(0.5)
+    assert bucket.reserve() == pytest.approx(0.5, abs=0.05)
+
+
+def test_pause_holds_back_even_a_full_bucket():
+    bucket = TokenBucket(rate=10, burst=5)
+    bucket.pause(1.0)
+    assert bucket.reserve() == pytest.approx(1.1, abs=0.05)
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, None),
+    ({"retry-after": "3"}, 3.0),
+    ({"Retry-After": "1.5"}, 1.5),
+    ({"retry-after": "-4"}, 0.0),
+    ({"retry-after": "soon"}, None),
+])
+def test_retry_after_seconds(headers, expected):
+    assert retry_after(headers) == expected
+
+
+def test_retry_after_http_date():
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert retry_after({"retry-after": when}) == pytest.approx(30, abs=2)
+
+
+def test_limiter_grows_while_healthy():
+    limiter = AdaptiveLimiter(initial=4, max_limit=5)
+    for _ in range(40):
+        limiter.acquire()
+        limiter.release(latency=0.01)
+    assert limiter.limit == 5 and limiter.inflight == 0
+
+
+def test_limiter_cuts_once_per_round_trip():
+    limiter = AdaptiveLimiter(initial=16, min_limit=2)
+    for _ in range(4):
+        limiter.acquire()
+    limiter.release(latency=0.05)  # sets the round trip
+    for _ in range(3):
+        limiter.release(overloaded=True)
+    # One burst of rejections halves the limit once
+    assert int(limiter.limit) == 8
+
+    time.sleep(0.06)
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(overloaded=True)
+        time.sleep(0.06)
+    assert limiter.limit == 2
+
+
+def test_slow_responses_cut_the_limit():
+    limiter = AdaptiveLimiter(initial=8, latency_factor=2.0)
+    limiter.acquire()
+    limiter.release(latency=0.001)
+    limiter.acquire()
+    limiter.release(latency=0.5)
+    assert int(limiter.limit) == 4
+
+
+def test_freed_slots_go_to_waiters_first():
+    limiter = AdaptiveLimiter(initial=1)
+    limiter.acquire()
+    served = threading.Event()
+
+    def waiter():
+        limiter.acquire()
+        served.set()
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    assert not served.is_set()
+    limiter.release()
+    assert served.wait(5)
+    thread.join()
+    # The slot was handed over, so a newcomer has to wait for the next one
+    assert limiter.inflight == 1 and not limiter._take()
+
+
+def test_async_waiters_are_served_and_cancelled_ones_skipped():
+    limiter = AdaptiveLimiter(initial=1)
+
+    async def main():
+        await limiter.aacquire()
+        cancelled = asyncio.ensure_future(limiter.aacquire())
+        waiting = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.sleep(0.01)
+        limiter.release(latency=0.01)
+        await asyncio.wait_for(waiting, 5)
+        return cancelled.cancelled()
+
+    assert asyncio.run(main())
+    assert limiter.inflight == 1
+
+
+def test_limits_from_config_gives_hosts_and_routes_their_own_buckets():
+    section = LimitsConfig(
+        rate=5, burst=2, adaptive=True,
+        hosts={"slow.example": 1, "fast.example": {"rate": 50, "burst": 10}},
+        routes={"search": {"rate": 2}},
+    )
+    limits = Limits.from_config(section)
+    assert limits.hosts == {"slow.example": (1.0, None), "fast.example": (50.0, 10)}
+    assert limits.routes == {"search": (2.0, None)}
+
+    default, = limits.buckets("other.example")
+    assert (default.rate, default.burst) == (5, 2)
+    host, route = limits.buckets("fast.example", "search")
+    assert (host.rate, host.burst, route.rate) == (50, 10, 2)
+    assert limits.buckets("fast.example", "search")[1] is route
+    assert limits.limiter("a") is limits.limiter("a") is not limits.limiter("b")
+
+    assert limits.is_current()
+    section.rate = 6
+    assert not limits.is_current()
+
+
+def test_reserve_waits_for_the_slowest_bucket():
+    limits = Limits(rate=100, burst=1, routes={"search": 1})
+    assert limits.reserve("api.example", "search") == 0
+    assert limits.reserve("api.example", "search") == pytest.approx(1.0, abs=0.05)
+    assert limits.reserve("api.example") == pytest.approx(0.01, abs=0.01)
+
+
+def test_slot_pauses_the_host_on_retry_after():
+    limits = Limits(rate=0, adaptive=True, initial_concurrency=4)
+    request = httpx.Request("GET", "http://api.example/a")
+    with limits.slot("http://api.example/a") as slot:
+        assert limits.stats == {"api.example": {"limit": 4, "inflight": 1}}
+        slot.record(httpx.Response(429, headers={"retry-after": "2"}, request=request))
+    assert limits.stats["api.example"]["inflight"] == 0
+    assert limits.stats["api.example"]["limit"] == 2
+    assert limits.reserve("api.example") == pytest.approx(2, abs=0.05)
+    assert limits.reserve("other.example") == 0
+
+
+def test_slot_reports_timeouts_as_overload():
+    limits = Limits(adaptive=True, initial_concurrency=8)
+    with pytest.raises(httpx.ReadTimeout):
+        with limits.slot("http://api.example/a"):
+            raise httpx.ReadTimeout("slow")
+    assert limits.stats["api.example"] == {"limit": 4, "inflight": 0}
+
+
+def test_pickle_keeps_settings_only():
+    limits = Limits(rate=3, hosts={"a": 1}, adaptive=True)
+    limits.limiter("a")
+    copied = pickle.loads(pickle.dumps(limits))
+    assert copied.hosts == {"a": (1.0, None)} and copied.adaptive and copied.stats == {}
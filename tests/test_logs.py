@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from loguru import logger
+
+import toomanyconfigs
+from toomanyconfigs import ACTIVE_CFGS, TOMLConfig, TOMLSubConfig
+from toomanyconfigs.logs import log_mode
+from toomanyconfigs.providers import MappingProvider
+
+
+class Inner(TOMLSubConfig):
+    value: int = None
+
+
+class Outer(TOMLConfig):
+    name: str = None
+    missing: str = None
+    inner: Inner
+
+
+@pytest.fixture
+def records():
+    captured = []
+    sink = logger.add(lambda message: captured.append(message.record), level="TRACE")
+    yield captured
+    logger.remove(sink)
+
+
+def exercise(path):
+    path.write_text('name = "acme"\n')
+    providers = [MappingProvider({"inner.value": "3"})]
+    try:
+        config = Outer.create(path, providers=providers)
+        assert Outer.create(path, providers=providers) is config
+    finally:
+        ACTIVE_CFGS.clear()
+    path.write_text(path.read_text().replace("acme", "renamed"))
+    config.reload()
+    config.write(force=True)
+    return config
+
+
+def test_quiet_mode_leaves_only_warnings(tmp_path, records):
+    with log_mode("quiet"):
+        config = exercise(tmp_path / "outer.toml")
+    assert config.name == "renamed" and config.inner.value == 3
+    assert records and all(r["level"].no >= logger.level("WARNING").no for r in records)
+    assert any("Skipping empty field 'missing'" in r["message"] for r in records)
+
+
+def test_normal_mode_reports_routine_messages(tmp_path, records):
+    with log_mode("normal"):
+        exercise(tmp_path / "outer.toml")
+    messages = [r["message"] for r in records]
+    assert any("Missing fields detected" in m for m in messages)
+    assert any("Reusing Outer" in m for m in messages)
+
+
+def test_unknown_mode_in_the_environment_falls_back_to_normal():
+    script = "import toomanyconfigs; print(toomanyconfigs.LOGS.mode)"
+    env = {**os.environ, "TOOMANYCONFIGS_LOG": "verbose", "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "normal" and "TOOMANYCONFIGS_LOG 'verbose'" in result.stderr
+
+
+def test_debug_is_a_deprecated_alias_for_the_log_policy():
+    with log_mode("debug"), pytest.deprecated_call():
+        assert toomanyconfigs.DEBUG is True
+    with log_mode("normal"), pytest.deprecated_call():
+        from toomanyconfigs import DEBUG
+    assert DEBUG is False
@@ -0,0 +1,150 @@
+import asyncio
+import queue
+import threading
+import time
+
+import pytest
+
+from toomanyconfigs.persistence import WriteBehind
+
+
+class Recorder:
+    def __init__(self, gate: threading.Event = None):
+        self.batches = []
+        self.gate = gate
+
+    def __call__(self, batch):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append(batch)
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_flushes_full_batches_and_the_rest_on_close():
+    recorder = Recorder()
+    writer = WriteBehind(recorder, batch_size=10, interval=60)
+    for i in range(25):
+        writer.put(i)
+    wait_for(lambda: writer.written == 20)
+    assert recorder.batches == [list(range(10)), list(range(10, 20))]
+    writer.close()
+    assert recorder.batches[-1] == list(range(20, 25)) and writer.written == 25
+
+
+def test_flushes_a_partial_batch_after_the_interval():
+    recorder = Recorder()
+    writer = WriteBehind(recorder, batch_size=1000, interval=0.05)
+    started = time.monotonic()
+    for i in range(3):
+        writer.put(i)
+    wait_for(lambda: writer.written == 3)
+    assert recorder.batches == [[0, 1, 2]] and time.monotonic() - started < 2
+    writer.close()
+
+
+def test_flush_waits_for_everything_enqueued():
+    recorder = Recorder()
+    writer = WriteBehind(recorder, batch_size=1000, interval=60)
+    for i in range(5):
+        writer.put(i)
+    assert writer.flush(timeout=5)
+    assert recorder.batches == [[0, 1, 2, 3, 4]]
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.put(5)
+
+
+def test_put_blocks_while_the_queue_is_full():
+    gate = threading.Event()
+    writer = WriteBehind(Recorder(gate), batch_size=1, interval=60, max_queue=2)
+    writer.put(0)
+    wait_for(lambda: writer.pending == 0)  # taken by the writer, which is now stuck in write_batch
+    writer.put(1)
+    writer.put(2)
+    with pytest.raises(queue.Full):
+        writer.put(3, timeout=0.05)
+    gate.set()
+    writer.put(3, timeout=5)
+    writer.close()
+    assert writer.written == 4
+
+
+def test_aput_waits_without_blocking_the_event_loop():
+    gate = threading.Event()
+    writer = WriteBehind(Recorder(gate), batch_size=1, interval=60, max_queue=1)
+
+    async def main():
+        writer.put(0)
+        await asyncio.sleep(0.05)
+        writer.put(1)
+        ticks = 0
+        pending = asyncio.ensure_future(writer.aput(2))
+        while ticks < 5:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not pending.done()
+        gate.set()
+        await asyncio.wait_for(pending, 5)
+        return ticks
+
+    assert asyncio.run(main()) == 5
+    writer.close()
+    assert writer.written == 3
+
+
+def test_failed_batches_are_counted_and_the_writer_keeps_going():
+    calls = []
+
+    def flaky(batch):
+        calls.append(list(batch))
+        if len(calls) == 1:
+            raise OSError("database locked")
+
+    writer = WriteBehind(flaky, batch_size=2, interval=60)
+    for i in range(4):
+        writer.put(i)
+    writer.close()
+    assert calls == [[0, 1], [2, 3]] and writer.failed == 2 and writer.written == 2
+
+
+def test_receptionist_persists_responses_behind_the_request(tmp_path, monkeypatch, fake_p2d2):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from toomanyconfigs.api import API, APIConfig
+
+    class Ok(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Ok)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(f'[routes]\nbase = "http://127.0.0.1:{httpd.server_port}"\n\n[routes.shortcuts]\n')
+    gate = threading.Event()
+    try:
+        api = API(APIConfig.create(path, prompt_empty_fields=False, memoize=False), database=True, write_interval=60)
+        persist = api.writer.write_batch
+        api.writer.write_batch = lambda batch: (gate.wait(5), persist(batch))
+        # The request returns while its row is still waiting to be written
+        assert api.sync_api_request("get", append="/a").status == 200
+        assert api.writer.written == 0
+        gate.set()
+        api.close()
+        assert api.writer.written == 1
+        assert [r["signature"] for r in api.database.tables["responses"]] == [None]
+    finally:
+        httpd.shutdown()
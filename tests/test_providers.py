@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from toomanyconfigs import TOMLConfig, TOMLSubConfig
+from toomanyconfigs.providers import EnvProvider, MappingProvider, PromptProvider, SecretsDirProvider
+
+
+class Database(TOMLSubConfig):
+    host: str = None
+    port: int = None
+
+
+class Tenant(TOMLConfig):
+    name: str = None
+    token: str = None
+    debug: bool = None
+    database: Database
+
+
+@pytest.fixture
+def no_terminal(monkeypatch):
+    monkeypatch.setattr("sys.stdin", io.StringIO(""))
+
+
+def create(path, *providers):
+    return Tenant.create(path, providers=list(providers), memoize=False)
+
+
+def test_values_come_from_each_provider_in_order(tmp_path, no_terminal):
+    secrets = tmp_path / "secrets"
+    secrets.mkdir()
+    (secrets / "tenant_token").write_text("from-file\n")
+    env = {"TENANT_TOKEN": "from-env", "TENANT_DEBUG": "yes", "DATABASE_PORT": "5432"}
+    config = create(tmp_path / "tenant.toml", EnvProvider(environ=env), SecretsDirProvider(secrets),
+                    MappingProvider({"database.host": "db", "name": "acme"}), PromptProvider())
+    assert config.token == "from-env" and config.debug is True and config.name == "acme"
+    assert config.database.host == "db" and config.database.port == 5432
+
+
+def test_provided_values_are_not_written(tmp_path, no_terminal):
+    path = tmp_path / "tenant.toml"
+    path.write_text('name = "acme"\n\n[database]\nhost = "db"\n')
+    before = path.read_text()
+    env = {"TENANT_TOKEN": "s3cr3t", "DATABASE_PORT": "5432"}
+    config = create(path, EnvProvider(environ=env))
+    assert config.token == "s3cr3t" and config.database.port == 5432
+    assert path.read_text() == before
+
+    config.name = "renamed"
+    config.write()
+    text = path.read_text()
+    assert "renamed" in text and "s3cr3t" not in text and "5432" not in text
+    assert config.reload() == [] and config.token == "s3cr3t"
+
+
+def test_assigned_values_replace_provided_ones_and_are_written(tmp_path, no_terminal):
+    path = tmp_path / "tenant.toml"
+    config = create(path, EnvProvider(environ={"TENANT_TOKEN": "s3cr3t"}))
+    config.token = "chosen"
+    config.write()
+    assert 'token = "chosen"' in path.read_text()
+
+
+def test_typed_answers_are_written(tmp_path, monkeypatch):
+    answers = iter(["db", "5432", "acme", "tok", ""])  # the section first, then the fields
+    monkeypatch.setattr("builtins.input", lambda prompt: next(answers))
+    path = tmp_path / "tenant.toml"
+    config = create(path, PromptProvider(clipboard=False, require_tty=False))
+    assert config.name == "acme" and config.token == "tok" and config.debug is None
+    assert config.database.port == 5432
+    assert 'token = "tok"' in path.read_text()
+
+
+def test_no_terminal_means_no_prompt(tmp_path, no_terminal, monkeypatch):
+    def fail(prompt):
+        raise AssertionError("prompted without a terminal")
+
+    monkeypatch.setattr("builtins.input", fail)
+    config = create(tmp_path / "tenant.toml", PromptProvider())
+    assert config.token is None
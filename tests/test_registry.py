@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from toomanyconfigs import ACTIVE_CFGS, TOMLConfig
+from toomanyconfigs.providers import MappingProvider
+from toomanyconfigs.registry import ConfigRegistry
+
+
+class App(TOMLConfig):
+    name: str = "app"
+    token: str = None
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    ACTIVE_CFGS.clear()
+    yield ACTIVE_CFGS
+    ACTIVE_CFGS.clear()
+
+
+def create(path, **options):
+    return App.create(path, prompt_empty_fields=False, **options)
+
+
+def test_same_file_and_options_share_an_instance(tmp_path, registry):
+    path = tmp_path / "app.toml"
+    first = create(path)
+    assert create(path) is first and create(str(path)) is first
+    assert (App, path) in registry and registry.stats["hits"] == 2
+
+
+def test_other_options_get_an_instance_of_their_own(tmp_path):
+    path = tmp_path / "app.toml"
+    plain = create(path)
+    provider = MappingProvider({"token": "s3cr3t"})
+    provided = create(path, providers=[provider])
+    assert provided is not plain and provided.token == "s3cr3t" and plain.token is None
+    assert create(path, providers=[provider]) is provided
+    assert create(path, write=False) is not plain
+    assert App.create(path, prompt_empty_fields=True, providers=[]) is not plain
+
+
+def test_kwargs_and_memoize_false_build_fresh(tmp_path):
+    path = tmp_path / "app.toml"
+    first = create(path)
+    assert create(path, memoize=False) is not first
+    assert create(path) is first
+    assert create(path, name="other") is not first
+
+
+def test_changes_to_the_file_invalidate(tmp_path):
+    path = tmp_path / "app.toml"
+    first = create(path)
+    path.write_text('name = "edited elsewhere"\n')
+    second = create(path)
+    assert second is not first and second.name == "edited elsewhere"
+
+
+def test_own_writes_and_reloads_keep_the_instance_shared(tmp_path):
+    path = tmp_path / "app.toml"
+    config = create(path)
+    config.name = "renamed"
+    config.write()
+    assert create(path) is config
+
+    path.write_text('name = "reloaded"\n')
+    os.utime(path, ns=(1, 1))
+    assert config.reload()
+    assert create(path) is config and config.name == "reloaded"
+
+
+def test_invalidate_by_class_or_path(tmp_path, registry):
+    a, b = tmp_path / "a.toml", tmp_path / "b.toml"
+    first_a, first_b = create(a), create(b)
+    assert registry.invalidate(path=a) == 1
+    assert create(a) is not first_a and create(b) is first_b
+    assert registry.invalidate(App) == 2 and len(registry) == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    registry = ConfigRegistry(maxsize=2)
+    monkeypatch.setattr("toomanyconfigs.core.ACTIVE_CFGS", registry)
+    paths = [tmp_path / f"{i}.toml" for i in range(3)]
+    first, second = create(paths[0]), create(paths[1])
+    assert create(paths[0]) is first  # now the most recent
+    create(paths[2])
+    assert len(registry) == 2
+    assert (App, paths[1]) not in registry and create(paths[1]) is not second
+    assert create(paths[2]) is not None and (App, paths[0]) not in registry
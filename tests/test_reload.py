@@ -0,0 +1,49 @@
+import re
+
+from toomanyconfigs.api import APIConfig
+
+CONFIG = '''[headers]
+authorization = "Bearer x"
+accept = "application/json"
+
+[routes]
+base = "http://example.com"
+
+[routes.shortcuts]
+
+[vars]
+api_key = "secret"
+'''
+
+
+def test_reload_of_unchanged_retries_reports_nothing(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(CONFIG + "\n[retries]\nattempts = 2\n")
+    config = APIConfig.create(path, prompt_empty_fields=False, memoize=False)
+    fired = []
+    config.on_change("*", lambda *change: fired.append(change))
+    assert config.reload() == [] and config.reload() == []
+    assert fired == []
+
+
+def test_reload_reports_a_changed_status_list(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(CONFIG + "\n[retries]\nstatuses = [503]\n")
+    config = APIConfig.create(path, prompt_empty_fields=False, memoize=False)
+    # Edit the file as written back, which now holds every retry setting
+    path.write_text(re.sub(r"statuses = \[.*\]", "statuses = [503, 504]", path.read_text()))
+    changes = config.reload()
+    assert [key for key, _, _ in changes] == [("retries", "statuses")]
+    assert config.retries.policy.statuses == {503, 504}
+
+
+def test_reload_compares_templates_not_substituted_values(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(CONFIG.replace('"Bearer x"', '"Bearer ${API_KEY}"'))
+    config = APIConfig.create(path, prompt_empty_fields=False, memoize=False)
+    assert config.headers.authorization == "Bearer secret"
+    assert config.reload() == []
+
+    path.write_text(path.read_text().replace('api_key = "secret"', 'api_key = "rotated"'))
+    assert [key for key, _, _ in config.reload()] == [("vars", "api_key")]
+    assert config.headers.authorization == "Bearer rotated"
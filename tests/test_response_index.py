@@ -0,0 +1,54 @@
+from conftest import Frame
+
+from toomanyconfigs.api import API, Response, ResponseIndex
+
+
+def row(method, path, status, body):
+    return {"path": path, "status": str(status), "method": method, "headers": '{"x": "1"}', "body": body}
+
+
+def test_index_is_built_once_and_the_newest_row_wins():
+    loads = []
+    rows = [row("get", "/a", 200, '{"v": 1}'), row("get", "/b", 404, ""), row("get", "/a", 200, '{"v": 2}')]
+
+    def load():
+        loads.append(1)
+        return Frame(["path", "status", "method", "headers", "body"], rows)
+
+    index = ResponseIndex(load)
+    assert not loads
+    first = index.get("get", "/a")
+    assert isinstance(first, Response) and first.body == {"v": 2} and first.headers == {"x": "1"}
+    assert index.get("get", "/a") is first
+    assert index.get("get", "/b").status == 404 and index.get("get", "/b").body == ""
+    assert index.get("post", "/a") is None and len(index) == 2 and loads == [1]
+
+
+def test_responses_added_before_the_first_lookup_are_kept():
+    index = ResponseIndex(lambda: Frame(["path", "status", "method", "headers", "body"], [row("get", "/a", 200, "old")]))
+    fresh = Response(status=201, method="get", headers={}, body="new")
+    index.add("get", "/a", fresh)
+    # Not yet in the table it loads; the pending response still wins over the stored row
+    assert index.get("get", "/a") is fresh
+    later = Response(status=200, method="get", headers={}, body="later")
+    index.add("get", "/c", later)
+    assert index.get("get", "/c") is later and len(index) == 2
+
+
+def test_database_mode_serves_repeats_from_the_index(api_config, http_server, fake_p2d2):
+    api = API(api_config, database=True, write_interval=0.01)
+    try:
+        database = api.database
+        database.create("responses", "seed", **row("get", f"{http_server.url}/users/1", 200, '{"seeded": true}'))
+        assert api.sync_api_request("get", route="user", format={"id": 1}).body == {"seeded": True}
+        assert http_server.requests == []
+
+        first = api.sync_api_request("get", route="user", format={"id": 2})
+        assert api.sync_api_request("get", route="user", format={"id": 2}) is first
+        assert len(http_server.requests) == 1 and database.loads == 1
+        assert api.instrumentation.snapshot()["cache_hits"] == {"user": 2}
+    finally:
+        api.close()
+    # The fetched response was written behind the request
+    assert [r["path"] for r in database.tables["responses"]] == [f"{http_server.url}/users/1",
+                                                                  f"{http_server.url}/users/2"]
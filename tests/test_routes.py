@@ -0,0 +1,56 @@
+import pytest
+
+from toomanyconfigs.api import APIConfig
+
+CONFIG = '''[routes]
+base = "http://example.com/$VERSION/"
+
+[routes.shortcuts]
+user = "users/{id}"
+positional = "users/{}"
+unclosed = "users/{id"
+health = "health"
+
+[vars]
+version = "v1"
+'''
+
+
+@pytest.fixture
+def routes(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(CONFIG)
+    return APIConfig.create(path, prompt_empty_fields=False, memoize=False).routes
+
+
+def test_a_malformed_shortcut_only_breaks_its_own_route(routes):
+    table = routes.table
+    assert table.build("user", format={"id": 7}) == "http://example.com/v1/users/7"
+    assert table.build("health", append="?full=1") == "http://example.com/v1/health?full=1"
+    with pytest.raises(ValueError, match="positional"):
+        table.build("positional")
+    with pytest.raises(ValueError):
+        table.build("unclosed", format={"id": 1})
+    assert table.build("other/path") == "http://example.com/v1/other/path"
+
+
+def test_shortcuts_compile_once_on_first_use(routes):
+    table = routes.table
+    assert "user" in table and "missing" not in table and table.routes == {}
+    table.build("user", format={"id": 1})
+    template = table.routes["user"]
+    table.build("user", format={"id": 2})
+    assert table.routes == {"user": template}
+
+
+def test_changed_vars_rebuild_the_table(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(CONFIG)
+    config = APIConfig.create(path, prompt_empty_fields=False, memoize=False)
+    table = config.routes.table
+    assert table.build("health") == "http://example.com/v1/health"
+    assert config.routes.table is table
+
+    config.vars.version = "v2"
+    assert config.routes.table is not table
+    assert config.routes.table.build("health") == "http://example.com/v2/health"
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from toomanyconfigs.api import API
+from toomanyconfigs.limits import Limits
+from toomanyconfigs.streaming import JSONArrayDecoder, StreamResponse, iter_stream
+
+ITEMS = [{"id": 1, "tags": ["a", "b"]}, 12.5, "text, with ] and [", None, [1, [2]], 3000]
+
+
+def decode(text: str, size: int) -> list:
+    decoder = JSONArrayDecoder(retry_bytes=8)
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(decoder.feed(text[i:i + size]))
+    return items + decoder.close()
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_array_items_decode_across_any_chunking(size):
+    assert decode(json.dumps(ITEMS, indent=1), size) == ITEMS
+    assert decode(" [ ] ", size) == []
+
+
+def test_numbers_are_not_cut_at_a_chunk_boundary():
+    decoder = JSONArrayDecoder()
+    assert decoder.feed("[12") == []
+    assert decoder.feed("34, 5") == [1234]
+    assert decoder.feed("6]") == [56]
+    assert decoder.close() == []
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}', "[1, 2", "[1 2]", "[1] extra"])
+def test_malformed_or_incomplete_arrays_raise(text):
+    with pytest.raises(ValueError):
+        decode(text, 2)
+
+
+def test_modes_over_a_response():
+    body = b'{"n": 0}\n\n{"n": 1}\n'
+    response = httpx.Response(200, content=body, request=httpx.Request("GET", "http://api.example/"))
+    assert list(iter_stream(response, "ndjson")) == [{"n": 0}, {"n": 1}]
+    assert list(iter_stream(response, "lines")) == ['{"n": 0}', "", '{"n": 1}']
+    assert b"".join(iter_stream(response, "bytes", 4)) == body
+    with pytest.raises(ValueError):
+        StreamResponse(response, "get", "xml")
+
+
+def test_sync_stream_holds_a_slot_and_is_timed(api_config, http_server):
+    limits = Limits(adaptive=True, initial_concurrency=4)
+    api = API(api_config, rate_limits=limits)
+    host = http_server.url.partition("//")[2]
+    try:
+        with api.sync_api_stream("get", append="/lines/3", mode="ndjson") as stream:
+            assert stream.status == 200 and limits.stats[host]["inflight"] == 1
+            assert list(stream) == [{"n": 0}, {"n": 1}, {"n": 2}]
+        assert limits.stats[host]["inflight"] == 0
+        snapshot = api.instrumentation.snapshot()
+        assert snapshot["latency"]["/"]["total"]["count"] == 1
+        assert snapshot["responses"] == {"/ GET 200": 1}
+    finally:
+        api.close()
+
+
+def test_caller_errors_in_the_block_dont_count_against_the_request(api_config, http_server):
+    limits = Limits(adaptive=True, initial_concurrency=4)
+    api = API(api_config, rate_limits=limits)
+    host = http_server.url.partition("//")[2]
+    try:
+        with pytest.raises(KeyError):
+            with api.sync_api_stream("get", route="health", mode="text") as stream:
+                raise KeyError("caller")
+        assert limits.stats[host] == {"limit": 4, "inflight": 0}
+        snapshot = api.instrumentation.snapshot()
+        assert snapshot["responses"] == {"health GET 200": 1} and snapshot["errors"] == {}
+    finally:
+        api.close()
+
+
+def test_overload_and_failures_reach_limits_and_metrics(api_config, http_server):
+    limits = Limits(adaptive=True, initial_concurrency=8)
+    api = API(api_config, rate_limits=limits)
+    host = http_server.url.partition("//")[2]
+    try:
+        with api.sync_api_stream("get", append="/status/429") as stream:
+            assert stream.status == 429
+        assert limits.stats[host] == {"limit": 4, "inflight": 0}
+
+        api_config.routes.base = "http://127.0.0.1:1"
+        with pytest.raises(httpx.ConnectError):
+            with api.sync_api_stream("get", route="health"):
+                pass
+        assert api.instrumentation.snapshot()["errors"] == {"health GET ConnectError": 1}
+    finally:
+        api.close()
+
+
+def test_async_stream_holds_a_slot_and_is_timed(api_config, http_server):
+    limits = Limits(adaptive=True, initial_concurrency=4)
+    api = API(api_config, rate_limits=limits)
+    host = http_server.url.partition("//")[2]
+
+    async def main():
+        async with api.api_stream("get", append="/lines/2", mode="ndjson") as stream:
+            inflight = limits.stats[host]["inflight"]
+            records = [record async for record in stream]
+        await api.aclose()
+        return inflight, records
+
+    try:
+        assert asyncio.run(main()) == (1, [{"n": 0}, {"n": 1}])
+        assert limits.stats[host]["inflight"] == 0
+        assert api.instrumentation.snapshot()["responses"] == {"/ GET 200": 1}
+    finally:
+        api.close()
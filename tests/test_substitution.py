@@ -0,0 +1,56 @@
+import copy
+import pickle
+
+import pytest
+
+from toomanyconfigs.api import APIConfig
+
+CONFIG = '''[headers]
+authorization = "Bearer ${API_KEY}"
+accept = "application/json"
+
+[routes]
+base = "http://example.com/$VERSION"
+
+[routes.shortcuts]
+users = "users/{id}"
+
+[vars]
+api_key = "secret"
+version = "v1"
+'''
+
+
+@pytest.fixture
+def config(tmp_path):
+    path = tmp_path / "apiconfig.toml"
+    path.write_text(CONFIG)
+    return APIConfig.create(path, prompt_empty_fields=False, memoize=False)
+
+
+def test_placeholders_resolve_on_read_and_templates_are_saved(config):
+    assert config.headers.authorization == "Bearer secret"
+    assert config.routes.base == "http://example.com/v1"
+    assert dict.__getitem__(config.headers, "authorization") == "Bearer ${API_KEY}"
+    assert "Bearer ${API_KEY}" in config._path.read_text()
+
+
+def test_changed_var_invalidates_its_dependents(config):
+    assert config.headers.authorization == "Bearer secret"
+    config.vars.api_key = "rotated"
+    assert config.headers.authorization == "Bearer rotated"
+    assert config.routes.base == "http://example.com/v1"
+
+
+@pytest.mark.parametrize("clone", [copy.deepcopy, lambda c: pickle.loads(pickle.dumps(c))], ids=["deepcopy", "pickle"])
+def test_round_trip_keeps_resolving_independently(config, clone):
+    assert config.headers.authorization == "Bearer secret"
+    copied = clone(config)
+    assert copied.headers.authorization == "Bearer secret"
+    assert copied.routes.base == "http://example.com/v1"
+    assert copied._resolver is not config._resolver
+    assert copied.headers._resolver is copied._resolver and copied.vars._resolver is copied._resolver
+
+    copied.vars.api_key = "copy"
+    assert copied.headers.authorization == "Bearer copy"
+    assert config.headers.authorization == "Bearer secret"
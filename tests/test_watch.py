@@ -0,0 +1,132 @@
+import sys
+import threading
+
+import pytest
+
+from toomanyconfigs import TOMLConfig, TOMLSubConfig
+from toomanyconfigs import watch
+from toomanyconfigs.watch import ConfigWatcher, diff, get_watcher
+
+
+def test_diff_reports_changed_added_and_removed_leaves():
+    old = {"a": 1, "same": "x", "nested": {"b": 2, "gone": 3}, "_private": 1}
+    new = {"a": 2, "same": "x", "nested": {"b": 2, "added": 4}, "_private": 2, "section": {"c": 1}}
+    assert sorted(diff(old, new)) == [
+        (("a",), 1, 2),
+        (("nested", "added"), None, 4),
+        (("nested", "gone"), 3, None),
+        (("section",), None, {"c": 1}),
+    ]
+
+
+def test_diff_treats_tuples_like_the_lists_read_back():
+    assert diff({"statuses": (503, 504)}, {"statuses": [503, 504]}) == []
+    assert diff({"statuses": (503,)}, {"statuses": [503, 504]}) == [(("statuses",), (503,), [503, 504])]
+
+
+class Server(TOMLSubConfig):
+    host: str = "localhost"
+    port: int = 80
+
+
+class Service(TOMLConfig):
+    name: str = "service"
+    retries: int = 3
+    server: Server
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "service.toml"
+    path.write_text('name = "svc"\nretries = 5\nextra = "x"\n\n[server]\nhost = "a"\nport = 8080\n')
+    return path
+
+
+def create(path):
+    return Service.create(path, prompt_empty_fields=False, memoize=False, write=False)
+
+
+def test_keys_removed_from_the_file_are_removed_from_the_config(path):
+    config = create(path)
+    fired = []
+    config.on_change("*", lambda *change: fired.append(change))
+    path.write_text('name = "svc"\n\n[server]\nhost = "a"\n')
+    changes = config.reload()
+    assert sorted(key for key, _, _ in changes) == [("extra",), ("retries",), ("server", "port")]
+    assert "retries" not in config and "extra" not in config and "port" not in config.server
+    # Annotated fields fall back to their defaults
+    assert config.retries == 3 and config.server.port == 80
+    assert ("extra", "x", None) in fired
+    assert not config.is_dirty() and config.reload() == []
+
+
+def test_a_removed_section_is_removed(path):
+    config = create(path)
+    path.write_text('name = "svc"\nretries = 5\nextra = "x"\n')
+    assert [key for key, _, _ in config.reload()] == [("server",)]
+    assert "server" not in config
+
+
+def wait_for(event, what):
+    assert event.wait(5), f"timed out waiting for {what}"
+
+
+@pytest.mark.parametrize("use_inotify", [
+    pytest.param(True, marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")),
+    False,
+], ids=["inotify", "polling"])
+def test_watcher_reloads_changed_files(path, use_inotify):
+    watcher = ConfigWatcher(interval=0.05, use_inotify=use_inotify)
+    try:
+        assert (watcher._inotify is not None) == use_inotify
+        config = create(path)
+        changed = threading.Event()
+        config.on_change("retries", lambda *change: changed.set())
+        watcher.add(config)
+
+        path.write_text(path.read_text().replace("retries = 5", "retries = 10"))
+        wait_for(changed, "the reload")
+        assert config.retries == 10
+
+        # Replaced by rename, as editors and TOMLConfig.write do
+        changed.clear()
+        replacement = path.with_suffix(".new")
+        replacement.write_text(path.read_text().replace("retries = 10", "retries = 20"))
+        replacement.replace(path)
+        wait_for(changed, "the reload after a rename")
+        assert config.retries == 20
+
+        watcher.remove(config)
+        changed.clear()
+        path.write_text(path.read_text().replace("retries = 20", "retries = 30"))
+        assert not changed.wait(0.3) and config.retries == 20
+    finally:
+        watcher.stop()
+
+
+def test_unreadable_changes_are_ignored(path):
+    watcher = ConfigWatcher(interval=0.05, use_inotify=False)
+    try:
+        config = create(path)
+        changed = threading.Event()
+        config.on_change("*", lambda *change: changed.set())
+        watcher.add(config)
+        path.write_text("name = [unclosed\n")
+        assert not changed.wait(0.3) and config.name == "svc"
+        path.write_text('name = "fixed"\nretries = 5\nextra = "x"\n\n[server]\nhost = "a"\nport = 8080\n')
+        wait_for(changed, "the reload")
+        assert config.name == "fixed"
+    finally:
+        watcher.stop()
+
+
+def test_get_watcher_starts_a_new_watcher_after_stop(monkeypatch):
+    monkeypatch.setattr(watch, "_watcher", None)
+    first = get_watcher()
+    try:
+        assert get_watcher() is first
+        first.stop()
+        second = get_watcher()
+        assert second is not first and not second.stopped and second._thread.is_alive()
+    finally:
+        watch._watcher.stop()